@@ -5,18 +5,22 @@ dycall.__main__
 ~~~~~~~~~~~~~~~
 
 Entry point. Command line arguments are parsed and passed over to `App`.
+
+`python -m dycall demangle` runs a headless `c++filt`-like filter instead.
 """
 
 import argparse
+import io
 import logging
 import platform
+import sys
 
 import desktop_app
 import lief
 
 from dycall.app import App
 from dycall.types import CALL_CONVENTIONS, PARAMETER_TYPES
-from dycall.util import LCIDS
+from dycall.util import LCIDS, demangle_text
 
 desktop_app.set_process_appid("dycall")
 is_windows = platform.system() == "Windows"
@@ -31,6 +35,37 @@ def positive_int(s: str) -> int:
     return i
 
 
+def demangle_filter(files: list):
+    """Demangles the names in `files` or stdin and writes the text to stdout.
+
+    Undecodable bytes are passed through as is.
+    """
+    out = io.TextIOWrapper(sys.stdout.buffer, errors="surrogateescape", newline="")
+    try:
+        for file in files or ["-"]:
+            if file == "-":
+                fp = io.TextIOWrapper(
+                    sys.stdin.buffer, errors="surrogateescape", newline=""
+                )
+                try:
+                    _demangle_to(fp, out)
+                finally:
+                    fp.detach()  # Closing it would close stdin
+            else:
+                with open(
+                    file, encoding="utf-8", errors="surrogateescape", newline=""
+                ) as fp:
+                    _demangle_to(fp, out)
+    finally:
+        out.detach()
+
+
+def _demangle_to(fp: io.TextIOBase, out: io.TextIOBase):
+    for lines in demangle_text(fp):
+        out.writelines(lines)
+        out.flush()
+
+
 def main():
     """Arguments are parsed here and passed as keyword arguments."""
     # * Don't use default values for string arguments
@@ -64,12 +99,23 @@ def main():
         action="store_true",
         help="Run without showing any images in the UI.",
     )
+    ap.add_argument(
+        "--no-prewarm",
+        action="store_true",
+        help="Don't load recently opened libraries in the background on startup.",
+    )
     if is_windows:
         ap.add_argument(
             "--hide-gle",
             help="Hides GetLastError from the status bar",
             action="store_true",
         )
+    sub = ap.add_subparsers(dest="command", metavar="command")
+    dp = sub.add_parser(
+        "demangle",
+        help="Demangle the names in text from files or stdin, like c++filt.",
+    )
+    dp.add_argument("files", nargs="*", help="Files to read, stdin if none or '-'")
 
     args = ap.parse_args()
     if args.log:
@@ -78,6 +124,9 @@ def main():
         lief.logging.disable()
 
     launch_args = vars(args)
+    if launch_args.pop("command", None) == "demangle":
+        demangle_filter(args.files)
+        return
     _ = launch_args.pop("log", None)  # Logging is handled hee itself
     App(**launch_args).mainloop()
 
@@ -29,20 +29,27 @@ from ttkbootstrap.icons import Icon
 from ttkbootstrap.localization import MessageCatalog as MsgCat
 
 import dycall.util
+from dycall.cache import DemangleStore, ExportCache
 from dycall.exports import ExportsFrame
 from dycall.function import FunctionFrame
+from dycall.loader import Prewarmer, ResultLRU
 from dycall.output import OutputFrame
 from dycall.picker import PickerFrame
 from dycall.status_bar import StatusBarFrame
+from dycall.store import ExportStore
 from dycall.top_menu import TopMenu
-from dycall.types import CallConvention, Export, SortOrder
-from dycall.util import DARK_THEME, LIGHT_THEME, get_img_path
+from dycall.types import CallConvention, SortOrder
+from dycall.util import DARK_THEME, LIGHT_THEME, demangle_cache, get_img_path
+from dycall.worker import isolated_worker
 
 log = logging.getLogger(__name__)
 
 # https://stackoverflow.com/a/3430395
 dirpath = pathlib.Path(__file__).parent.resolve()
 
+PREWARM_BUDGET: Final = 256 * 1024 * 1024
+"""Approximate number of bytes the exports of loaded libraries can occupy."""
+
 
 class App(tk.Window):
     """Welcome to DyCall!
@@ -54,6 +61,7 @@ class App(tk.Window):
     Most analogous to the "Controller" part of the MVC design pattern.
 
     Events:
+        - <<AppendExports>>
         - <<LanguageChanged>>
         - <<OutputSuccess>>
         - <<OutputException>>
@@ -71,7 +79,11 @@ class App(tk.Window):
         is_loaded (tk.BooleanVar): Whether a library has been selected.
         is_native (tk.BooleanVar): Whether loaded library is native.
         is_running (tk.BooleanVar): Set to True when a function is executing
-            and False again after it completes execution. Defaults to False.
+            and False again after all the calls complete. Defaults to False.
+        is_pinned (tk.BooleanVar): Whether all calls are made from the same
+            thread, see `dycall.runner.RunnerPool`.
+        is_isolated (tk.BooleanVar): Whether calls are made in a separate
+            process, see `dycall.worker.IsolatedWorker`.
     """
 
     def __init__(
@@ -86,6 +98,7 @@ class App(tk.Window):
         hide_gle: bool = False,
         hide_errno: bool = False,
         no_images: bool = False,
+        no_prewarm: bool = False,
     ) -> None:
         """DyCall entry point.
 
@@ -110,6 +123,8 @@ class App(tk.Window):
                 shown in status bar.
             no_images (bool, optional): Opens the DyCall GUI without loading
                 any images
+            no_prewarm (bool, optional): Don't load recently opened libraries
+                in the background on startup. Defaults to False.
         """  # noqa: D403
         log.debug("Initialising")
 
@@ -140,6 +155,8 @@ class App(tk.Window):
                 "recents": [],
                 "show_get_last_error": True,
                 "show_errno": True,
+                "pinned_thread": False,
+                "isolated_process": False,
             },
         )
 
@@ -185,6 +202,12 @@ class App(tk.Window):
         self.__cur_theme: Final = tk.StringVar(value=config["theme"])
         self.__is_native: Final = tk.BooleanVar()
         self.__is_running: Final = tk.BooleanVar(value=False)
+        self.__is_pinned: Final = tk.BooleanVar(
+            value=config.get("pinned_thread", False)
+        )
+        self.__is_isolated: Final = tk.BooleanVar(
+            value=config.get("isolated_process", False)
+        )
         self.__is_loaded: Final = tk.BooleanVar(value=False)
         self.__is_reinitialised: Final = tk.BooleanVar(value=False)
         self.__use_out_mode: Final = tk.BooleanVar(value=out_mode_or_not)
@@ -241,10 +264,18 @@ class App(tk.Window):
             dycall.util.SHOW_IMAGES = False
         self.__arch: Final = platform.architecture()[0]
         self.__rows_to_add: Final = rows
-        self.__exports: list[Export] = []
+        self.__exports = ExportStore()
         self.__recents: Final[collections.deque] = collections.deque(
             config["recents"], maxlen=10
         )
+        cache_dir = appdirs.user_cache_dir("DyCall", "demberto")
+        self.__export_cache: Final = ExportCache(os.path.join(cache_dir, "exports"))
+        self.__demangle_store: Final = DemangleStore(
+            os.path.join(cache_dir, "demangled.bin")
+        )
+        self.__demangle_store.load(demangle_cache)
+        self.__loaded_libs: Final = ResultLRU(PREWARM_BUDGET)
+        self.__prewarmer: Final = Prewarmer(self.__loaded_libs, self.__export_cache)
         self.__is_windows: Final = platform.system() == "Windows"
         self.title(self.__default_title)
         self.minsize(width=450, height=600)
@@ -253,6 +284,9 @@ class App(tk.Window):
         self.set_theme()
         self.init_widgets()
         self.deiconify()
+        if not no_prewarm:
+            # Recents are prewarmed only once the window appears
+            self.after_idle(lambda: self.__prewarmer.start(tuple(self.__recents)))
         log.debug("App initialised")
 
     @property
@@ -294,10 +328,13 @@ class App(tk.Window):
             self.__return_type,
             self.__lib_path,
             self.__selected_export,
+            self.__exports,
             self.__output_text,
             self.__status_text,
             self.__use_out_mode,
             self.__is_running,
+            self.__is_pinned,
+            self.__is_isolated,
             self.__exc_type,
             self.__get_last_error,
             self.__show_get_last_error,
@@ -328,6 +365,8 @@ class App(tk.Window):
             self.__is_native,
             self.__exports,
             self.__recents,
+            self.__export_cache,
+            self.__loaded_libs,
         )
         self.top_menu = TopMenu(
             self,
@@ -336,6 +375,8 @@ class App(tk.Window):
             self.__sort_order,
             self.__show_get_last_error,
             self.__show_errno,
+            self.__is_pinned,
+            self.__is_isolated,
             self.__about_opened,
             self.__cur_theme,
             self.__recents,
@@ -395,6 +436,8 @@ class App(tk.Window):
             config["show_get_last_error"] = self.__show_get_last_error.get()
         if not self.__dont_save_show_errno:
             config["show_errno"] = self.__show_errno.get()
+        config["pinned_thread"] = self.__is_pinned.get()
+        config["isolated_process"] = self.__is_isolated.get()
         try:
             config.save()
         except IOError as e:
@@ -406,6 +449,10 @@ class App(tk.Window):
             )
             if result == "Retry":
                 self.destroy()
+        self.__prewarmer.stop()
+        isolated_worker.stop()
+        demangle_cache.log_stats()
+        self.__demangle_store.save(demangle_cache)
         super().destroy()
 
     @property
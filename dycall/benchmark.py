@@ -0,0 +1,841 @@
+#!/usr/bin/env python3
+
+"""
+dycall.benchmark
+~~~~~~~~~~~~~~~~
+
+Contains `Benchmark`, `BenchmarkReport` and `BenchmarkWindow`.
+"""
+
+from __future__ import annotations
+
+import array
+import ctypes
+import dataclasses
+import datetime
+import heapq
+import json
+import logging
+import math
+import multiprocessing
+import os
+import platform
+import queue
+import re
+import threading
+import time
+from tkinter import filedialog
+from typing import Any, Callable, Iterable, NamedTuple, Optional, Sequence
+
+import appdirs
+import ttkbootstrap as tk
+from ttkbootstrap import ttk
+from ttkbootstrap.dialogs import Messagebox
+from ttkbootstrap.localization import MessageCatalog as MsgCat
+
+try:
+    from typing import Final  # type: ignore
+except ImportError:
+    # pylint: disable=ungrouped-imports
+    from typing_extensions import Final  # type: ignore
+
+from dycall._widgets import _TrButton, _TrLabel, _TrLabelFrame
+from dycall.runner import library_cache
+from dycall.types import CallConvention, CallPlan, ParameterType, compile_signature
+
+log = logging.getLogger(__name__)
+
+REPORTS_DIR: Final = os.path.join(
+    appdirs.user_data_dir("DyCall", "demberto"), "benchmarks"
+)
+"""Every report is saved here as JSON, see `BenchmarkReport.save`."""
+
+CHECK_EVERY: Final = 256
+"""Number of calls between two checks for cancellation, deadline & progress."""
+
+MAX_SAMPLES: Final = 10_000_000
+"""Time-budgeted runs stop after these many calls.
+
+Samples are kept in `array`s, i.e. 80 MB per worker at most.
+"""
+
+
+class BenchmarkTarget(NamedTuple):
+    """The export to benchmark. Only strings, so that it can be pickled."""
+
+    lib_path: str
+    name_or_ord: str
+    """Mangled name or `@ordinal`, see `ExportStore.symbol`."""
+
+    call_conv: str
+    returns: str
+    args: tuple[tuple[str, str], ...]
+    """Type and value of each argument, like the **Arguments** table."""
+
+    def resolve(self) -> tuple[Callable, CallPlan]:
+        """Returns the function and its `CallPlan`, see `LibraryCache`."""
+        call_conv = CallConvention(self.call_conv)
+        plan = compile_signature(
+            ParameterType(self.returns),
+            tuple(ParameterType(t) for t, _ in self.args),
+        )
+        handle = library_cache.handle(self.lib_path, call_conv, False, False)
+        if call_conv == CallConvention.StdCall:
+            functype = ctypes.WINFUNCTYPE  # type: ignore
+        else:
+            functype = ctypes.CFUNCTYPE
+        name_or_ord: Any = self.name_or_ord
+        if name_or_ord.startswith("@"):
+            name_or_ord = int(name_or_ord[1:])
+        func = library_cache.function(
+            handle, name_or_ord, functype, plan.restype, plan.argtypes
+        )
+        return func, plan
+
+
+class BenchmarkSettings(NamedTuple):
+    """How long to benchmark for; `calls` wins over `seconds` if both are set."""
+
+    calls: Optional[int] = None
+    seconds: Optional[float] = None
+    warmup: int = 100
+    """Number of untimed calls made first."""
+
+    workers: int = 1
+    """Benchmarks with 1, 2 ... `workers` threads calling at once."""
+
+    processes: bool = False
+    """Whether to use processes instead of threads."""
+
+
+def measure(
+    func: Callable,
+    args: Sequence[Any],
+    calls: Optional[int] = None,
+    seconds: Optional[float] = None,
+    cancel: Optional[threading.Event] = None,
+    progress: Optional[Callable[[float], None]] = None,
+) -> tuple[array.array, float]:
+    """Calls `func(*args)` `calls` times or for `seconds`, timing every call.
+
+    Returns:
+        The latency of every call in nanoseconds and the total seconds taken.
+    """
+    clock = time.perf_counter_ns
+    samples = array.array("Q")
+    append = samples.append
+    limit = MAX_SAMPLES if calls is None else calls
+    start = clock()
+    deadline = start + int((seconds or 0) * 1e9)
+    done = 0
+    while done < limit:
+        for _ in range(min(CHECK_EVERY, limit - done)):
+            t0 = clock()
+            func(*args)
+            append(clock() - t0)
+        done = len(samples)
+        now = clock()
+        if calls is None:
+            if now >= deadline:
+                break
+            fraction = (now - start) / (deadline - start)
+        else:
+            fraction = done / calls
+        if cancel is not None and cancel.is_set():
+            break
+        if progress is not None:
+            progress(fraction)
+    return samples, (clock() - start) / 1e9
+
+
+def calibrate(calls: int = 10_000) -> float:
+    """Median nanoseconds taken by a bare ctypes call, C `abs` here, including
+    reading the clock twice. This is subtracted from every sample.
+    """
+    if platform.system() == "Windows":
+        libc = ctypes.cdll.msvcrt
+    else:
+        libc = ctypes.CDLL(None)
+    bare = ctypes.CFUNCTYPE(ctypes.c_int, ctypes.c_int)(("abs", libc))
+    samples, _ = measure(bare, (ctypes.c_int(0),), calls)
+    return sorted(samples)[len(samples) // 2]
+
+
+@dataclasses.dataclass
+class BenchmarkStats:
+    """Latency statistics of a benchmark, all in nanoseconds."""
+
+    samples: Sequence[float]
+    """Latency of every call with the overhead subtracted, sorted.
+
+    An `array.array` of doubles, a list would take several times the memory.
+    """
+
+    overhead: float
+    """See `calibrate`."""
+
+    elapsed: float
+    """Seconds taken by all the timed calls."""
+
+    @classmethod
+    def from_samples(
+        cls, samples: Iterable[int], overhead: float, elapsed: float
+    ) -> BenchmarkStats:
+        """Sorts `samples` and subtracts `overhead` from them."""
+        ordered = sorted(samples)
+        # The clamped subtraction keeps the order of the raw samples
+        return cls(
+            array.array("d", (max(s - overhead, 0) for s in ordered)),
+            overhead,
+            elapsed,
+        )
+
+    @property
+    def count(self) -> int:
+        """Number of timed calls."""
+        return len(self.samples)
+
+    def percentile(self, p: float) -> float:
+        """The nearest-rank percentile `p`, from 0 to 100."""
+        if not self.samples:
+            return math.nan
+        rank = math.ceil(p / 100 * len(self.samples))
+        return self.samples[min(max(rank, 1), len(self.samples)) - 1]
+
+    @property
+    def min(self) -> float:
+        """Fastest call."""
+        return self.percentile(0)
+
+    @property
+    def median(self) -> float:
+        """50th percentile."""
+        return self.percentile(50)
+
+    @property
+    def mean(self) -> float:
+        """Average latency."""
+        return sum(self.samples) / len(self.samples) if self.samples else math.nan
+
+    @property
+    def p99(self) -> float:
+        """99th percentile."""
+        return self.percentile(99)
+
+    @property
+    def max(self) -> float:
+        """Slowest call."""
+        return self.percentile(100)
+
+    @property
+    def calls_per_second(self) -> float:
+        """Throughput, including the overhead of the calls."""
+        return self.count / self.elapsed if self.elapsed else math.nan
+
+    def histogram(self, bins: int = 20) -> list[tuple[float, float, int]]:
+        """Counts of the samples in `bins` equal-width bins from `min` to
+        `p99`; the last bin also holds the slowest 1%.
+
+        Returns:
+            The lower and upper bound and the count of every bin.
+        """
+        if not self.samples:
+            return []
+        lo, hi = self.min, self.p99
+        width = (hi - lo) / bins or 1
+        counts = [0] * bins
+        for s in self.samples:
+            counts[min(int((s - lo) / width), bins - 1)] += 1
+        return [(lo + i * width, lo + (i + 1) * width, c) for i, c in enumerate(counts)]
+
+    def to_dict(self, histogram: bool = True) -> dict[str, Any]:
+        """Everything but the samples, for `BenchmarkReport`."""
+        result: dict[str, Any] = {
+            "calls": self.count,
+            "elapsed_s": self.elapsed,
+            "overhead_ns": self.overhead,
+            "min_ns": self.min,
+            "median_ns": self.median,
+            "mean_ns": self.mean,
+            "p99_ns": self.p99,
+            "max_ns": self.max,
+            "calls_per_second": self.calls_per_second,
+        }
+        if histogram:
+            result["histogram"] = [
+                {"from_ns": lo, "to_ns": hi, "count": c}
+                for lo, hi, c in self.histogram()
+            ]
+        return result
+
+
+@dataclasses.dataclass
+class BenchmarkLevel:
+    """Result of calling an export from a number of workers at once."""
+
+    workers: int
+    stats: BenchmarkStats
+    """Calls of all the workers; `calls_per_second` is the aggregate."""
+
+    per_worker: list[BenchmarkStats]
+
+    @classmethod
+    def from_samples(
+        cls, results: Sequence[tuple[Sequence[int], float]], overhead: float
+    ) -> BenchmarkLevel:
+        """Merges the samples and elapsed seconds of every worker.
+
+        Workers start together, so the slowest one gives the total time.
+        """
+        per_worker = [BenchmarkStats.from_samples(s, overhead, e) for s, e in results]
+        stats = BenchmarkStats(
+            array.array("d", heapq.merge(*(w.samples for w in per_worker))),
+            overhead,
+            max(e for _, e in results),
+        )
+        return cls(len(results), stats, per_worker)
+
+    def to_dict(self) -> dict[str, Any]:
+        """Statistics of the level and of every worker."""
+        return {
+            "workers": self.workers,
+            **self.stats.to_dict(),
+            "per_worker": [w.to_dict(histogram=False) for w in self.per_worker],
+        }
+
+
+@dataclasses.dataclass
+class BenchmarkReport:
+    """Result of a `Benchmark`, saved as JSON."""
+
+    target: BenchmarkTarget
+    settings: BenchmarkSettings
+    levels: list[BenchmarkLevel]
+    """One per number of workers, fewer if the benchmark was stopped."""
+
+    timestamp: str = dataclasses.field(
+        default_factory=lambda: datetime.datetime.now().isoformat(timespec="seconds")
+    )
+
+    def to_dict(self) -> dict[str, Any]:
+        """Machine-readable form of the report."""
+        return {
+            "timestamp": self.timestamp,
+            "platform": platform.platform(),
+            "python": platform.python_version(),
+            "target": self.target._asdict(),
+            "settings": self.settings._asdict(),
+            "levels": [level.to_dict() for level in self.levels],
+        }
+
+    def save(self, path: Optional[str] = None) -> str:
+        """Writes the report to `path`, a new file in `REPORTS_DIR` by default.
+
+        Returns:
+            The path written to.
+        """
+        if path is None:
+            lib = os.path.basename(self.target.lib_path)
+            stamp = self.timestamp.replace(":", "")
+            name = re.sub(r"[^\w.@-]+", "_", f"{lib}-{self.target.name_or_ord}")
+            os.makedirs(REPORTS_DIR, exist_ok=True)
+            path = os.path.join(REPORTS_DIR, f"{name[:100]}-{stamp}.json")
+        with open(path, "w", encoding="utf-8") as fp:
+            json.dump(self.to_dict(), fp, indent=2)
+        return path
+
+
+def _work(
+    target: BenchmarkTarget,
+    settings: BenchmarkSettings,
+    barrier: Any,
+    cancel: Any,
+    progress: Optional[Callable[[float], None]] = None,
+) -> tuple[array.array, float]:
+    """Runs in every worker; each one uses its own argument objects.
+
+    Warms up, then waits for the others at `barrier` so that all of them
+    call at once. The barrier is broken on errors, failing the others too.
+    """
+    try:
+        func, plan = target.resolve()
+        args = plan.encode([value for _, value in target.args])
+        try:
+            measure(func, args, settings.warmup)
+            barrier.wait()
+            return measure(
+                func, args, settings.calls, settings.seconds, cancel, progress
+            )
+        finally:
+            plan.release(args)
+    except Exception:
+        barrier.abort()
+        raise
+
+
+def _run_threads(
+    target: BenchmarkTarget,
+    settings: BenchmarkSettings,
+    workers: int,
+    cancel: threading.Event,
+    progress: Optional[Callable[[float], None]],
+) -> list[tuple[array.array, float]]:
+    """Calls from `workers` threads at once. Ctypes releases the GIL."""
+    barrier = threading.Barrier(workers)
+    results: list[Any] = [None] * workers
+
+    def work(i: int):
+        try:
+            results[i] = _work(
+                target, settings, barrier, cancel, progress if i == 0 else None
+            )
+        except Exception as e:  # pylint: disable=broad-except
+            results[i] = e
+
+    threads = [threading.Thread(target=work, args=(i,)) for i in range(workers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    for result in results:
+        if isinstance(result, Exception) and not isinstance(
+            result, threading.BrokenBarrierError
+        ):
+            raise result
+    return results
+
+
+def _process(
+    target: BenchmarkTarget,
+    settings: BenchmarkSettings,
+    barrier: Any,
+    cancel: Any,
+    que: multiprocessing.Queue,
+    report_progress: bool,
+):
+    """Entry point of the worker processes.
+
+    Progress is put into `que` as floats, at most once per percent, by the
+    worker which has `report_progress` set; results are tuples.
+    """
+    progress: Optional[Callable[[float], None]] = None
+    if report_progress:
+        last = -1.0
+
+        def put_progress(fraction: float):
+            nonlocal last
+            if fraction - last >= 0.01:
+                last = fraction
+                que.put(fraction)
+
+        progress = put_progress
+    try:
+        que.put(_work(target, settings, barrier, cancel, progress))
+    except Exception as e:  # pylint: disable=broad-except
+        que.put(e)
+
+
+def _run_processes(
+    target: BenchmarkTarget,
+    settings: BenchmarkSettings,
+    workers: int,
+    cancel: threading.Event,
+    progress: Optional[Callable[[float], None]],
+) -> list[tuple[array.array, float]]:
+    """Calls from `workers` processes at once.
+
+    Processes are spawned rather than forked, forking a Tk app is unsafe.
+    Progress of the first worker is forwarded to `progress`.
+
+    Raises:
+        ChildProcessError: When a worker crashes.
+    """
+    ctx = multiprocessing.get_context("spawn")
+    barrier, stop, que = ctx.Barrier(workers), ctx.Event(), ctx.Queue()
+    processes = [
+        ctx.Process(
+            target=_process,
+            args=(target, settings, barrier, stop, que, i == 0),
+            daemon=True,
+        )
+        for i in range(workers)
+    ]
+    for process in processes:
+        process.start()
+    results: list[Any] = []
+    try:
+        while len(results) < workers:
+            if cancel.is_set():
+                stop.set()
+            try:
+                item = que.get(timeout=0.1)
+            except queue.Empty:
+                pass
+            else:
+                if not isinstance(item, float):
+                    results.append(item)
+                elif progress is not None:
+                    progress(item)
+                continue
+            for process in processes:
+                if process.exitcode:
+                    raise ChildProcessError(
+                        f"Worker process exited with code {process.exitcode}"
+                    )
+    finally:
+        barrier.abort()
+        stop.set()
+        for process in processes:
+            process.join(1)
+            if process.is_alive():
+                process.terminate()
+    for result in results:
+        if isinstance(result, Exception) and not isinstance(
+            result, threading.BrokenBarrierError
+        ):
+            raise result
+    return results
+
+
+def run_benchmark(
+    target: BenchmarkTarget,
+    settings: BenchmarkSettings,
+    cancel: Optional[threading.Event] = None,
+    progress: Optional[Callable[[float], None]] = None,
+) -> BenchmarkReport:
+    """Calibrates the call overhead and benchmarks `target` with 1, 2 ...
+    `settings.workers` workers calling at once. Every worker makes
+    `settings.calls` calls or calls for `settings.seconds`.
+
+    Raises:
+        ValueError: When an argument is invalid, before any call is made.
+    """
+    _, plan = target.resolve()
+    plan.release(plan.encode([value for _, value in target.args]))
+    if cancel is None:
+        cancel = threading.Event()
+    overhead = calibrate()
+    levels: list[BenchmarkLevel] = []
+    for workers in range(1, settings.workers + 1):
+        done = len(levels) / settings.workers
+
+        def level_progress(fraction: float, done: float = done):
+            if progress is not None:
+                progress(done + fraction / settings.workers)
+
+        if settings.processes:
+            results = _run_processes(target, settings, workers, cancel, level_progress)
+        else:
+            results = _run_threads(target, settings, workers, cancel, level_progress)
+        levels.append(BenchmarkLevel.from_samples(results, overhead))
+        if cancel.is_set():
+            break
+        if progress is not None:
+            progress(len(levels) / settings.workers)
+    return BenchmarkReport(target, settings, levels)
+
+
+class Benchmark(threading.Thread):
+    """Runs `run_benchmark` in a separate thread.
+
+    Pushes progress (a float from 0 to 1) into `que`, then the
+    `BenchmarkReport` or an exception.
+    """
+
+    def __init__(
+        self, que: queue.Queue, target: BenchmarkTarget, settings: BenchmarkSettings
+    ) -> None:
+        super().__init__(daemon=True)
+        self.__queue = que
+        self.__target = target
+        self.__settings = settings
+        self.cancel = threading.Event()
+
+    def run(self):
+        """Benchmarks and saves the report."""
+        try:
+            report = run_benchmark(
+                self.__target, self.__settings, self.cancel, self.__queue.put
+            )
+            report.save()
+        except Exception as e:  # pylint: disable=broad-except
+            self.__queue.put(e)
+        else:
+            self.__queue.put(report)
+
+
+def format_ns(ns: float) -> str:
+    """Formats a duration with a suitable unit."""
+    if math.isnan(ns):
+        return "-"
+    for unit, scale in (("s", 1e9), ("ms", 1e6), ("µs", 1e3)):
+        if ns >= scale:
+            return f"{ns / scale:.3g} {unit}"
+    return f"{ns:.3g} ns"
+
+
+class BenchmarkWindow(tk.Toplevel):
+    """Calls an export repeatedly and shows latency statistics.
+
+    Opened by the **Benchmark** button next to **Run**. Calls are timed one
+    by one in a `Benchmark` thread after a warm-up; the overhead of a bare
+    ctypes call is measured and subtracted. The report is saved as JSON in
+    `REPORTS_DIR` and can be saved elsewhere too.
+
+    With more than one worker, the export is called from 1, 2 ... N threads
+    or processes at once. Every level gets a row with its aggregate
+    throughput, speed-up and latency; selecting one shows its statistics.
+    """
+
+    STATS = ("Min", "Median", "Mean", "p99", "Max", "Calls/s", "Overhead")
+    LEVELS = ("Workers", "Calls/s", "Speed-up", "Median", "p99", "Worst p99")
+
+    def __init__(self, _: tk.Window, target: BenchmarkTarget):
+        log.debug("Initialising")
+        super().__init__(title=f"Benchmark - {target.name_or_ord}", toolwindow=True)
+        self.withdraw()
+        self.minsize(450, 450)
+        self.__target = target
+        self.__thread: Optional[Benchmark] = None
+        self.__report: Optional[BenchmarkReport] = None
+        self.__after_id: Optional[str] = None
+        self.__level: Optional[BenchmarkLevel] = None
+        self.__mode = tk.StringVar(value="calls")
+        self.__calls = tk.StringVar(value="10000")
+        self.__seconds = tk.StringVar(value="1")
+        self.__warmup = tk.StringVar(value="100")
+        self.__workers = tk.StringVar(value="1")
+        self.__processes = tk.BooleanVar(value=False)
+        self.__status = tk.StringVar()
+        self.__stats = {s: tk.StringVar(value="-") for s in self.STATS}
+
+        sf = _TrLabelFrame(self, text="Settings")
+        ttk.Radiobutton(
+            sf, text=MsgCat.translate("Calls"), variable=self.__mode, value="calls"
+        ).grid(row=0, column=0, sticky="w", padx=5, pady=5)
+        ttk.Entry(sf, textvariable=self.__calls, width=12).grid(row=0, column=1)
+        ttk.Radiobutton(
+            sf, text=MsgCat.translate("Seconds"), variable=self.__mode, value="seconds"
+        ).grid(row=0, column=2, sticky="w", padx=5, pady=5)
+        ttk.Entry(sf, textvariable=self.__seconds, width=8).grid(row=0, column=3)
+        _TrLabel(sf, text="Warm-up calls").grid(row=1, column=0, sticky="w", padx=5)
+        ttk.Entry(sf, textvariable=self.__warmup, width=12).grid(
+            row=1, column=1, pady=(0, 5)
+        )
+        _TrLabel(sf, text="Workers").grid(row=2, column=0, sticky="w", padx=5)
+        ttk.Spinbox(sf, textvariable=self.__workers, from_=1, to=256, width=10).grid(
+            row=2, column=1, pady=(0, 5)
+        )
+        ttk.Checkbutton(
+            sf, text=MsgCat.translate("Processes"), variable=self.__processes
+        ).grid(row=2, column=2, columnspan=2, sticky="w", padx=5, pady=(0, 5))
+        self.sb = _TrButton(sf, text="Start", command=self.start)
+        self.sb.grid(row=0, column=4, rowspan=3, padx=5)
+
+        self.pb = ttk.Progressbar(self, maximum=1.0)
+
+        self.lv = lv = ttk.Treeview(
+            self, columns=self.LEVELS, show="headings", height=4, selectmode="browse"
+        )
+        for column in self.LEVELS:
+            lv.heading(column, text=MsgCat.translate(column))
+            lv.column(column, width=70, anchor="e")
+        lv.bind("<<TreeviewSelect>>", self.level_selected)
+
+        rf = _TrLabelFrame(self, text="Results")
+        for i, stat in enumerate(self.STATS):
+            row, col = divmod(i, 4)
+            _TrLabel(rf, text=stat).grid(row=row, column=2 * col, sticky="w", padx=5)
+            ttk.Label(rf, textvariable=self.__stats[stat], width=10).grid(
+                row=row, column=2 * col + 1, sticky="w"
+            )
+        self.canvas = tk.Canvas(rf, height=160, highlightthickness=0)
+        self.canvas.grid(row=2, column=0, columnspan=8, sticky="nsew", pady=5)
+        self.canvas.bind("<Configure>", lambda *_: self.draw_histogram())
+        rf.columnconfigure(7, weight=1)
+        rf.rowconfigure(2, weight=1)
+
+        bottom = ttk.Frame(self)
+        self.rb = _TrButton(
+            bottom, text="Save report", command=self.save_report, state="disabled"
+        )
+        self.rb.pack(side="right", padx=5)
+        ttk.Label(bottom, textvariable=self.__status).pack(side="left", padx=5)
+
+        sf.pack(fill="x", padx=5, pady=5)
+        self.pb.pack(fill="x", padx=5)
+        lv.pack(fill="x", padx=5, pady=(5, 0))
+        rf.pack(fill="both", expand=True, padx=5, pady=5)
+        bottom.pack(fill="x", pady=(0, 5))
+
+        self.place_window_center()
+        self.deiconify()
+        self.focus_set()
+        log.debug("Initialised")
+
+    def settings(self) -> BenchmarkSettings:
+        """Reads the settings.
+
+        Raises:
+            ValueError: When a number is invalid.
+        """
+        warmup = int(self.__warmup.get())
+        workers = int(self.__workers.get())
+        if warmup < 0 or workers <= 0:
+            raise ValueError("Number of warm-up calls and workers must be positive")
+        common = {
+            "warmup": warmup,
+            "workers": workers,
+            "processes": self.__processes.get(),
+        }
+        if self.__mode.get() == "calls":
+            calls = int(self.__calls.get())
+            if calls <= 0:
+                raise ValueError("Number of calls must be positive")
+            return BenchmarkSettings(calls=calls, **common)
+        seconds = float(self.__seconds.get())
+        if seconds <= 0:
+            raise ValueError("Number of seconds must be positive")
+        return BenchmarkSettings(seconds=seconds, **common)
+
+    def start(self):
+        """Starts a `Benchmark` thread, or stops the running one."""
+        if self.__thread is not None:
+            self.__thread.cancel.set()
+            return
+        try:
+            settings = self.settings()
+        except ValueError as e:
+            Messagebox.show_error(str(e), "Invalid settings", parent=self)
+            return
+        que: queue.Queue = queue.Queue()
+        self.__thread = thread = Benchmark(que, self.__target, settings)
+        self.sb.configure(text=MsgCat.translate("Stop"))
+        self.rb.configure(state="disabled")
+        self.pb.configure(value=0)
+        self.__status.set(MsgCat.translate("Running..."))
+        thread.start()
+        self.__after_id = self.after(100, self.process_queue, que)
+
+    def process_queue(self, que: queue.Queue):
+        """Shows the progress and the report of the `Benchmark` thread.
+
+        Reschedules itself every 100ms till the thread is done.
+        """
+        self.__after_id = None
+        if not self.winfo_exists():
+            return
+        while True:
+            try:
+                item = que.get_nowait()
+            except queue.Empty:
+                self.__after_id = self.after(100, self.process_queue, que)
+                return
+            if isinstance(item, float):
+                self.pb.configure(value=item)
+                continue
+            break
+        self.__thread = None
+        self.sb.configure(text=MsgCat.translate("Start"))
+        self.pb.configure(value=1.0)
+        if isinstance(item, BenchmarkReport):
+            self.show_report(item)
+        else:
+            log.exception(item)
+            self.__status.set(f"{type(item).__name__}: {item}")
+
+    def show_report(self, report: BenchmarkReport):
+        """Lists the levels of `report` and selects the first one."""
+        self.__report = report
+        lv = self.lv
+        lv.delete(*lv.get_children())
+        if not report.levels:
+            self.__status.set(MsgCat.translate("Stopped"))
+            return
+        single = report.levels[0].stats.calls_per_second
+        for i, level in enumerate(report.levels):
+            stats = level.stats
+            lv.insert(
+                "",
+                "end",
+                iid=str(i),
+                values=(
+                    level.workers,
+                    f"{stats.calls_per_second:,.0f}",
+                    f"{stats.calls_per_second / single:.2f}x",
+                    format_ns(stats.median),
+                    format_ns(stats.p99),
+                    format_ns(max(w.p99 for w in level.per_worker)),
+                ),
+            )
+        lv.selection_set("0")
+        self.rb.configure(state="normal")
+
+    def level_selected(self, *_):
+        """Shows the statistics and the histogram of the selected level."""
+        selection = self.lv.selection()
+        if self.__report is None or not selection:
+            return
+        self.__level = level = self.__report.levels[int(selection[0])]
+        stats = level.stats
+        for stat, ns in zip(
+            self.STATS, (stats.min, stats.median, stats.mean, stats.p99, stats.max)
+        ):
+            self.__stats[stat].set(format_ns(ns))
+        self.__stats["Calls/s"].set(f"{stats.calls_per_second:,.0f}")
+        self.__stats["Overhead"].set(format_ns(stats.overhead))
+        self.__status.set(
+            f"{stats.count} calls by {level.workers} worker(s) in {stats.elapsed:.3f}s"
+        )
+        self.draw_histogram()
+
+    def draw_histogram(self):
+        """Draws the latency histogram of the selected level."""
+        canvas = self.canvas
+        canvas.delete("all")
+        if self.__level is None or not self.__level.stats.count:
+            return
+        bins = self.__level.stats.histogram()
+        width, height = canvas.winfo_width(), canvas.winfo_height()
+        top = max(c for _, _, c in bins) or 1
+        bar_width = width / len(bins)
+        colors = tk.Style().colors
+        fg, text = colors.primary, colors.fg
+        for i, (_, _, count) in enumerate(bins):
+            h = (height - 20) * count / top
+            x = i * bar_width
+            canvas.create_rectangle(
+                x + 1, height - 20 - h, x + bar_width - 1, height - 20, fill=fg, width=0
+            )
+        canvas.create_text(
+            0, height, anchor="sw", text=format_ns(bins[0][0]), fill=text
+        )
+        canvas.create_text(
+            width, height, anchor="se", text=f"≥ {format_ns(bins[-1][0])}", fill=text
+        )
+
+    def save_report(self):
+        """Saves the last report as JSON wherever the user wants."""
+        if self.__report is None:
+            return
+        path = filedialog.asksaveasfilename(
+            parent=self,
+            title="Save benchmark report",
+            defaultextension=".json",
+            filetypes=[("JSON", "*.json")],
+        )
+        if path:
+            try:
+                self.__report.save(path)
+            except OSError as e:
+                log.exception(e)
+                Messagebox.show_error(f"Failed to save: {e}", "Error", parent=self)
+
+    def destroy(self):
+        """Stops benchmarking and polling its queue before getting destroyed."""
+        if self.__after_id is not None:
+            self.after_cancel(self.__after_id)
+            self.__after_id = None
+        if self.__thread is not None:
+            self.__thread.cancel.set()
+        super().destroy()
@@ -0,0 +1,300 @@
+#!/usr/bin/env python3
+
+"""
+dycall.browser
+~~~~~~~~~~~~~~
+
+Contains `ScopeTree` and `ScopeBrowser`.
+"""
+
+from __future__ import annotations
+
+import array
+import logging
+import re
+import time
+from typing import NamedTuple, Sequence
+
+try:
+    from typing import Final  # type: ignore
+except ImportError:
+    # pylint: disable=ungrouped-imports
+    from typing_extensions import Final  # type: ignore
+
+from ttkbootstrap import ttk
+from ttkbootstrap.localization import MessageCatalog as MsgCat
+
+log = logging.getLogger(__name__)
+
+_SPECIAL = re.compile(
+    r"^(?:(?:non-virtual |virtual |covariant return )thunk to "
+    r"|(?:vtable|VTT|typeinfo(?: name)?|construction vtable|guard variable"
+    r"|TLS (?:init|wrapper) function|transaction clone|hidden alias"
+    r"|reference temporary #\d+) for )+"
+)
+"""Prefixes of the names of special symbols, e.g. `vtable for Foo`."""
+
+_OPERATOR = re.compile(
+    r"operator(?:\(\)|\[\]|<<?=?|[^\w\s(<]+|\s[^()<]+(?=[(<]))(?: (?=<))?"
+)
+_TEMPLATE = re.compile(r"<[^<>]*>|\{[^{}]*\}")
+_GROUP = re.compile(r"\([^()]*\)")
+
+_OPEN: Final = "\x01"
+_CLOSE: Final = "\x02"
+
+
+def _mask(match: re.Match) -> str:
+    return "#" * len(match.group())
+
+
+def _mask_group(match: re.Match) -> str:
+    return _OPEN + "#" * (len(match.group()) - 2) + _CLOSE
+
+
+def split_scope(name: str) -> tuple[str, ...]:
+    """Splits a demangled name into its scopes, e.g. `ns::Foo::bar(int)`
+    gives `("ns", "Foo", "bar")`.
+
+    Return types, parameters and qualifiers are dropped. The scopes of special
+    symbols are the ones of the symbol they are for. Template arguments and
+    the parameters of enclosing functions are kept, `::` inside them isn't a
+    separator. Names of C functions and variables are returned as is.
+    """
+    special = _SPECIAL.match(name)
+    start = special.end() if special else 0
+    end = name.find("(", start)
+    if (
+        "<" in name
+        or "{" in name
+        or "operator" in name
+        or ")::" in name
+        or (end != -1 and name.find("(", end + 1) != -1)
+    ):
+        scopes = _split_nested(name, start)
+    else:
+        if end == -1:
+            end = len(name)
+        begin = max(start, name.rfind(" ", start, end) + 1)
+        scopes = name[begin:end].split("::")
+    if "" in scopes:  # Not a function or a variable, e.g. a function type
+        return (name[start:],)
+    return tuple(scopes)
+
+
+def _split_nested(name: str, start: int) -> list[str]:
+    """`split_scope` for names with templates, operators or nested groups."""
+    # Mask everything nested with characters which can't be separators
+    masked = name
+    if "operator" in masked:
+        masked = _OPERATOR.sub(_mask, masked)
+    while "<" in masked or "{" in masked:
+        unmasked, masked = masked, _TEMPLATE.sub(_mask, masked)
+        if masked == unmasked:  # Unbalanced, e.g. `operator<` slipped through
+            break
+    while "(" in masked:
+        unmasked, masked = masked, _GROUP.sub(_mask_group, masked)
+        if masked == unmasked:
+            break
+
+    # The parameters are the first group not followed by another scope
+    end = masked.find(_OPEN, start)
+    while end != -1:
+        close = masked.find(_CLOSE, end)
+        if close == -1 or not masked.startswith("::", close + 1):
+            break
+        end = masked.find(_OPEN, close)
+    if end == -1:
+        end = len(masked)
+    # Skip the return type, calling convention etc.
+    start = max(start, masked.rfind(" ", start, end) + 1)
+
+    scopes = []
+    while True:
+        sep = masked.find("::", start, end)
+        if sep == -1:
+            scopes.append(name[start:end])
+            return scopes
+        scopes.append(name[start:sep])
+        start = sep + 2
+
+
+class ScopeNode(NamedTuple):
+    """A namespace, class or function in a `ScopeTree`, or an export."""
+
+    name: str
+    """The scope, or the demangled name of an export."""
+
+    depth: int
+    """Number of enclosing scopes."""
+
+    lo: int
+    """Position of the first export under this node in `ScopeTree.order`."""
+
+    hi: int
+    """Position after the last export under this node."""
+
+    row: int = -1
+    """Index of the export, -1 for scopes."""
+
+    @property
+    def size(self) -> int:
+        """Number of exports under this node."""
+        return self.hi - self.lo
+
+    @property
+    def is_export(self) -> bool:
+        """Whether this is an export rather than a scope."""
+        return self.row != -1
+
+
+class ScopeTree:
+    """Groups the exports of a C++ library by namespace, class and overloads.
+
+    Every demangled name is parsed once by `split_scope`; the exports are then
+    sorted by their scopes, so that the exports under any node are a range of
+    `order`, i.e. a flattened prefix trie. Only the range is stored per node,
+    nodes are built by `children` when they are expanded. Counts come for free.
+
+    Scopes with only one export are collapsed into the export itself, e.g. C
+    functions or methods which aren't overloaded.
+    """
+
+    def __init__(self, names: Sequence[str]) -> None:
+        start = time.perf_counter()
+        self.__names = names
+        interned: dict[str, str] = {}
+        intern = interned.setdefault
+        self.__paths = paths = [
+            tuple(map(intern, scopes, scopes)) for scopes in map(split_scope, names)
+        ]
+        # Joined scopes sort like the tuples but compare a lot faster
+        keys = ["\0".join(path) for path in paths]
+        self.order = array.array("I", sorted(range(len(keys)), key=keys.__getitem__))
+        log.debug(
+            "Parsed %d names into %d scopes in %.3fs",
+            len(paths),
+            len(interned),
+            time.perf_counter() - start,
+        )
+
+    def __len__(self) -> int:
+        """Number of exports."""
+        return len(self.order)
+
+    @property
+    def root(self) -> ScopeNode:
+        """The global namespace."""
+        return ScopeNode("", 0, 0, len(self.order))
+
+    def children(self, node: ScopeNode) -> list[ScopeNode]:
+        """The scopes and exports directly under `node`, sorted.
+
+        Exports whose innermost scope is `node`, i.e. overloads, come first.
+        Takes O(number of children * log(size)).
+        """
+        if node.is_export:
+            return []
+        names, paths, order = self.__names, self.__paths, self.order
+        depth, lo, hi = node.depth, node.lo, node.hi
+        children = []
+        while lo < hi and len(paths[order[lo]]) == depth:
+            row = order[lo]
+            children.append(ScopeNode(names[row], depth, lo, lo + 1, row))
+            lo += 1
+        while lo < hi:
+            row = order[lo]
+            scope = paths[row][depth]
+            end = self.__end(scope, depth, lo + 1, hi)
+            if end == lo + 1 and len(paths[row]) == depth + 1:
+                children.append(ScopeNode(names[row], depth + 1, lo, end, row))
+            else:
+                children.append(ScopeNode(scope, depth + 1, lo, end))
+            lo = end
+        return children
+
+    def __end(self, scope: str, depth: int, lo: int, hi: int) -> int:
+        """Position of the first export after `lo` not in `scope`."""
+        paths, order = self.__paths, self.order
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if paths[order[mid]][depth] == scope:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+
+class ScopeBrowser(ttk.Frame):
+    """Shows a `ScopeTree` in a `ttk.Treeview`.
+
+    Nodes get a placeholder child till they are expanded. At most `CHUNK`
+    children are inserted at once, selecting the "more" item after them
+    inserts the next chunk.
+    """
+
+    CHUNK = 1000
+    """Number of children inserted at once."""
+
+    def __init__(self, master, tree: ScopeTree):
+        super().__init__(master)
+        self.__tree = tree
+        self.__nodes: dict[str, ScopeNode] = {}
+        self.__pending: dict[str, tuple[str, list[ScopeNode], int]] = {}
+        self.tv = tv = ttk.Treeview(self, columns=("count",), selectmode="extended")
+        tv.heading("#0", text=MsgCat.translate("Scope"))
+        tv.heading("count", text=MsgCat.translate("Exports"))
+        tv.column("#0", stretch=True, width=400)
+        tv.column("count", stretch=False, width=80, anchor="e")
+        sb = ttk.Scrollbar(self, command=tv.yview)
+        tv.configure(yscrollcommand=sb.set)
+        sb.pack(side="right", fill="y")
+        tv.pack(side="left", fill="both", expand=True)
+        tv.bind("<<TreeviewOpen>>", lambda *_: self.expand(tv.focus()))
+        tv.bind("<<TreeviewSelect>>", self.selected)
+        self.insert_children("", tree.root)
+
+    @property
+    def selection(self) -> list[str]:
+        """Demangled names of the selected exports."""
+        nodes = self.__nodes
+        return [
+            nodes[iid].name
+            for iid in self.tv.selection()
+            if iid in nodes and nodes[iid].is_export
+        ]
+
+    def expand(self, iid: str):
+        """Replaces the placeholder child of a node by its children."""
+        node = self.__nodes.get(iid)
+        children = self.tv.get_children(iid)
+        if node is not None and len(children) == 1 and children[0] not in self.__nodes:
+            self.tv.delete(children[0])
+            self.insert_children(iid, node)
+
+    def insert_children(self, parent: str, node: ScopeNode):
+        """Inserts the first `CHUNK` children of `node` under `parent`."""
+        self.__insert(parent, self.__tree.children(node), 0)
+
+    def __insert(self, parent: str, children: list[ScopeNode], start: int):
+        tv, nodes = self.tv, self.__nodes
+        stop = min(start + self.CHUNK, len(children))
+        for child in children[start:stop]:
+            if child.is_export:
+                iid = tv.insert(parent, "end", text=child.name)
+            else:
+                iid = tv.insert(parent, "end", text=child.name, values=(child.size,))
+                tv.insert(iid, "end", text="...")
+            nodes[iid] = child
+        if stop < len(children):
+            more = MsgCat.translate("{} more...").format(len(children) - stop)
+            iid = tv.insert(parent, "end", text=more)
+            self.__pending[iid] = (parent, children, stop)
+
+    def selected(self, *_):
+        """Inserts the next chunk of children when "more" is selected."""
+        for iid in self.tv.selection():
+            pending = self.__pending.pop(iid, None)
+            if pending is not None:
+                self.tv.delete(iid)
+                self.__insert(*pending)
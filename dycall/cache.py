@@ -0,0 +1,340 @@
+#!/usr/bin/env python3
+
+"""
+dycall.cache
+~~~~~~~~~~~~
+
+Contains `ExportCache` and `DemangleStore`.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import struct
+import tempfile
+from typing import NamedTuple, Optional
+
+try:
+    from typing import Final  # type: ignore
+except ImportError:
+    # pylint: disable=ungrouped-imports
+    from typing_extensions import Final  # type: ignore
+
+from dycall.store import ExportStore
+from dycall.util import DemangleCache
+
+log = logging.getLogger(__name__)
+
+MAGIC: Final = b"DYCX"
+VERSION: Final = 3
+
+# magic, version, kind, size, mtime_ns, content hash, count, pool size
+_HEADER: Final = struct.Struct("<4sHcQq16sII")
+
+# address, name offset, name length, demangled offset, demangled length,
+# forwarder offset, forwarder length, ordinal, flags, size, info
+_RECORD: Final = struct.Struct("<QIIIIIIiIQB")
+
+_FLAG_DEMANGLE_FAILED: Final = 1
+
+DEMANGLE_MAGIC: Final = b"DYCD"
+DEMANGLE_VERSION: Final = 1
+
+# magic, version, count, pool size
+_DEMANGLE_HEADER: Final = struct.Struct("<4sHII")
+
+# name offset, name length, demangled offset, demangled length, flags
+_DEMANGLE_RECORD: Final = struct.Struct("<IIIII")
+
+_SAMPLE_SIZE: Final = 64 * 1024
+
+
+class CachedLibrary(NamedTuple):
+    """Returned by `ExportCache.get` on a cache hit."""
+
+    kind: str
+    """`ExportCache.ELF` or `ExportCache.PE`."""
+
+    exports: ExportStore
+
+
+def content_hash(path: str, size: int) -> bytes:
+    """A fast 128-bit hash of the start, middle and end of a file.
+
+    Hashing a few MBs of a 200+ MB library would defeat the purpose of the
+    cache; size and mtime are checked too, so sampling is good enough.
+    """
+    h = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as fp:
+        for offset in (0, (size - _SAMPLE_SIZE) // 2, size - _SAMPLE_SIZE):
+            fp.seek(max(offset, 0))
+            h.update(fp.read(_SAMPLE_SIZE))
+    return h.digest()
+
+
+class ExportCache:
+    """Persistent on-disk cache of parsed export tables.
+
+    Each library gets its own file in `dirpath` named after a hash of its
+    absolute path. The file header stores the size, mtime and `content_hash`
+    of the library; an entry is used only if all three still match. This
+    means that a rebuilt library overwrites its stale entry.
+
+    Files are written to a temporary file first and then atomically renamed,
+    hence multiple DyCall instances can share the cache. A file is read in
+    one go and decoded into an `ExportStore`, nothing refers to it after.
+
+    File layout (little-endian):
+    - Header (see `_HEADER`).
+    - Fixed size records, one for each export (see `_RECORD`).
+    - A UTF-8 string pool which the records point into.
+    """
+
+    ELF: Final = "E"
+    PE: Final = "P"
+
+    def __init__(self, dirpath: str) -> None:
+        self.__dirpath = dirpath
+
+    def entry_path(self, path: str) -> str:
+        """Returns the path of the cache file for the library at `path`."""
+        key = hashlib.blake2b(
+            os.path.abspath(path).encode("utf-8", errors="surrogateescape"),
+            digest_size=16,
+        ).hexdigest()
+        return os.path.join(self.__dirpath, f"{key}.bin")
+
+    @staticmethod
+    def identity(path: str) -> tuple[int, int, bytes]:
+        """Returns the size, mtime (in ns) and `content_hash` of a library."""
+        st = os.stat(path)
+        return st.st_size, st.st_mtime_ns, content_hash(path, st.st_size)
+
+    def get(self, path: str) -> Optional[CachedLibrary]:
+        """Returns the cached exports of a library or None on a cache miss.
+
+        The `ExportStore` is filled straight from the cache, nothing is
+        demangled and no `Export` objects are built.
+        """
+        try:
+            ident = self.identity(path)
+            with open(self.entry_path(path), "rb") as fp:
+                data = fp.read()
+            return self.__read(data, ident)
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError, struct.error) as e:
+            log.warning("Ignoring unreadable cache entry for %s: %r", path, e)
+        return None
+
+    def __read(self, data: bytes, ident: tuple) -> Optional[CachedLibrary]:
+        magic, version, kind, size, mtime, digest, count, _ = _HEADER.unpack_from(
+            data, 0
+        )
+        if magic != MAGIC or version != VERSION or (size, mtime, digest) != ident:
+            return None
+
+        kind = kind.decode("ascii")
+        start = _HEADER.size
+        pool = start + count * _RECORD.size
+        exports = ExportStore()
+        view = memoryview(data)[start:pool]
+        is_pe = kind == self.PE
+
+        def string(offset: int, length: int) -> str:
+            offset += pool
+            end = offset + length
+            return data[offset:end].decode("utf-8")
+
+        try:
+            exports.extend_records(
+                (
+                    addr,
+                    string(noff, nlen),
+                    string(doff, dlen),
+                    ordinal,
+                    string(foff, flen),
+                    bool(flags & _FLAG_DEMANGLE_FAILED),
+                    is_pe,
+                    size,
+                    info,
+                )
+                for (
+                    addr,
+                    noff,
+                    nlen,
+                    doff,
+                    dlen,
+                    foff,
+                    flen,
+                    ordinal,
+                    flags,
+                    size,
+                    info,
+                ) in _RECORD.iter_unpack(view)
+            )
+        finally:
+            view.release()
+        return CachedLibrary(kind, exports)
+
+    def put(self, path: str, kind: str, exports: ExportStore) -> None:
+        """Writes the exports of a library to the cache.
+
+        Failures are only logged, the cache is just an optimisation.
+        """
+        try:
+            ident = self.identity(path)
+            os.makedirs(self.__dirpath, exist_ok=True)
+            records, pool = self.__serialise(exports)
+            header = _HEADER.pack(
+                MAGIC, VERSION, kind.encode("ascii"), *ident, len(exports), len(pool)
+            )
+            fd, tmp = tempfile.mkstemp(dir=self.__dirpath, suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wb") as fp:
+                    fp.write(header)
+                    fp.write(records)
+                    fp.write(pool)
+                os.replace(tmp, self.entry_path(path))
+            except BaseException:
+                os.unlink(tmp)
+                raise
+        except (OSError, struct.error) as e:
+            log.warning("Failed to cache exports of %s: %r", path, e)
+        else:
+            log.debug("Cached %d exports of %s", len(exports), path)
+
+    @staticmethod
+    def __serialise(exports: ExportStore) -> tuple[bytes, bytes]:
+        records = bytearray()
+        pool = bytearray()
+        offsets: dict[str, tuple[int, int]] = {}
+
+        def intern(s: str) -> tuple[int, int]:
+            try:
+                return offsets[s]
+            except KeyError:
+                b = s.encode("utf-8")
+                offsets[s] = loc = (len(pool), len(b))
+                pool.extend(b)
+                return loc
+
+        for (
+            address,
+            name,
+            demangled,
+            ordinal,
+            forwarder,
+            failed,
+            _,
+            size,
+            info,
+        ) in exports.records():
+            records += _RECORD.pack(
+                address,
+                *intern(name),
+                *intern(demangled),
+                *intern(forwarder),
+                ordinal,
+                _FLAG_DEMANGLE_FAILED if failed else 0,
+                size,
+                info,
+            )
+        return bytes(records), bytes(pool)
+
+
+class DemangleStore:
+    """Persistent on-disk copy of a `dycall.util.DemangleCache`.
+
+    Loaded on startup and saved on exit, so that names demangled in earlier
+    sessions are cache hits. Written atomically like `ExportCache`, the last
+    instance of DyCall to exit wins.
+
+    File layout (little-endian):
+    - Header (see `_DEMANGLE_HEADER`).
+    - Fixed size records, least recently used first (see `_DEMANGLE_RECORD`).
+    - A UTF-8 string pool which the records point into.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.__path = path
+        self.__version = -1
+
+    def load(self, cache: DemangleCache) -> None:
+        """Adds the saved entries to `cache`, failures are only logged."""
+        try:
+            with open(self.__path, "rb") as fp:
+                data = fp.read()
+            magic, version, count, _ = _DEMANGLE_HEADER.unpack_from(data, 0)
+            if magic != DEMANGLE_MAGIC or version != DEMANGLE_VERSION:
+                return
+            start = _DEMANGLE_HEADER.size
+            pool = start + count * _DEMANGLE_RECORD.size
+            records = _DEMANGLE_RECORD.iter_unpack(memoryview(data)[start:pool])
+
+            def string(offset: int, length: int) -> str:
+                offset += pool
+                end = offset + length
+                return data[offset:end].decode("utf-8")
+
+            cache.put_many(
+                (
+                    string(noff, nlen),
+                    None if flags & _FLAG_DEMANGLE_FAILED else string(doff, dlen),
+                )
+                for noff, nlen, doff, dlen, flags in records
+            )
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError, struct.error) as e:
+            log.warning("Ignoring unreadable demangle cache %s: %r", self.__path, e)
+        else:
+            log.debug("Loaded %d demangled names", count)
+        self.__version = cache.version
+
+    def save(self, cache: DemangleCache) -> None:
+        """Writes the entries of `cache` if they changed since `load`.
+
+        Failures are only logged, the cache is just an optimisation.
+        """
+        if cache.version == self.__version:
+            return
+        items = cache.items()
+        records = bytearray()
+        pool = bytearray()
+        for name, demangled in items:
+            b = name.encode("utf-8")
+            name_at = (len(pool), len(b))
+            pool += b
+            b = b"" if demangled is None else demangled.encode("utf-8")
+            records += _DEMANGLE_RECORD.pack(
+                *name_at,
+                len(pool),
+                len(b),
+                _FLAG_DEMANGLE_FAILED if demangled is None else 0,
+            )
+            pool += b
+        dirpath = os.path.dirname(self.__path)
+        try:
+            os.makedirs(dirpath, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=dirpath, suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wb") as fp:
+                    fp.write(
+                        _DEMANGLE_HEADER.pack(
+                            DEMANGLE_MAGIC, DEMANGLE_VERSION, len(items), len(pool)
+                        )
+                    )
+                    fp.write(records)
+                    fp.write(pool)
+                os.replace(tmp, self.__path)
+            except BaseException:
+                os.unlink(tmp)
+                raise
+        except OSError as e:
+            log.warning("Failed to save demangle cache: %r", e)
+        else:
+            self.__version = cache.version
+            log.debug("Saved %d demangled names", len(items))
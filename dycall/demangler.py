@@ -7,14 +7,23 @@ dycall.demangler
 Contains `DemanglerWindow`.
 """
 
+from __future__ import annotations
+
+import functools
+import io
 import logging
+import os
+import queue
+import threading
+from tkinter import filedialog
+from typing import Iterable, Optional
 
 import ttkbootstrap as tk
 from ttkbootstrap import ttk
 from ttkbootstrap.dialogs import Messagebox
 
 from dycall._widgets import _TrButton, _TrLabel
-from dycall.util import CopyButton, DemangleError, demangle
+from dycall.util import CopyButton, VirtualListbox, demangle_many, demangle_text
 
 log = logging.getLogger(__name__)
 
@@ -23,7 +32,11 @@ class DemanglerWindow(tk.Toplevel):
     """A C++ symbol name demangler utility.
 
     Found under **Tools** -> **Demangler** in the top menu.
-    Uses `dycall.util.demangle` to demangle the name.
+    Uses `dycall.util.demangle_many` to demangle the name.
+
+    The **Bulk** tab demangles every name in pasted text or a file, e.g. a
+    crash log or a linker map, using `dycall.util.demangle_text` in a
+    background thread. Output is streamed into a `VirtualListbox`.
 
     TODO: Syntax highlighted demangled name using Pygments.
     """
@@ -32,29 +45,40 @@ class DemanglerWindow(tk.Toplevel):
         log.debug("Initialising")
         self.mangled_name = mangled_name = tk.StringVar()
         self.demangled_name = demangled_name = tk.StringVar()
+        self.__bulk_status = tk.StringVar()
+        self.__bulk_q: Optional[queue.Queue] = None
+        self.__cancel: Optional[threading.Event] = None
+        self.__output: list[str] = []
 
         super().__init__(title="Demangler", toolwindow=True)
         self.withdraw()
-        self.minsize(300, 100)
-        self.resizable(True, False)
-        self.geometry("500x100")
-
-        self.columnconfigure(0)
-        self.columnconfigure(1, weight=1)
-        self.columnconfigure(2)
-        self.rowconfigure(0, minsize=45, weight=1)
-        self.rowconfigure(1, minsize=45, weight=1)
-
-        self.ml = ml = _TrLabel(self, text="Name")
-        self.me = me = ttk.Entry(self, textvariable=mangled_name)
+        self.minsize(300, 140)
+        self.geometry("500x140")
+
+        self.nb = nb = ttk.Notebook(self)
+        self.single = single = ttk.Frame(nb)
+        self.bulk = bulk = ttk.Frame(nb)
+        nb.add(single, text="Name")
+        nb.add(bulk, text="Bulk")
+        nb.bind("<<NotebookTabChanged>>", self.tab_changed)
+        nb.pack(fill="both", expand=True)
+
+        single.columnconfigure(0)
+        single.columnconfigure(1, weight=1)
+        single.columnconfigure(2)
+        single.rowconfigure(0, minsize=45, weight=1)
+        single.rowconfigure(1, minsize=45, weight=1)
+
+        self.ml = ml = _TrLabel(single, text="Name")
+        self.me = me = ttk.Entry(single, textvariable=mangled_name)
         self.mb = mb = _TrButton(
-            self, text="Demangle", command=self.demangle, state="disabled"
+            single, text="Demangle", command=self.demangle, state="disabled"
         )
-        self.dl = dl = _TrLabel(self, text="Demangled")
+        self.dl = dl = _TrLabel(single, text="Demangled")
         self.de = de = ttk.Entry(
-            self, textvariable=demangled_name, state="readonly", font="TkFixedFont"
+            single, textvariable=demangled_name, state="readonly", font="TkFixedFont"
         )
-        self.db = db = CopyButton(self, demangled_name, state="disabled")
+        self.db = db = CopyButton(single, demangled_name, state="disabled")
 
         # https://www.tutorialspoint.com/how-do-i-get-an-event-callback-when-a-tkinter-entry-widget-is-modified
         mangled_name.trace_add("write", self.set_state)
@@ -66,11 +90,45 @@ class DemanglerWindow(tk.Toplevel):
         de.grid(row=1, column=1, padx=5, pady=(0, 10), sticky="ew")
         db.grid(row=1, column=2, padx=5, pady=(0, 10), sticky="w")
 
+        bulk.columnconfigure(0, weight=1)
+        bulk.rowconfigure(1, weight=1)
+        bulk.rowconfigure(3, weight=3)
+        buttons = ttk.Frame(bulk)
+        self.bb = _TrButton(buttons, text="Demangle", command=self.demangle_pasted)
+        self.ob = _TrButton(buttons, text="Open file", command=self.demangle_file)
+        self.sb = _TrButton(
+            buttons, text="Save", command=self.save_output, state="disabled"
+        )
+        self.cb = _TrButton(
+            buttons, text="Copy", command=self.copy_output, state="disabled"
+        )
+        for button in (self.bb, self.ob, self.sb, self.cb):
+            button.pack(side="left", padx=(0, 5))
+        self.text = tk.Text(bulk, height=6, font="TkFixedFont", undo=False)
+        self.pb = ttk.Progressbar(bulk, maximum=1.0)
+        self.status = ttk.Label(bulk, textvariable=self.__bulk_status)
+        self.output = VirtualListbox(bulk, font="TkFixedFont")
+
+        buttons.grid(row=0, column=0, padx=5, pady=5, sticky="w")
+        self.text.grid(row=1, column=0, padx=5, sticky="nsew")
+        self.pb.grid(row=2, column=0, padx=5, pady=5, sticky="ew")
+        self.output.grid(row=3, column=0, padx=5, sticky="nsew")
+        self.status.grid(row=4, column=0, padx=5, pady=5, sticky="w")
+
         self.place_window_center()
         self.deiconify()
         self.focus_set()
         log.debug("Initialised")
 
+    def tab_changed(self, *_):
+        """Resizes the window to fit the selected tab."""
+        if self.nb.index("current") == 1:
+            self.minsize(500, 400)
+            self.geometry("700x500")
+        else:
+            self.minsize(300, 140)
+            self.geometry("500x140")
+
     def set_state(self, *_):
         """Toggles the state of the **Demangle** button based on **Name**."""
         if self.me.get():
@@ -81,13 +139,140 @@ class DemanglerWindow(tk.Toplevel):
     def demangle(self):
         """Tries to demangle **Name** and update the **Demangled** entry."""
         mangled = self.mangled_name.get()
-        try:
-            d = demangle(mangled)
-        except DemangleError as exc:
-            log.exception(exc)
+        d = demangle_many([mangled])[0]
+        if d is None:
+            log.error("Failed to demangle %s", mangled)
             Messagebox.show_error(
                 f"Failed to demangle '{mangled}'", "Demangling Failed"
             )
         else:
             self.demangled_name.set(d)
             self.db.configure(state="normal")
+
+    def demangle_pasted(self):
+        """Demangles the text pasted in the **Bulk** tab."""
+        text = self.text.get("1.0", "end-1c")
+        self.start(len(text), lambda: io.StringIO(text))
+
+    def demangle_file(self):
+        """Asks for a file and demangles it."""
+        path = filedialog.askopenfilename(
+            parent=self,
+            title="Select a file to demangle",
+            filetypes=[
+                ("All files", "*.*"),
+                ("Text files", "*.txt *.log"),
+                ("Linker maps", "*.map"),
+            ],
+        )
+        if path:
+            opener = functools.partial(
+                open, path, encoding="utf-8", errors="replace", newline=""
+            )
+            self.start(os.path.getsize(path), opener)
+
+    def start(self, size: int, opener):
+        """Starts demangling the file returned by `opener` in a thread.
+
+        Args:
+            size (int): Number of characters or bytes to read, for progress.
+            opener (Callable[[], TextIO]): Opens the text to demangle.
+        """
+        if self.__cancel is not None:
+            self.__cancel.set()
+        self.__cancel = cancel = threading.Event()
+        que: queue.Queue = queue.Queue()
+        self.__bulk_q = que
+        self.__output = []
+        self.output.values = self.__output
+        self.pb.configure(value=0)
+        self.sb.configure(state="disabled")
+        self.cb.configure(state="disabled")
+        self.__bulk_status.set("Demangling...")
+        threading.Thread(
+            target=self.run, args=(opener, size, que, cancel), daemon=True
+        ).start()
+        self.after(50, self.process_queue, que)
+
+    @staticmethod
+    def run(opener, size: int, que: queue.Queue, cancel: threading.Event):
+        """Runs in a thread, puts demangled lines and progress in `que`.
+
+        The last item put is None when done or an exception.
+        """
+        try:
+            with opener() as fp:
+                done = 0
+
+                def counted(lines: Iterable[str]):
+                    nonlocal done
+                    for line in lines:
+                        done += len(line)
+                        yield line
+
+                for lines in demangle_text(counted(fp)):
+                    if cancel.is_set():
+                        return
+                    que.put((lines, done / size if size else 1.0))
+        except (OSError, UnicodeError) as e:
+            que.put(e)
+        else:
+            que.put(None)
+
+    def process_queue(self, que: queue.Queue):
+        """Appends the lines demangled so far to the output.
+
+        Reschedules itself every 50ms till the thread is done. Queues of
+        cancelled runs are ignored.
+        """
+        if que is not self.__bulk_q:
+            return
+        output = self.__output
+        while True:
+            try:
+                item = que.get_nowait()
+            except queue.Empty:
+                self.after(50, self.process_queue, que)
+                break
+            if isinstance(item, tuple):
+                lines, progress = item
+                output.extend(line.rstrip("\r\n") for line in lines)
+                self.pb.configure(value=progress)
+                continue
+            self.__bulk_q = self.__cancel = None
+            if item is None:
+                self.pb.configure(value=1.0)
+                self.__bulk_status.set(f"{len(output)} lines demangled")
+                self.sb.configure(state="normal")
+                self.cb.configure(state="normal")
+            else:
+                log.exception(item)
+                self.__bulk_status.set(f"Failed to read: {item}")
+            break
+        self.output.refresh()
+
+    def save_output(self):
+        """Saves the demangled text to a file."""
+        path = filedialog.asksaveasfilename(
+            parent=self, title="Save demangled text", defaultextension=".txt"
+        )
+        if path:
+            try:
+                with open(path, "w", encoding="utf-8", errors="replace") as fp:
+                    fp.writelines(line + "\n" for line in self.__output)
+            except OSError as e:
+                log.exception(e)
+                Messagebox.show_error(f"Failed to save: {e}", "Error", parent=self)
+
+    def copy_output(self):
+        """Copies the selected lines or the whole demangled text."""
+        lines = self.output.selection or self.__output
+        self.clipboard_clear()
+        self.clipboard_append("\n".join(lines))
+
+    def destroy(self):
+        """Stops demangling before getting destroyed."""
+        if self.__cancel is not None:
+            self.__cancel.set()
+        self.__bulk_q = None
+        super().destroy()
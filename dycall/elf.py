@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+
+"""
+dycall.elf
+~~~~~~~~~~
+
+Contains `ELFReader`.
+"""
+
+from __future__ import annotations
+
+import logging
+import mmap
+import struct
+from typing import Iterator
+
+try:
+    from typing import Final  # type: ignore
+except ImportError:
+    # pylint: disable=ungrouped-imports
+    from typing_extensions import Final  # type: ignore
+
+from dycall.types import ELFExport
+from dycall.util import demangle_many
+
+log = logging.getLogger(__name__)
+
+MAGIC: Final = b"\x7fELF"
+
+PT_LOAD: Final = 1
+PT_DYNAMIC: Final = 2
+
+DT_NULL: Final = 0
+DT_HASH: Final = 4
+DT_STRTAB: Final = 5
+DT_SYMTAB: Final = 6
+DT_STRSZ: Final = 10
+DT_SYMENT: Final = 11
+DT_RPATH: Final = 15
+DT_RUNPATH: Final = 29
+DT_GNU_HASH: Final = 0x6FFFFEF5
+
+SHN_UNDEF: Final = 0
+STB_GLOBAL: Final = 1
+STB_WEAK: Final = 2
+STT_OBJECT: Final = 1
+STT_FUNC: Final = 2
+STT_GNU_IFUNC: Final = 10
+
+DEMANGLE_BATCH: Final = 1024
+"""Number of names demangled at once by `ELFReader`."""
+
+
+class ELFReaderError(Exception):
+    """Raised when a library cannot be read by `ELFReader`.
+
+    Callers should fall back to LIEF when this happens.
+    """
+
+
+class ELFReader:
+    """Reads exports from the dynamic symbol table of an ELF shared object.
+
+    Unlike `lief.parse`, nothing but the ELF header, program headers, the
+    `PT_DYNAMIC` segment, `DT_SYMTAB`, `DT_STRTAB` and `DT_HASH` or
+    `DT_GNU_HASH` is ever touched. The file is memory-mapped and exports are
+    built lazily while iterating, `DEMANGLE_BATCH` symbols at a time.
+
+    Anything unusual (no dynamic segment, no hash table, addresses outside
+    loadable segments) raises `ELFReaderError`.
+
+    Usage:
+        with ELFReader(path) as reader:
+            for exp in reader:
+                ...
+    """
+
+    def __init__(self, path: str) -> None:
+        with open(path, "rb") as fp:
+            try:
+                self.__mm = mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError as e:  # Empty file
+                raise ELFReaderError(f"{path} is empty") from e
+        try:
+            self.__parse_headers()
+        except (struct.error, IndexError) as e:
+            self.close()
+            raise ELFReaderError(f"{path} is truncated or malformed") from e
+        except ELFReaderError:
+            self.close()
+            raise
+
+    def __enter__(self) -> ELFReader:
+        """Returns itself."""
+        return self
+
+    def __exit__(self, *_) -> None:
+        """Unmaps the file."""
+        self.close()
+
+    def close(self) -> None:
+        """Unmaps the file."""
+        self.__mm.close()
+
+    @property
+    def size(self) -> int:
+        """Number of bytes mapped."""
+        return len(self.__mm)
+
+    def __len__(self) -> int:
+        """Number of entries in the dynamic symbol table (exported or not)."""
+        return self.__num_symbols
+
+    @property
+    def rpath(self) -> list[str]:
+        """Directories in `DT_RPATH`, `$ORIGIN` is not expanded."""
+        return self.__paths(DT_RPATH)
+
+    @property
+    def runpath(self) -> list[str]:
+        """Directories in `DT_RUNPATH`, `$ORIGIN` is not expanded."""
+        return self.__paths(DT_RUNPATH)
+
+    def __paths(self, tag: int) -> list[str]:
+        if tag not in self.__tags:
+            return []
+        return [p for p in self.__name(self.__tags[tag]).split(":") if p]
+
+    def __parse_headers(self) -> None:
+        mm = self.__mm
+        if mm[:4] != MAGIC:
+            raise ELFReaderError("Not an ELF file")
+        ei_class, ei_data = mm[4], mm[5]
+        if ei_class not in (1, 2) or ei_data not in (1, 2):
+            raise ELFReaderError("Unknown ELF class or data encoding")
+        self.__is64 = is64 = ei_class == 2
+        self.__bo = bo = "<" if ei_data == 1 else ">"
+
+        # Program headers
+        if is64:
+            phoff = self.__unpack("Q", 0x20)
+            phentsize, phnum = struct.unpack_from(f"{bo}HH", mm, 0x36)
+            phdr = struct.Struct(f"{bo}IIQQQQQQ")
+        else:
+            phoff = self.__unpack("I", 0x1C)
+            phentsize, phnum = struct.unpack_from(f"{bo}HH", mm, 0x2A)
+            phdr = struct.Struct(f"{bo}IIIIIIII")
+        if phentsize != phdr.size:
+            raise ELFReaderError("Unexpected program header size")
+
+        self.__loads: list[tuple[int, int, int]] = []
+        dynamic = None
+        for i in range(phnum):
+            fields = phdr.unpack_from(mm, phoff + i * phentsize)
+            if is64:
+                p_type, _, p_offset, p_vaddr, _, p_filesz, *_ = fields
+            else:
+                p_type, p_offset, p_vaddr, _, p_filesz, *_ = fields
+            if p_type == PT_LOAD:
+                self.__loads.append((p_vaddr, p_filesz, p_offset))
+            elif p_type == PT_DYNAMIC:
+                dynamic = (p_offset, p_filesz)
+        if dynamic is None:
+            raise ELFReaderError("No PT_DYNAMIC segment")
+
+        # Dynamic section
+        dyn = struct.Struct(f"{bo}qQ" if is64 else f"{bo}iI")
+        tags: dict[int, int] = {}
+        offset, filesz = dynamic
+        for i in range(filesz // dyn.size):
+            tag, val = dyn.unpack_from(mm, offset + i * dyn.size)
+            if tag == DT_NULL:
+                break
+            tags.setdefault(tag, val)
+        if DT_SYMTAB not in tags or DT_STRTAB not in tags:
+            raise ELFReaderError("No DT_SYMTAB or DT_STRTAB")
+        self.__tags = tags
+
+        self.__sym = sym = struct.Struct(f"{bo}IBBHQQ" if is64 else f"{bo}IIIBBH")
+        if tags.get(DT_SYMENT, sym.size) != sym.size:
+            raise ELFReaderError("Unexpected symbol entry size")
+        self.__symtab = self.__offset(tags[DT_SYMTAB])
+        self.__strtab = self.__offset(tags[DT_STRTAB])
+        self.__strsz = tags.get(DT_STRSZ, len(mm) - self.__strtab)
+
+        if DT_GNU_HASH in tags:
+            self.__num_symbols = self.__count_gnu_hash(self.__offset(tags[DT_GNU_HASH]))
+        elif DT_HASH in tags:
+            self.__num_symbols = self.__unpack("I", self.__offset(tags[DT_HASH]) + 4)
+        else:
+            raise ELFReaderError("No DT_HASH or DT_GNU_HASH")
+
+    def __unpack(self, fmt: str, offset: int) -> int:
+        return struct.unpack_from(f"{self.__bo}{fmt}", self.__mm, offset)[0]
+
+    def __offset(self, vaddr: int) -> int:
+        """Converts a virtual address to a file offset."""
+        for p_vaddr, p_filesz, p_offset in self.__loads:
+            if p_vaddr <= vaddr < p_vaddr + p_filesz:
+                return vaddr - p_vaddr + p_offset
+        raise ELFReaderError(f"Address {vaddr:#x} is not in any PT_LOAD segment")
+
+    def __count_gnu_hash(self, offset: int) -> int:
+        """The number of symbols isn't stored anywhere when only `DT_GNU_HASH`
+        is present. It is the index after the last symbol in the longest chain.
+        """
+        nbuckets, symoffset, bloom_size, _ = struct.unpack_from(
+            f"{self.__bo}IIII", self.__mm, offset
+        )
+        buckets = offset + 16 + bloom_size * (8 if self.__is64 else 4)
+        chains = buckets + nbuckets * 4
+        last = max(
+            struct.unpack_from(f"{self.__bo}{nbuckets}I", self.__mm, buckets),
+            default=0,
+        )
+        if last < symoffset:
+            return symoffset
+        while not self.__unpack("I", chains + (last - symoffset) * 4) & 1:
+            last += 1
+        return last + 1
+
+    def __name(self, st_name: int) -> str:
+        mm = self.__mm
+        start = self.__strtab + st_name
+        end = mm.find(b"\0", start, self.__strtab + self.__strsz)
+        if end == -1:
+            raise ELFReaderError(f"Unterminated symbol name at {start:#x}")
+        return mm[start:end].decode("utf-8", errors="replace")
+
+    def __iter__(self) -> Iterator[ELFExport]:
+        """Yields an `ELFExport` for every defined global or weak symbol.
+
+        Names are demangled in batches of `DEMANGLE_BATCH`.
+        """
+        pending: list[tuple[int, str, int, int]] = []
+        for symbol in self.__symbols():
+            pending.append(symbol)
+            if len(pending) == DEMANGLE_BATCH:
+                yield from self.__demangled(pending)
+                pending.clear()
+        yield from self.__demangled(pending)
+
+    @staticmethod
+    def __demangled(symbols: list[tuple[int, str, int, int]]) -> Iterator[ELFExport]:
+        names = [name for _, name, _, _ in symbols]
+        for (value, name, size, info), demangled in zip(symbols, demangle_many(names)):
+            if demangled is None:
+                demangled = name
+            yield ELFExport(value, name, demangled, size, info)
+
+    def __symbols(self) -> Iterator[tuple[int, str, int, int]]:
+        """Yields the value, name, size and info of every exported symbol."""
+        sym = self.__sym
+        is64 = self.__is64
+        # Symbol 0 is always the undefined symbol
+        for i in range(1, self.__num_symbols):
+            try:
+                fields = sym.unpack_from(self.__mm, self.__symtab + i * sym.size)
+            except struct.error as e:  # Truncated file
+                raise ELFReaderError(f"Symbol {i} is out of bounds: {e}") from e
+            if is64:
+                st_name, st_info, _, st_shndx, st_value, st_size = fields
+            else:
+                st_name, st_value, st_size, st_info, _, st_shndx = fields
+            # Same criteria as `lief.ELF.Symbol.exported`
+            if (
+                st_shndx == SHN_UNDEF
+                or st_value == 0
+                or st_info >> 4 not in (STB_GLOBAL, STB_WEAK)
+                or st_info & 0xF not in (STT_OBJECT, STT_FUNC, STT_GNU_IFUNC)
+            ):
+                continue
+            yield st_value, self.__name(st_name), st_size, st_info
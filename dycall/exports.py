@@ -9,19 +9,25 @@ Contains `ExportsFrame` and `ExportsTreeView`.
 
 from __future__ import annotations
 
+import array
 import logging
 import pathlib
-from typing import TYPE_CHECKING
+import threading
+import time
+import tkinter.font
+from typing import Callable, Iterator, Optional, Sequence
 
 import ttkbootstrap as tk
 from ttkbootstrap import ttk
 from ttkbootstrap.dialogs import Messagebox
 from ttkbootstrap.localization import MessageCatalog as MsgCat
-from ttkbootstrap.tableview import Tableview
 
 from dycall._widgets import _TrLabelFrame
-from dycall.types import Export, PEExport
-from dycall.util import StaticThemedTooltip, get_img
+from dycall.browser import ScopeBrowser, ScopeTree
+from dycall.search import ExportIndex
+from dycall.store import ExportNames, ExportStore
+from dycall.types import PEExport, SortOrder
+from dycall.util import StaticThemedTooltip, VirtualCombobox, get_img
 
 log = logging.getLogger(__name__)
 
@@ -32,9 +38,24 @@ class ExportsFrame(_TrLabelFrame):
     Use command line argument `--exp` to select an export from the library on
     launch. Combobox validates export name.
 
-    TODO: Combobox works like google search (auto-suggest, recents etc.)
+    Export names are appended as the library is being parsed, the combobox
+    becomes usable as soon as the first `FIRST_PAGE` of them arrive. It is a
+    `VirtualCombobox`, names are never copied into Tcl.
+
+    Once all the exports are loaded, an `ExportIndex` is built in the
+    background. Typing in the combobox then replaces its values with the best
+    matches, recently selected exports first. The substring search is spread
+    over multiple idle callbacks of `SEARCH_BUDGET` each.
     """
 
+    FIRST_PAGE = 1000
+    """Number of export names after which the combobox is enabled."""
+
+    SEARCH_BUDGET = 0.008
+    """Seconds spent searching at once while typing, half a frame at 60 FPS."""
+
+    IGNORED_KEYS = ("Up", "Down", "Left", "Right", "Return", "Escape", "Tab")
+
     def __init__(
         self,
         root: tk.Window,
@@ -46,7 +67,7 @@ class ExportsFrame(_TrLabelFrame):
         is_native: tk.BooleanVar,
         is_reinitialised: tk.BooleanVar,
         lib_path: tk.StringVar,
-        exports: list[Export],
+        exports: ExportStore,
     ):
         log.debug("Initalising")
 
@@ -61,17 +82,26 @@ class ExportsFrame(_TrLabelFrame):
         self.__is_reinitialised = is_reinitialised
         self.__lib_path = lib_path
         self.__exports = exports
-        self.__export_names: list[str] = []
+        self.__names: Sequence[str] = exports.demangled_names
+        self.__num_seen = 0
+        self.__index: Optional[ExportIndex] = None
+        self.__generation = 0
+        self.__demangled_generation = -1
+        self.__search_id: Optional[str] = None
+        self.__suggesting = False
+        self.__tree: Optional[ExportsTreeView] = None
 
-        self.cb = ttk.Combobox(
+        self.cb = VirtualCombobox(
             self,
             state="disabled",
             textvariable=selected_export,
             validate="focusout",
             validatecommand=(self.register(self.cb_validate), "%P"),
         )
+        self.cb.values = self.__names
         # ! self.cb.bind("<Return>", lambda *_: self.cb_validate)  # Doesn't work
         self.cb.bind("<<ComboboxSelected>>", self.cb_selected)
+        self.cb.bind("<KeyRelease>", self.cb_typed)
 
         self.__list_png = get_img("list.png")
         self.lb = ttk.Label(self, image=self.__list_png)
@@ -85,6 +115,7 @@ class ExportsFrame(_TrLabelFrame):
         self.lb.pack(padx=(0, 5), pady=5, side="right")
         self.cb.pack(fill="x", padx=5, pady=5)
 
+        self.bind_all("<<AppendExports>>", lambda *_: self.append_cb_values())
         self.bind_all("<<PopulateExports>>", lambda *_: self.set_cb_values())
         self.bind_all(
             "<<ToggleExportsFrame>>", lambda event: self.set_state(event.state == 1)
@@ -97,9 +128,12 @@ class ExportsFrame(_TrLabelFrame):
 
         Resets **Output** and activates/deactivates `FunctionFrame`.
         """
-        log.debug("%s selected", self.__selected_export.get())
+        selected = self.__selected_export.get()
+        log.debug("%s selected", selected)
+        if self.__index is not None:
+            self.__index.touch(selected)
         self.__output.set("")
-        if self.__is_native.get():
+        if self.__is_loaded.get() and self.__is_native.get():
             self.__root.event_generate("<<ToggleFunctionFrame>>", state=1)
         else:
             self.__root.event_generate("<<ToggleFunctionFrame>>", state=0)
@@ -117,7 +151,7 @@ class ExportsFrame(_TrLabelFrame):
         except IndexError:
             exp = self.cb.get()
             if exp:
-                if exp in self.__export_names:
+                if self.__exports.get_by_demangled_name(exp) is not None:
                     self.cb_selected()
                     return True
                 self.__root.event_generate("<<ToggleFunctionFrame>>", state=1)
@@ -135,59 +169,186 @@ class ExportsFrame(_TrLabelFrame):
         state = "normal" if activate else "disabled"
         self.cb.configure(state=state)
 
-    def set_cb_values(self):
-        """Demangles and sets the export names to the **Exports** combobox."""
+    def append_cb_values(self):
+        """Appends the names of newly built exports to the **Exports** combobox.
+
+        Everything is rebuilt if exports have been removed in the meantime,
+        i.e. another library is being loaded.
+        """
         exports = self.__exports
+        if len(exports) < self.__num_seen:
+            self.__index = None
+            self.__generation += 1
+            self.__suggesting = False
+            self.close_tree()
+
+        self.__num_seen = len(exports)
+        names = exports.demangled_names
+        if not self.__suggesting:
+            if self.__names is names:
+                self.cb.refresh()
+            else:
+                self.__names = self.cb.values = names
+        if len(names) >= self.FIRST_PAGE:
+            self.set_state()
+
+    def set_cb_values(self):
+        """Sets all the export names to the **Exports** combobox.
+
+        Starts building the `ExportIndex` and demangling the names in the
+        background, see `build_index`.
+        """
+        self.append_cb_values()
+        if self.__tree is not None and self.__tree.is_stale:
+            self.close_tree()
+        names = self.__names = self.__exports.demangled_names
+        self.set_state()
+        self.cb.values = names
+        self.__suggesting = False
+        self.__index = None
+        threading.Thread(
+            target=self.build_index,
+            args=(self.__exports, names, self.__generation),
+            daemon=True,
+        ).start()
         if not self.__is_reinitialised.get() or self.__is_loaded.get():
-            num_exports = len(exports)
+            num_exports = len(names)
             log.info("Found %d exports", num_exports)
             self.__status.set(f"{num_exports} exports found")
-            failed = []
-            for exp in exports:
-                if isinstance(exp, PEExport):
-                    if hasattr(exp, "exc"):
-                        failed.append(exp.name)
-            if failed:
-                Messagebox.show_warning(
-                    f"These export names couldn't be demangled: {failed}",
-                    "Demangle Errors",
-                    parent=self.__root,
-                )
-        self.__export_names = names = list(e.demangled_name for e in exports)
-        self.set_state()
-        self.cb.configure(values=names)
-        selected_export = self.__selected_export.get()
-        if selected_export:
-            if selected_export not in names:
-                err = "%s not found in export names"
-                log.error(err, selected_export)
-                Messagebox.show_error(
-                    err % selected_export, "Export not found", parent=self.__root
-                )
-                self.cb.set("")
-            else:
-                # Activate function frame when export name is passed from command line
-                self.cb_selected()
+            self.warn_demangle_errors(self.__generation)
+        if self.__selected_export.get():
+            self.select_passed_export(self.__generation)
         self.lb.configure(cursor="hand2")
-        self.lb.bind(
-            "<ButtonRelease-1>",
-            lambda *_: ExportsTreeView(
-                self.__exports, pathlib.Path(self.__lib_path.get()).name
-            ),
-            add=False,
+        self.lb.bind("<ButtonRelease-1>", lambda *_: self.show_tree(), add=False)
+
+    def show_tree(self):
+        """Shows the `ExportsTreeView` of the loaded library.
+
+        It is created on first use and reused till another library is loaded.
+        """
+        tree = self.__tree
+        if tree is not None and tree.winfo_exists() and not tree.is_stale:
+            tree.show()
+            return
+        self.close_tree()
+        self.__tree = ExportsTreeView(
+            self.__exports,
+            pathlib.Path(self.__lib_path.get()).name,
+            lambda: self.__index,
         )
 
+    def close_tree(self):
+        """Destroys the `ExportsTreeView`, if any."""
+        tree, self.__tree = self.__tree, None
+        if tree is not None and tree.winfo_exists():
+            tree.destroy()
+
+    def select_passed_export(self, generation: int):
+        """Selects the export name passed from the command line.
+
+        Waits for `build_index` to demangle all the names, a PE name which
+        hasn't been demangled yet can't be looked up before that.
+        """
+        if generation != self.__generation:
+            return
+        if self.__demangled_generation != generation:
+            self.after(100, self.select_passed_export, generation)
+            return
+        selected_export = self.__selected_export.get()
+        if self.__exports.get_by_demangled_name(selected_export) is None:
+            err = "%s not found in export names"
+            log.error(err, selected_export)
+            Messagebox.show_error(
+                err % selected_export, "Export not found", parent=self.__root
+            )
+            self.cb.set("")
+        else:
+            # Activate function frame when export name is passed from command line
+            self.cb_selected()
+
+    def build_index(self, exports: ExportStore, names: ExportNames, generation: int):
+        """Builds an `ExportIndex`, runs in a separate thread.
+
+        PE names which haven't been demangled are searched as they are (see
+        `ExportStore.search_keys`), the index is ready before any demangling.
+        All the names are demangled and indexed after that, in multiple
+        processes for huge libraries, so that lookups by demangled name never
+        demangle in the UI thread. Results are thrown away if another library
+        got loaded meanwhile.
+        """
+        index = ExportIndex(exports.search_keys(), names)
+        if generation != self.__generation:
+            return
+        self.__index = index
+        names.demangle(processes=None)
+        if generation == self.__generation:
+            self.__demangled_generation = generation
+
+    def warn_demangle_errors(self, generation: int):
+        """Warns about the export names which couldn't be demangled.
+
+        Waits for `build_index` to demangle all the names, so that every
+        failure is reported.
+        """
+        if generation != self.__generation:
+            return
+        if self.__demangled_generation != generation:
+            self.after(100, self.warn_demangle_errors, generation)
+            return
+        failed = self.__exports.demangle_failures()
+        if failed:
+            Messagebox.show_warning(
+                f"These export names couldn't be demangled: {failed}",
+                "Demangle Errors",
+                parent=self.__root,
+            )
+
+    def cb_typed(self, event: tk.tk.Event):
+        """Callback to handle key presses in **Exports** combobox.
+
+        Starts searching for the text typed so far.
+        """
+        index = self.__index
+        if index is None or event.keysym in self.IGNORED_KEYS:
+            return
+        query = self.cb.get()
+        if query == index.query:
+            return
+        if self.__search_id is not None:
+            self.after_cancel(self.__search_id)
+            self.__search_id = None
+        if not query:
+            if self.__suggesting:
+                self.__suggesting = False
+                self.cb.values = self.__names
+            index.search(query)
+            return
+        index.search(query)
+        self.__suggesting = True
+        self.suggest()
+
+    def suggest(self):
+        """Continues the search started by `cb_typed` and shows its results.
+
+        Reschedules itself till the search is done.
+        """
+        self.__search_id = None
+        index = self.__index
+        if index is None:
+            return
+        done = index.resume(time.perf_counter() + self.SEARCH_BUDGET)
+        self.cb.values = index.results
+        if not done:
+            self.__search_id = self.after(1, self.suggest)
+
     def sort(self, *_):
         """Sorts the list of export names and repopulates the combobox."""
         if self.__is_loaded.get():
-            sorter = self.__sort_order.get()
+            sorter = SortOrder(self.__sort_order.get())
             log.debug("Sorting w.r.t. %s", sorter)
-            names = self.__export_names
-            if sorter == "Name (ascending)":
-                names.sort()
-            elif sorter == "Name (descending)":
-                names.sort(reverse=True)
-            self.cb.configure(values=names)
+            self.__names = self.__exports.sorted_names(sorter)
+            self.__suggesting = False
+            self.cb.values = self.__names
         self.__status.set("Sort order changed")
 
 
@@ -195,63 +356,289 @@ class ExportsTreeView(tk.Toplevel):
     """Displays detailed information about all the exports of a library.
 
     Following information is displayed:
+    - Ordinal (Windows only)
     - Address
     - Name
     - Demangled name (whenever available)
-    - Ordinal (Windows only)
+
+    Rows are read straight from the `ExportStore` and only the visible ones
+    are rendered, just like `dycall.util.VirtualListbox`. Typing in the
+    **Filter** entry finds the exports whose demangled name contains the
+    text using `ExportIndex.filter`, `FILTER_BUDGET` seconds at a time.
+
+    The **Scopes** tab groups the exports by namespace, class and overloads
+    using a `ScopeTree`, which is built in the background when the tab is
+    first shown.
+
+    `ExportsFrame` keeps one window per library, closing it only hides it.
     """
 
-    def __init__(self, exports: list[Export], lib_name: str):
+    FILTER_BUDGET = 0.008
+    """Seconds spent filtering at once, see `ExportsFrame.SEARCH_BUDGET`."""
+
+    def __init__(
+        self,
+        exports: ExportStore,
+        lib_name: str,
+        index: Callable[[], Optional[ExportIndex]],
+    ):
+        """
+        Args:
+            exports (ExportStore): Exports of the loaded library.
+            lib_name (str): Shown in the title.
+            index (Callable[[], Optional[ExportIndex]]): Returns the index of
+                the export names, None till it is built.
+        """
         log.debug("Initialising")
         super().__init__(
-            title=f"{MsgCat.translate('Exports')} - {lib_name}", size=(400, 500)
+            title=f"{MsgCat.translate('Exports')} - {lib_name}", size=(600, 500)
         )
-        self.__old_height = 0
         self.withdraw()
-        coldata = [
-            "Address",
-            "Name",
-            {"text": "Demangled", "stretch": True},
-        ]
-        is_pe = isinstance(exports[0], PEExport)
-        if is_pe:
-            coldata.insert(0, "Ordinal")
-        self.__tv = tv = Tableview(
-            self,
-            searchable=True,
-            autofit=True,
-            coldata=coldata,
-            paginated=True,
-            pagesize=25,
+        self.__exports = exports
+        self.__names = exports.demangled_names
+        self.__index = index
+        self.__is_pe = bool(exports) and isinstance(exports[0], PEExport)
+        self.__shown: Optional[Sequence[int]] = None
+        self.__filter: Optional[Iterator[list[int]]] = None
+        self.__filter_id: Optional[str] = None
+        self.__top = 0
+        self.__rows = 1
+        self.__query = tk.StringVar()
+        self.__status = tk.StringVar()
+
+        self.nb = nb = ttk.Notebook(self)
+        table = ttk.Frame(nb)
+        self.scopes = scopes = ttk.Frame(nb)
+        nb.add(table, text=MsgCat.translate("Table"))
+        nb.add(scopes, text=MsgCat.translate("Scopes"))
+        nb.bind("<<NotebookTabChanged>>", self.tab_changed)
+        self.__browser: Optional[ScopeBrowser] = None
+        self.__scope_tree: Optional[ScopeTree] = None
+        self.__grouping = False
+
+        top = ttk.Frame(table)
+        ttk.Label(top, text=MsgCat.translate("Filter")).pack(side="left", padx=5)
+        self.fe = fe = ttk.Entry(top, textvariable=self.__query)
+        fe.pack(fill="x", expand=True, padx=5)
+        self.__query.trace_add("write", self.filter_typed)
+
+        body = ttk.Frame(table)
+        columns: tuple[str, ...] = ("address", "name", "demangled")
+        if self.__is_pe:
+            columns = ("ordinal",) + columns
+        self.__tv = tv = ttk.Treeview(
+            body, columns=columns, show="headings", selectmode="extended"
         )
-        tv.pack(fill="both", expand=True)
-        for e in exports:
-            values = [e.address, e.name, e.demangled_name]  # type: ignore
-            if is_pe:
-                if TYPE_CHECKING:
-                    assert isinstance(e, PEExport)  # nosec
-                values.insert(0, e.ordinal)
-            tv.insert_row(values=values)
-        tv.load_table_data()
+        for column in columns:
+            tv.heading(column, text=MsgCat.translate(column.capitalize()))
+            tv.column(column, stretch=column == "demangled", width=100)
+        tv.column("demangled", width=250)
+        self.__sb = sb = ttk.Scrollbar(body, command=self.__yview)
+        sb.pack(side="right", fill="y")
+        tv.pack(side="left", fill="both", expand=True)
+        rowheight = ttk.Style().lookup("Treeview", "rowheight")
+        font = tkinter.font.nametofont("TkDefaultFont")
+        self.__rowheight = int(rowheight or font.metrics("linespace")) or 20
+
+        top.pack(fill="x", pady=5)
+        body.pack(fill="both", expand=True, padx=5)
+        nb.pack(fill="both", expand=True, padx=5, pady=(5, 0))
+        ttk.Label(self, textvariable=self.__status).pack(anchor="w", padx=5, pady=5)
+
+        tv.bind("<Configure>", self.__on_configure)
+        tv.bind("<MouseWheel>", lambda e: self.__scroll(-e.delta // 120))
+        tv.bind("<Button-4>", lambda *_: self.__scroll(-3))
+        tv.bind("<Button-5>", lambda *_: self.__scroll(3))
+        tv.bind("<Prior>", lambda *_: self.__scroll(-self.__rows))
+        tv.bind("<Next>", lambda *_: self.__scroll(self.__rows))
+        tv.bind("<Home>", lambda *_: self.__scroll(-len(self.shown)))
+        tv.bind("<End>", lambda *_: self.__scroll(len(self.shown)))
+        self.bind("<Control-c>", lambda *_: self.copy())
         self.bind(
             "<F11>",
             lambda *_: self.attributes(
                 "-fullscreen", not self.attributes("-fullscreen")
             ),
         )
-        self.bind("<Configure>", self.resize)
-        self.deiconify()
-        self.focus_set()
+        self.bind("<Escape>", lambda *_: self.withdraw())
+        self.protocol("WM_DELETE_WINDOW", self.withdraw)
+        self.refresh()
+        self.place_window_center()
+        self.show()
         log.debug("Initialised")
 
-    def resize(self, event: tk.tk.Event):
-        """Change the treeview's `pagesize` whenever this window is resized.
+    @property
+    def is_stale(self) -> bool:
+        """Whether the exports of another library have been loaded since."""
+        return self.__exports.demangled_names is not self.__names
+
+    @property
+    def shown(self) -> Sequence[int]:
+        """Rows of the export store matching the filter, in display order."""
+        if self.__shown is None:
+            return range(len(self.__names))
+        return self.__shown
+
+    def show(self):
+        """Brings the window to the front."""
+        self.deiconify()
+        self.lift()
+        self.fe.focus_set()
+
+    def refresh(self):
+        """Rerenders the visible rows."""
+        tv = self.__tv
+        tv.delete(*tv.get_children())
+        if self.is_stale:
+            return
+        shown, rows = self.shown, self.__rows
+        num_shown = len(shown)
+        self.__top = top = max(min(self.__top, num_shown - rows), 0)
+        bottom = min(top + rows, num_shown)
+        exports = self.__exports
+        rows = shown[top:bottom]
+        for row, demangled in zip(rows, self.__names.take(rows)):
+            e = exports[row]
+            values = [e.address, e.name, demangled]
+            if isinstance(e, PEExport):
+                values.insert(0, e.ordinal)
+            tv.insert("", "end", iid=str(row), values=values)
+        if num_shown:
+            self.__sb.set(top / num_shown, bottom / num_shown)
+        else:
+            self.__sb.set(0, 1)
+        if self.nb.index("current") == 0:
+            status = f"{num_shown} of {len(self.__names)} exports"
+            if self.__filter is not None:
+                status += " (filtering...)"
+            self.__status.set(status)
+
+    def filter_typed(self, *_):
+        """Callback to handle changes to the **Filter** entry.
+
+        Starts filtering with the `ExportIndex` once it is built.
+        """
+        if self.__filter_id is not None:
+            self.after_cancel(self.__filter_id)
+            self.__filter_id = None
+        self.__filter = None
+        self.__top = 0
+        query = self.__query.get()
+        if not query:
+            self.__shown = None
+            self.refresh()
+            return
+        index = self.__index()
+        if index is None or index.names is not self.__names:
+            self.__status.set(MsgCat.translate("Indexing exports..."))
+            self.__filter_id = self.after(100, self.filter_typed)
+            return
+        self.__shown = array.array("I")
+        self.__filter = index.filter(query)
+        self.continue_filter()
+
+    def continue_filter(self):
+        """Continues the filtering started by `filter_typed`.
+
+        Reschedules itself till all the names have been checked.
+        """
+        self.__filter_id = None
+        if self.__filter is None:
+            return
+        shown = self.__shown
+        assert isinstance(shown, array.array)  # nosec
+        deadline = time.perf_counter() + self.FILTER_BUDGET
+        for found in self.__filter:
+            shown.extend(found)
+            if time.perf_counter() >= deadline:
+                self.__filter_id = self.after(1, self.continue_filter)
+                break
+        else:
+            self.__filter = None
+        self.refresh()
+
+    def tab_changed(self, *_):
+        """Groups the exports by scope when the **Scopes** tab is first shown.
+
+        `ScopeTree` is built in a separate thread, see `show_scopes`.
+        """
+        if self.nb.index("current") == 0:
+            self.refresh()
+        elif self.__scope_tree is not None:
+            self.__status.set(f"{len(self.__scope_tree)} exports")
+        elif self.__browser is None and not self.__grouping:
+            self.__grouping = True
+            self.__status.set(MsgCat.translate("Grouping exports by scope..."))
+            names = self.__names
+            threading.Thread(
+                target=self.build_scopes, args=(names,), daemon=True
+            ).start()
+            self.after(100, self.show_scopes, names)
+
+    def build_scopes(self, names: ExportNames):
+        """Builds a `ScopeTree`, runs in a separate thread."""
+        names.demangle(processes=None)
+        tree = ScopeTree(names)
+        if names is self.__names:
+            self.__scope_tree = tree
+
+    def show_scopes(self, names: ExportNames):
+        """Shows the `ScopeTree` once `build_scopes` is done.
+
+        Reschedules itself every 100ms till then.
+        """
+        if names is not self.__names or not self.winfo_exists():
+            return
+        tree = self.__scope_tree
+        if tree is None:
+            self.after(100, self.show_scopes, names)
+            return
+        self.__browser = browser = ScopeBrowser(self.scopes, tree)
+        browser.pack(fill="both", expand=True)
+        if self.nb.index("current") == 1:
+            self.__status.set(f"{len(tree)} exports")
+
+    def copy(self):
+        """Copies the selected rows, one tab-separated line per export.
 
-        I came up with this because there is no way to show a vertical
-        scrollbar in/for the treeview.
+        Only the demangled names are copied from the **Scopes** tab.
         """
-        new_height = event.height
-        if event.widget.widgetName == "toplevel" and new_height != self.__old_height:
-            # ! This is an expensive call, avoid it whenever possible
-            self.__tv.pagesize = int(new_height) / 20
-            self.__old_height = new_height
+        if self.nb.index("current") == 1:
+            lines = self.__browser.selection if self.__browser is not None else []
+        else:
+            tv = self.__tv
+            lines = [
+                "\t".join(str(v) for v in tv.item(iid, "values"))
+                for iid in tv.selection()
+            ]
+        if lines:
+            self.clipboard_clear()
+            self.clipboard_append("\n".join(lines))
+
+    def destroy(self):
+        """Stops filtering before getting destroyed."""
+        if self.__filter_id is not None:
+            self.after_cancel(self.__filter_id)
+        self.__filter = self.__filter_id = None
+        super().destroy()
+
+    def __on_configure(self, event: tk.tk.Event) -> None:
+        # One row less for the headings
+        rows = max(event.height // self.__rowheight - 1, 1)
+        if rows != self.__rows:
+            self.__rows = rows
+            self.refresh()
+
+    def __scroll(self, rows: int):
+        self.__top += rows
+        self.refresh()
+        return "break"
+
+    def __yview(self, *args) -> None:
+        """Scrollbar command, see `tkinter.YView.yview`."""
+        if args[0] == "moveto":
+            self.__top = int(float(args[1]) * len(self.shown))
+            self.refresh()
+        elif args[0] == "scroll":
+            amount = int(args[1])
+            self.__scroll(amount * self.__rows if args[2] == "pages" else amount)
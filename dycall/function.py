@@ -11,6 +11,8 @@ from __future__ import annotations
 
 import logging
 import queue
+from concurrent.futures import Future
+from tkinter import TclError
 from typing import NamedTuple
 
 import tksheet
@@ -19,8 +21,10 @@ from ttkbootstrap import ttk
 from ttkbootstrap.localization import MessageCatalog
 
 from dycall._widgets import _TrLabelFrame
+from dycall.benchmark import BenchmarkTarget, BenchmarkWindow
 from dycall.runner import Runner
-from dycall.types import CALL_CONVENTIONS, PARAMETER_TYPES, Marshaller, RunResult
+from dycall.store import ExportStore
+from dycall.types import CALL_CONVENTIONS, PARAMETER_TYPES, RunResult
 from dycall.util import DARK_THEME
 
 log = logging.getLogger(__name__)
@@ -47,10 +51,13 @@ class FunctionFrame(ttk.Frame):
         returns: tk.StringVar,
         lib_path: tk.StringVar,
         export: tk.StringVar,
+        exports: ExportStore,
         output: tk.StringVar,
         status: tk.StringVar,
         is_outmode: tk.BooleanVar,
         is_running: tk.BooleanVar,
+        is_pinned: tk.BooleanVar,
+        is_isolated: tk.BooleanVar,
         exc_type: tk.StringVar,
         get_last_error: tk.IntVar,
         show_get_last_error: tk.BooleanVar,
@@ -65,6 +72,7 @@ class FunctionFrame(ttk.Frame):
         self.__returns = returns
         self.__lib_path = lib_path
         self.__export = export
+        self.__exports = exports
         self.__output = output
         self.__status = status
         self.__is_outmode = is_outmode
@@ -74,8 +82,10 @@ class FunctionFrame(ttk.Frame):
         self.__show_get_last_error = show_get_last_error
         self.__errno = errno
         self.__show_errno = show_errno
-        self.__res_q = queue.Queue()  # type: ignore
-        self.__exc_q = queue.Queue()  # type: ignore
+        self.__is_pinned = is_pinned
+        self.__is_isolated = is_isolated
+        self.__res_q: queue.Queue[tuple[int, Future]] = queue.Queue()
+        self.__calls: dict[int, Future] = {}
         self.__args: list[list[str]] = []
         self.__is_windows = is_windows
 
@@ -112,6 +122,14 @@ class FunctionFrame(ttk.Frame):
             command=lambda *_: self.run(),
         )
 
+        # Benchmark button
+        self.bb = bb = ttk.Button(
+            self,
+            text=MessageCatalog.translate("Benchmark"),
+            state="disabled",
+            command=self.benchmark,
+        )
+
         # Arguments table
         self.ag = ag = _TrLabelFrame(self, "Arguments")
         self.at = at = tksheet.Sheet(
@@ -154,10 +172,12 @@ class FunctionFrame(ttk.Frame):
             cg.grid(row=0, column=0, sticky="ew", padx=5)
             rg.grid(row=0, column=1, sticky="ew")
             rb.grid(row=0, column=2, padx=5)
+            bb.grid(row=0, column=3, padx=(0, 5))
         else:
             rg.grid(row=0, column=0, sticky="ew", padx=5)
             rb.grid(row=0, column=1, padx=5)
-        ag.grid(row=1, columnspan=3, sticky="nsew", padx=5, pady=5)
+            bb.grid(row=0, column=2, padx=(0, 5))
+        ag.grid(row=1, columnspan=4, sticky="nsew", padx=5, pady=5)
 
         self.rowconfigure(1, weight=1)
         self.columnconfigure(0, weight=1)
@@ -170,6 +190,7 @@ class FunctionFrame(ttk.Frame):
         ag.rowconfigure(0, weight=1)
         ag.columnconfigure(0, weight=1)
 
+        self.bind("<<CallDone>>", self.process_queue)
         self.bind_all(
             "<<ToggleFunctionFrame>>", lambda event: self.set_state(event.state == 1)
         )
@@ -181,12 +202,13 @@ class FunctionFrame(ttk.Frame):
             if self.__is_windows:
                 self.cc.configure(state="readonly")
             self.rb.configure(state="normal")
+            self.bb.configure(state="normal")
             self.at.enable_bindings()
             for binding in ("rc_insert_column", "rc_delete_column", "cut", "delete"):
                 self.at.disable_bindings(binding)
             self.bind_run_button()
         else:
-            for w in (self.rc, self.rb):
+            for w in (self.rc, self.rb, self.bb):
                 w.configure(state="disabled")
             if self.__is_windows:
                 self.cc.configure(state="disabled")
@@ -292,86 +314,109 @@ class FunctionFrame(ttk.Frame):
         elif type_ not in ("char", "char*", "void*", "wchar_t", "wchar_t*"):
             t.set_cell_data(row, 1, value="0")
 
-    def process_queue(self):
-        """Checks the `RunResult` and exception queues for an element.
+    def call_done(self, call_id: int, future: Future):
+        """Hands a finished call over to the UI thread.
 
-        This function schedules itself to run every 100ms in the UI thread
-        until either one of the queues has an element, which also means that
-        the `dycall.runner.Runner` thread has finished.
+        Runs in the worker thread. Tkinter forwards `event_generate` to the
+        thread running the Tk event loop, where `<<CallDone>>` triggers
+        `process_queue` right away.
         """
+        self.__res_q.put((call_id, future))
         try:
-            exc: Exception = self.__exc_q.get_nowait()
-        except queue.Empty:
-            pass
-        else:
-            log.exception(exc)
-            raise exc
+            self.event_generate("<<CallDone>>", when="tail")
+        except (RuntimeError, TclError):  # Frame destroyed or app closing
+            log.debug("Call #%d finished after the frame was destroyed", call_id)
 
-        try:
-            result: RunResult = self.__res_q.get_nowait()
-        except queue.Empty:
-            self.after(100, self.process_queue)
-        else:
+    def process_queue(self, *_):
+        """Shows the results of the calls which have finished.
+
+        Bound to `<<CallDone>>`, see `call_done`. The output shows the call
+        which finished last; **errno** and **GetLastError** are updated from
+        its `RunResult`.
+        """
+        while True:
+            try:
+                call_id, future = self.__res_q.get_nowait()
+            except queue.Empty:
+                break
+            del self.__calls[call_id]
+            exc = future.exception()
+            if exc is not None:
+                self.show_exception(exc, f"Call #{call_id} failed")
+                continue
+            result: RunResult = future.result()
             self.__root.event_generate("<<OutputSuccess>>")
-            self.__status.set("Operation successful")
-            ret = Marshaller.pytype2str(result.ret)
-            self.__output.set(ret)
+            self.__status.set(f"Call #{call_id} successful")
+            self.__output.set(result.output)
+            if result.errno is not None:
+                self.__errno.set(result.errno)
+            if result.last_error is not None:
+                self.__get_last_error.set(result.last_error)
             if self.__is_outmode.get():
                 self.at.set_column_data(1, result.values, redraw=True)
             self.activate_copy_button()
-            self.rb.configure(state="normal")
 
-    def run(self) -> None:
-        """Executes the function and updates the UI back with results.
+        if self.__calls:
+            self.__status.set(f"{len(self.__calls)} call(s) running...")
+        else:
+            self.__is_running.set(False)
+
+    def show_exception(self, e: BaseException, status: str):
+        """Shows an exception raised by a call in the output."""
+        log.exception(e)
+        self.__exc_type.set(type(e).__name__)
+        # ! Cannot pass an arbitrary string directly even though Tk supports it
+        # https://stackoverflow.com/a/21234342
+        # https://bugs.python.org/issue3405
+        self.__root.event_generate("<<OutputException>>")
+        self.__output.set(str(e))
+        self.__status.set(status)
+        self.activate_copy_button(bootstyle="danger")
 
-        This function acts as a bridge between the runner and the UI threads.
-        Invoked by **Run** button or `F5`.
+    def run(self) -> None:
+        """Submits a call of the function, see `dycall.runner.RunnerPool`.
+
+        Invoked by **Run** button or `F5`. **Run** stays enabled, several
+        calls can be in flight at once; `process_queue` updates the UI back
+        with their results as soon as they finish. With **Options** ->
+        **Pinned Thread**, all calls are made from the same thread, one at a
+        time. With **Isolated Process**, they are made in a worker process
+        which is restarted if a call crashes it, see `dycall.worker`.
         """
-
-        def handle_exc(e: Exception, status: str):
-            log.exception(e)
-            self.__exc_type.set(type(e).__name__)
-            # ! Cannot pass an arbitrary string directly even though Tk supports it
-            # https://stackoverflow.com/a/21234342
-            # https://bugs.python.org/issue3405
-            self.__root.event_generate("<<OutputException>>")
-            self.__output.set(str(e))
-            self.__status.set(status)
-            self.activate_copy_button(bootstyle="danger")
-            self.rb.configure(state="normal")
-
-        ret_type = self.__returns.get()
-        self.__status.set("Running...")
-        self.rb.configure(state="disabled")
-        self.unbind_run_button()
-
         try:
-            thread = Runner(
-                self.__exc_q,
-                self.__res_q,
+            runner = Runner(
                 self.__args,
                 self.__call_conv.get(),
-                ret_type,
+                self.__returns.get(),
                 self.__lib_path.get(),
-                self.__export.get(),
-                self.__get_last_error,
+                self.__exports.symbol(self.__export.get()),
                 self.__show_get_last_error.get(),
-                self.__errno,
                 self.__show_errno.get(),
+                self.__is_isolated.get(),
             )
         except Exception as e:  # pylint: disable=broad-except
-            handle_exc(e, "Invalid argument(s)")
-            self.bind_run_button()
+            self.show_exception(e, "Invalid argument(s)")
             return
+
+        call_id, future = runner.submit(self.__is_pinned.get())
+        self.__calls[call_id] = future
+        self.__status.set(f"Running call #{call_id}...")
         self.__is_running.set(True)
-        thread.start()
+        future.add_done_callback(lambda f: self.call_done(call_id, f))
 
-        try:
-            self.process_queue()
-        except Exception as e:  # pylint: disable=broad-except
-            handle_exc(e, "An error occured")
-        self.__is_running.set(False)
-        self.bind_run_button()
+    def benchmark(self) -> None:
+        """Opens a `BenchmarkWindow` for the export with the current arguments.
+
+        Invoked by the **Benchmark** button.
+        """
+        target = BenchmarkTarget(
+            self.__lib_path.get(),
+            self.__exports.symbol(self.__export.get()),
+            self.__call_conv.get(),
+            self.__returns.get(),
+            tuple((t, v) for t, v in self.__args),
+        )
+        BenchmarkWindow(self.__root, target)
 
     # * Helpers
     def activate_copy_button(
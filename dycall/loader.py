@@ -0,0 +1,431 @@
+#!/usr/bin/env python3
+
+"""
+dycall.loader
+~~~~~~~~~~~~~
+
+Contains `Loader` and `Prewarmer`.
+"""
+
+from __future__ import annotations
+
+import collections
+import ctypes
+import dataclasses
+import logging
+import os
+import platform
+import queue
+import struct
+import threading
+from typing import Iterable, NamedTuple, Optional, Union
+
+import lief
+
+from dycall import elf, pe
+from dycall.cache import ExportCache
+from dycall.elf import ELFReader, ELFReaderError
+from dycall.pe import PEReader, PEReaderError
+from dycall.store import ExportStore
+from dycall.types import ELFExport, Export, PEExport
+
+log = logging.getLogger(__name__)
+
+
+class LoadError(Exception):
+    """Raised when a library cannot be parsed."""
+
+
+class LoadProgress(NamedTuple):
+    """Pushed by `Loader` periodically while a library is being parsed."""
+
+    bytes_mapped: int
+    """Size of the library which has been parsed so far."""
+
+    symbols_read: int
+    """Number of exports built so far."""
+
+
+class LoadBatch(NamedTuple):
+    """Pushed by `Loader` with the exports built since the last batch.
+
+    Batches are contiguous, `start` is the index of the first export of the
+    batch in the final `LoadResult.exports`. Exports found in a cache aren't
+    streamed, they are available right away. A batch whose `start` is less
+    than the number of exports received so far replaces them from `start`
+    onwards; this happens when a reader fails midway and LIEF is used instead.
+    """
+
+    start: int
+    exports: list[Export]
+
+
+@dataclasses.dataclass
+class LoadResult:
+    """Pushed by `Loader` back to UI once a library has been parsed."""
+
+    path: str
+    is_native: bool
+    exports: ExportStore = dataclasses.field(default_factory=ExportStore)
+    kind: Optional[str] = None
+    """`ExportCache.ELF`, `ExportCache.PE` or None for other formats."""
+
+
+def is_native_format(fmt: lief.EXE_FORMATS) -> bool:
+    """Whether a binary of format `fmt` can be loaded on the running OS."""
+    os_name = platform.system()
+    fmts = lief.EXE_FORMATS
+    return (
+        (os_name == "Windows" and fmt == fmts.PE)
+        or (os_name == "Darwin" and fmt == fmts.MACHO)
+        or (os_name == "Linux" and fmt == fmts.ELF)
+    )
+
+
+_Kind2Format = {
+    ExportCache.ELF: lief.EXE_FORMATS.ELF,
+    ExportCache.PE: lief.EXE_FORMATS.PE,
+}
+
+
+class Loader(threading.Thread):
+    """Parses a library and builds its exports in a separate thread.
+
+    Used in `PickerFrame`. Progress, the result and exceptions are pushed into
+    a queue which is checked regularly in the UI thread, just like `Runner`.
+    A load which is no longer required can be abandoned by calling `cancel`,
+    nothing is pushed into the queue after that.
+
+    Exports are streamed as `LoadBatch`es while they are being built so that
+    the UI can show them before the whole library is parsed. Cache hits aren't
+    streamed, the final `LoadResult` always comes last.
+
+    `que` may be None when only the return value of `load` is needed, e.g.
+    in `Prewarmer`; nothing is pushed then.
+
+    When an `ExportCache` or a `ResultLRU` is passed, it is looked up before
+    parsing and updated after it. The in-memory `ResultLRU` is checked first.
+    """
+
+    PROGRESS_INTERVAL = 1000
+    """Number of exports built between two `LoadProgress` updates.
+
+    Also the size of a `LoadBatch`.
+    """
+
+    def __init__(
+        self,
+        que: Optional[queue.Queue],
+        path: str,
+        cache: Optional[ExportCache] = None,
+        lru: Optional[ResultLRU] = None,
+    ) -> None:
+        log.debug("Called with path=%s", path)
+        self.__queue = que
+        self.__path = path
+        self.__cache = cache
+        self.__lru = lru
+        self.__cancelled = threading.Event()
+        super().__init__(daemon=True)
+
+    @property
+    def cancelled(self) -> bool:
+        """Whether `cancel` has been called."""
+        return self.__cancelled.is_set()
+
+    def cancel(self) -> None:
+        """Abandons the load, the parsed exports are discarded."""
+        log.debug("Cancelling load of %s", self.__path)
+        self.__cancelled.set()
+
+    def put(self, item) -> None:
+        """Pushes `item` into the queue unless the load was cancelled."""
+        if self.__queue is not None and not self.cancelled:
+            self.__queue.put(item)
+
+    def run(self):
+        """Parses the library and operates with the queue."""
+        try:
+            result = self.load()
+        except Exception as e:  # pylint: disable=broad-except
+            self.put(e)
+        else:
+            if result is not None:
+                self.put(result)
+
+    def load(self) -> Optional[LoadResult]:
+        """Reads the exports of the library and builds `Export` objects from it.
+
+        ELF shared objects and PE DLLs are read with `dycall.elf.ELFReader`
+        and `dycall.pe.PEReader` respectively, LIEF is used for everything
+        else and as a fallback. Neither is used at all when
+        the exports are found in the cache.
+
+        Returns:
+            None if the load got cancelled in between, `LoadResult` otherwise.
+
+        Raises:
+            LoadError: When LIEF can't parse the library.
+        """
+        path = self.__path
+        lru = self.__lru
+        if lru is not None:
+            result = lru.get(path)
+            if result is not None:
+                log.debug("Found %d exports of %s in memory", len(result.exports), path)
+                return result
+
+        cache = self.__cache
+        result = None
+        if cache is not None:
+            cached = cache.get(path)
+            if cached is not None:
+                log.debug("Found %d exports of %s in cache", len(cached.exports), path)
+                kind = cached.kind
+                native = is_native_format(_Kind2Format[kind])
+                result = LoadResult(path, native, cached.exports, kind)
+
+        if result is None:
+            result = self.__read(path)
+            if result is None:
+                return None
+            log.debug("Built %d exports from %s", len(result.exports), path)
+            if cache is not None and result.kind is not None:
+                cache.put(path, result.kind, result.exports)
+
+        if lru is not None:
+            lru.put(result)
+        return result
+
+    def __read(self, path: str) -> Optional[LoadResult]:
+        with open(path, "rb") as fp:
+            magic = fp.read(4)
+        reader_cls: type[Union[ELFReader, PEReader]]
+        if magic.startswith(elf.MAGIC):
+            fmt, kind, reader_cls = lief.EXE_FORMATS.ELF, ExportCache.ELF, ELFReader
+        elif magic.startswith(pe.MAGIC):
+            fmt, kind, reader_cls = lief.EXE_FORMATS.PE, ExportCache.PE, PEReader
+        else:
+            return self.__parse(path)
+
+        try:
+            with reader_cls(path) as reader:
+                size = reader.size
+                self.put(LoadProgress(size, 0))
+                result = LoadResult(path, is_native_format(fmt), kind=kind)
+                pending: list[Export] = []
+                for exp in reader:
+                    pending.append(exp)
+                    if self.__tick(size, result, pending):
+                        return None
+                self.__flush(size, result, pending)
+        except (ELFReaderError, PEReaderError, struct.error, IndexError) as e:
+            # Readers wrap known failures, the rest are bugs or odd files
+            log.debug("Falling back to LIEF for %s: %s", path, e)
+            return self.__parse(path)
+        return result
+
+    def __parse(self, path: str) -> Optional[LoadResult]:
+        # * LIEF doesn't raise exceptions
+        lib = lief.parse(path)
+        if not isinstance(lib, lief.Binary):
+            raise LoadError(f"Failed to load binary {path}")
+        if self.cancelled:
+            return None
+        size = os.path.getsize(path)
+        self.put(LoadProgress(size, 0))
+
+        fmt = lib.format
+        fmts = lief.EXE_FORMATS
+        result = LoadResult(path, is_native_format(fmt))
+        pending: list[Export] = []
+        if fmt == fmts.PE:
+            result.kind = ExportCache.PE
+            for exp in lib.get_export().entries:
+                pending.append(PEExport(exp.address, exp.name, exp.ordinal))
+                if self.__tick(size, result, pending):
+                    return None
+        elif fmt == fmts.ELF:
+            result.kind = ExportCache.ELF
+            for exp in lib.exported_symbols:
+                info = int(exp.binding) << 4 | int(exp.type)
+                pending.append(
+                    ELFExport(exp.value, exp.name, exp.demangled_name, exp.size, info)
+                )
+                if self.__tick(size, result, pending):
+                    return None
+        self.__flush(size, result, pending)
+        return result
+
+    def __tick(self, size: int, result: LoadResult, pending: list[Export]) -> bool:
+        """Calls `__flush` every `PROGRESS_INTERVAL` exports.
+
+        Returns:
+            Whether the load got cancelled.
+        """
+        if len(pending) < self.PROGRESS_INTERVAL:
+            return self.cancelled
+        return self.__flush(size, result, pending)
+
+    def __flush(self, size: int, result: LoadResult, pending: list[Export]) -> bool:
+        """Moves `pending` exports to `result`, reports progress and pushes
+        them as a `LoadBatch`.
+
+        Returns:
+            Whether the load got cancelled.
+        """
+        exports = result.exports
+        start = len(exports)
+        exports.extend(pending)
+        self.put(LoadProgress(size, len(exports)))
+        if pending and self.__queue is not None:
+            self.put(LoadBatch(start, pending[:]))
+        pending.clear()
+        return self.cancelled
+
+
+class ResultLRU:
+    """Thread-safe in-memory LRU cache of `LoadResult`s.
+
+    The size of every `LoadResult` is estimated when it is put. The least
+    recently used ones are evicted when the total exceeds `budget` bytes.
+    Results of libraries whose size or mtime has changed are never returned.
+    """
+
+    def __init__(self, budget: int) -> None:
+        self.__budget = budget
+        self.__used = 0
+        self.__lock = threading.Lock()
+        # path -> (size, mtime, estimated bytes, result)
+        self.__items: collections.OrderedDict[str, tuple[int, int, int, LoadResult]] = (
+            collections.OrderedDict()
+        )
+
+    def __contains__(self, path: str) -> bool:
+        """Whether a result for `path` is present, stale or not."""
+        with self.__lock:
+            return path in self.__items
+
+    @property
+    def used(self) -> int:
+        """Estimated number of bytes used by all the results."""
+        return self.__used
+
+    @staticmethod
+    def estimate(result: LoadResult) -> int:
+        """Approximate number of bytes used by `result`."""
+        return result.exports.nbytes
+
+    def get(self, path: str) -> Optional[LoadResult]:
+        """Returns the result for `path` and marks it as recently used."""
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        with self.__lock:
+            try:
+                size, mtime, nbytes, result = self.__items[path]
+            except KeyError:
+                return None
+            if (size, mtime) != (st.st_size, st.st_mtime_ns):
+                del self.__items[path]
+                self.__used -= nbytes
+                return None
+            self.__items.move_to_end(path)
+            return result
+
+    def put(self, result: LoadResult) -> None:
+        """Adds `result` and evicts the least recently used ones if required.
+
+        Results bigger than the budget itself are not added at all.
+        """
+        try:
+            st = os.stat(result.path)
+        except OSError:
+            return
+        nbytes = self.estimate(result)
+        if nbytes > self.__budget:
+            log.debug("%s is too big to be kept in memory", result.path)
+            return
+        with self.__lock:
+            old = self.__items.pop(result.path, None)
+            if old is not None:
+                self.__used -= old[2]
+            self.__items[result.path] = (st.st_size, st.st_mtime_ns, nbytes, result)
+            self.__used += nbytes
+            while self.__used > self.__budget:
+                path, (*_, evicted, _) = self.__items.popitem(last=False)
+                self.__used -= evicted
+                log.debug("Evicted %s from memory", path)
+
+
+class Prewarmer:
+    """Loads libraries into a `ResultLRU` using low priority worker threads.
+
+    Used by `dycall.app.App` to load recently opened libraries at startup,
+    so that opening them from **File** -> **Open Recent** is instant. On
+    Linux and Windows the workers lower their OS scheduling priority. Since
+    they are daemon threads, they never delay exiting DyCall.
+    """
+
+    def __init__(
+        self,
+        lru: ResultLRU,
+        cache: Optional[ExportCache] = None,
+        workers: int = 1,
+    ) -> None:
+        self.__lru = lru
+        self.__cache = cache
+        self.__paths: queue.Queue = queue.Queue()
+        self.__stopped = threading.Event()
+        self.__workers = [
+            threading.Thread(target=self.__work, name=f"Prewarmer-{i}", daemon=True)
+            for i in range(workers)
+        ]
+
+    def start(self, paths: Iterable[str]) -> None:
+        """Starts loading `paths` in the background, in order."""
+        for path in paths:
+            self.__paths.put(path)
+        for worker in self.__workers:
+            if not worker.is_alive():
+                worker.start()
+
+    def join(self) -> None:
+        """Waits until all the libraries have been loaded."""
+        for worker in self.__workers:
+            if worker.is_alive():
+                worker.join()
+
+    def stop(self) -> None:
+        """Stops picking up more libraries, the ones being loaded are finished."""
+        self.__stopped.set()
+
+    @staticmethod
+    def lower_priority() -> None:
+        """Lowers the OS scheduling priority of the calling thread."""
+        try:
+            if platform.system() == "Linux":
+                # On Linux, a thread ID can be used in place of a PID
+                os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), 19)
+            elif platform.system() == "Windows":
+                kernel32 = ctypes.windll.kernel32  # type: ignore
+                kernel32.SetThreadPriority(kernel32.GetCurrentThread(), -2)
+        except (AttributeError, OSError) as e:
+            log.debug("Couldn't lower priority: %r", e)
+
+    def __work(self) -> None:
+        self.lower_priority()
+        while not self.__stopped.is_set():
+            try:
+                path = self.__paths.get_nowait()
+            except queue.Empty:
+                return
+            if path in self.__lru:
+                continue
+            log.debug("Prewarming %s", path)
+            loader = Loader(None, path, self.__cache, self.__lru)
+            try:
+                loader.load()
+            except Exception as e:  # pylint: disable=broad-except
+                log.debug("Failed to prewarm %s: %r", path, e)
@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+
+"""
+dycall.pe
+~~~~~~~~~
+
+Contains `PEReader`.
+"""
+
+from __future__ import annotations
+
+import logging
+import mmap
+import struct
+from typing import Iterator
+
+try:
+    from typing import Final  # type: ignore
+except ImportError:
+    # pylint: disable=ungrouped-imports
+    from typing_extensions import Final  # type: ignore
+
+from dycall.types import PEExport
+
+log = logging.getLogger(__name__)
+
+MAGIC: Final = b"MZ"
+SIGNATURE: Final = b"PE\0\0"
+
+PE32: Final = 0x10B
+PE32_PLUS: Final = 0x20B
+
+_SECTION: Final = struct.Struct("<8sIIII")
+_EXPORT_DIRECTORY: Final = struct.Struct("<IIHHIIIIIII")
+
+
+class PEReaderError(Exception):
+    """Raised when a library cannot be read by `PEReader`.
+
+    Callers should fall back to LIEF when this happens.
+    """
+
+
+class PEReader:
+    """Reads exports from the export directory of a PE DLL.
+
+    Only the DOS and NT headers, section table and export directory are
+    decoded, the rest of the image is never touched. The file is
+    memory-mapped; the name pointer table is indexed up front but names and
+    forwarders are decoded only when the corresponding `PEExport` is built.
+    Ordinal-only exports cost a single table lookup each.
+
+    Anything unusual (no export directory, RVAs outside any section)
+    raises `PEReaderError`.
+
+    Usage:
+        with PEReader(path) as reader:
+            for exp in reader:
+                ...
+    """
+
+    def __init__(self, path: str) -> None:
+        with open(path, "rb") as fp:
+            try:
+                self.__mm = mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError as e:  # Empty file
+                raise PEReaderError(f"{path} is empty") from e
+        try:
+            self.__parse_headers()
+        except (struct.error, IndexError) as e:
+            self.close()
+            raise PEReaderError(f"{path} is truncated or malformed") from e
+        except PEReaderError:
+            self.close()
+            raise
+
+    def __enter__(self) -> PEReader:
+        """Returns itself."""
+        return self
+
+    def __exit__(self, *_) -> None:
+        """Unmaps the file."""
+        self.close()
+
+    def close(self) -> None:
+        """Unmaps the file."""
+        self.__mm.close()
+
+    @property
+    def size(self) -> int:
+        """Number of bytes mapped."""
+        return len(self.__mm)
+
+    def __len__(self) -> int:
+        """Number of slots in the export address table (used or not)."""
+        return self.__num_functions
+
+    def __parse_headers(self) -> None:
+        mm = self.__mm
+        if mm[:2] != MAGIC:
+            raise PEReaderError("Not a PE file")
+        (e_lfanew,) = struct.unpack_from("<I", mm, 0x3C)
+        if struct.unpack_from("<4s", mm, e_lfanew)[0] != SIGNATURE:
+            raise PEReaderError("Invalid NT headers signature")
+
+        # COFF file header
+        coff = e_lfanew + 4
+        num_sections, opt_size = struct.unpack_from("<2xH12xH", mm, coff)
+        opt = coff + 20
+
+        # Optional header
+        (magic,) = struct.unpack_from("<H", mm, opt)
+        if magic == PE32:
+            num_dirs_at, dirs_at = 92, 96
+        elif magic == PE32_PLUS:
+            num_dirs_at, dirs_at = 108, 112
+        else:
+            raise PEReaderError(f"Unknown optional header magic {magic:#x}")
+        (num_dirs,) = struct.unpack_from("<I", mm, opt + num_dirs_at)
+        if num_dirs < 1:
+            raise PEReaderError("No data directories")
+        dir_rva, dir_size = struct.unpack_from("<II", mm, opt + dirs_at)
+        if not dir_rva or not dir_size:
+            raise PEReaderError("No export directory")
+
+        # Section table
+        self.__sections: list[tuple[int, int, int]] = []
+        table = opt + opt_size
+        for i in range(num_sections):
+            _, vsize, vaddr, rawsize, rawptr = _SECTION.unpack_from(mm, table + i * 40)
+            self.__sections.append((vaddr, max(vsize, rawsize), rawptr))
+
+        # Export directory
+        (
+            *_,
+            self.__base,
+            self.__num_functions,
+            num_names,
+            functions,
+            names,
+            ordinals,
+        ) = _EXPORT_DIRECTORY.unpack_from(mm, self.__offset(dir_rva))
+        self.__dir = (dir_rva, dir_rva + dir_size)
+        self.__functions = self.__offset(functions) if self.__num_functions else 0
+
+        # Maps export address table index to the RVA of its name
+        self.__names: dict[int, int] = {}
+        if num_names:
+            name_rvas = struct.unpack_from(f"<{num_names}I", mm, self.__offset(names))
+            indices = struct.unpack_from(f"<{num_names}H", mm, self.__offset(ordinals))
+            # An address can have multiple names, the first one is kept
+            for i, name_rva in zip(indices, name_rvas):
+                self.__names.setdefault(i, name_rva)
+
+    def __offset(self, rva: int) -> int:
+        """Converts a relative virtual address to a file offset."""
+        for vaddr, size, rawptr in self.__sections:
+            if vaddr <= rva < vaddr + size:
+                return rva - vaddr + rawptr
+        raise PEReaderError(f"RVA {rva:#x} is not in any section")
+
+    def __string(self, rva: int) -> str:
+        mm = self.__mm
+        start = self.__offset(rva)
+        end = mm.find(b"\0", start)
+        if end == -1:
+            raise PEReaderError(f"Unterminated string at {start:#x}")
+        return mm[start:end].decode("ascii", errors="replace")
+
+    def __iter__(self) -> Iterator[PEExport]:
+        """Yields a `PEExport` for every used slot in the export address table.
+
+        Forwarded exports have `PEExport.forwarder` set to the forwarder
+        string (e.g. `NTDLL.RtlAllocateHeap`).
+        """
+        mm = self.__mm
+        names = self.__names
+        lo, hi = self.__dir
+        try:
+            rvas = struct.unpack_from(f"<{self.__num_functions}I", mm, self.__functions)
+        except struct.error as e:  # Truncated file
+            raise PEReaderError(f"Export address table is out of bounds: {e}") from e
+        for i, rva in enumerate(rvas):
+            if not rva:
+                continue
+            name_rva = names.get(i)
+            name = self.__string(name_rva) if name_rva is not None else ""
+            forwarder = self.__string(rva) if lo <= rva < hi else ""
+            yield PEExport(rva, name, self.__base + i, forwarder=forwarder)
@@ -10,18 +10,21 @@ Contain `PickerFrame`.
 from __future__ import annotations
 
 import collections
-import ctypes.util
 import logging
-import platform
+import queue
 from tkinter import filedialog
+from typing import Optional
 
-import lief
 import ttkbootstrap as tk
 from ttkbootstrap import ttk
 from ttkbootstrap.dialogs import Messagebox
 
 from dycall._widgets import _TrButton
-from dycall.types import ELFExport, Export, PEExport
+from dycall.cache import ExportCache
+from dycall.loader import LoadBatch, Loader, LoadProgress, LoadResult, ResultLRU
+from dycall.resolver import find_library
+from dycall.runner import library_cache
+from dycall.store import ExportStore
 
 log = logging.getLogger(__name__)
 
@@ -33,10 +36,19 @@ class PickerFrame(ttk.Labelframe):
 
     Features:
     - Validation
-    - Supports short names (thanks to system search order)
+    - Supports short names (thanks to system search order, see
+      `dycall.resolver.LibraryResolver`)
     - Remembers recently opened files.
+    - Parsed exports are cached on disk, see `dycall.cache.ExportCache`, and
+      in memory, see `dycall.loader.ResultLRU`.
+    - Libraries are parsed in a `dycall.loader.Loader` thread, loading another
+      library cancels the one being parsed currently.
+    - Exports are shown while the library is being parsed, in batches.
     """
 
+    BATCHES_PER_TICK = 10
+    """Maximum number of `LoadBatch`es handled by `process_queue` at once."""
+
     def __init__(
         self,
         root: tk.Window,
@@ -46,8 +58,10 @@ class PickerFrame(ttk.Labelframe):
         status: tk.StringVar,
         is_loaded: tk.BooleanVar,
         is_native: tk.BooleanVar,
-        exports: list[Export],
+        exports: ExportStore,
         recents: collections.deque,
+        export_cache: Optional[ExportCache] = None,
+        loaded_libs: Optional[ResultLRU] = None,
     ):
         log.debug("Initialising")
 
@@ -61,7 +75,11 @@ class PickerFrame(ttk.Labelframe):
         self.__is_native = is_native
         self.__exports = exports
         self.__recents = recents
-        self.__os_name = platform.system()
+        self.__export_cache = export_cache
+        self.__loaded_libs = loaded_libs
+        self.__loader: Optional[Loader] = None
+        self.__load_q: Optional[queue.Queue] = None
+        self.__after_id: Optional[str] = None
 
         # Library path entry
         self.le = ttk.Entry(
@@ -96,7 +114,7 @@ class PickerFrame(ttk.Labelframe):
         the result of the validation.
         """
         if s:
-            ret = ctypes.util.find_library(s)
+            ret = find_library(s)
             if ret:
                 if ret == self.__lib_path.get():
                     # Enable
@@ -130,10 +148,12 @@ class PickerFrame(ttk.Labelframe):
         """Implements the library load logic.
 
         1. Finds absolute path if `dont_search` is `False`.
-        2. Parses the library with LIEF.
-        3. Checks if it is a native library.
-        4. Triggers the population of **Exports** combobox.
-        5. Updates recents.
+        2. Cancels the library load in progress, if any.
+        3. Forgets cached handles and functions, see `dycall.runner.LibraryCache`.
+        4. Starts a `dycall.loader.Loader` thread to parse the library.
+
+        The rest is done by `process_queue` and `loaded` once the `Loader`
+        thread reports back.
 
         Args:
             dont_search (bool, optional): Don't use the system search
@@ -141,41 +161,101 @@ class PickerFrame(ttk.Labelframe):
             path (str, optional): Used instead of `self.__lib_path` as the library
                 path. Defaults to None. If None, then `self.__lib_path` is used.
         """
-
-        def failure():
-            self.__is_loaded.set(False)
-            self.__status.set("Load failed")
-            Messagebox.show_error(f"Failed to load binary {path}", "Load failed")
-
         # Find absolute path
         if path is not None:
             self.__lib_path.set(path)
         else:
             path = self.__lib_path.get()
         if not dont_search:
-            abspath = ctypes.util.find_library(path)
+            abspath = find_library(path)
             if abspath is not None:
                 path = abspath
                 self.__lib_path.set(path)
         self.__output.set("")
+        # The library might have been rebuilt, look up its functions again
+        library_cache.invalidate(path)
 
-        # * LIEF doesn't raise exceptions
-        lib = lief.parse(path)
-        if not isinstance(lib, lief.Binary):
-            failure()
+        self.cancel()
+        self.__is_loaded.set(False)
+        self.__exports.clear()
+        self.__root.event_generate("<<AppendExports>>")
+        self.__root.event_generate("<<ToggleExportsFrame>>", state=0)
+        self.__root.event_generate("<<ToggleFunctionFrame>>", state=0)
+        self.__status.set("Loading...")
+        que: queue.Queue = queue.Queue()
+        self.__load_q = que
+        self.__loader = Loader(que, path, self.__export_cache, self.__loaded_libs)
+        self.__loader.start()
+        self.process_queue(que)
+
+    def process_queue(self, que: queue.Queue) -> None:
+        """Checks the queue of the `Loader` thread for progress and results.
+
+        This function schedules itself to run every 100ms in the UI thread
+        until the `Loader` pushes a `LoadResult` or an exception. Queues of
+        cancelled loads are ignored.
+
+        Exports in a `LoadBatch` are appended to the list of exports and
+        passed on to `ExportsFrame` via `<<AppendExports>>`. Only
+        `BATCHES_PER_TICK` batches are handled at once, the rest are handled
+        as soon as Tk gets to process pending events.
+        """
+        self.__after_id = None
+        if que is not self.__load_q:
             return
+
+        progress = None
+        batches = 0
+        while batches < self.BATCHES_PER_TICK:
+            try:
+                item = que.get_nowait()
+            except queue.Empty:
+                break
+            if isinstance(item, LoadBatch):
+                batches += 1
+                start = item.start
+                if start < len(self.__exports):
+                    self.__exports.truncate(start)
+                    self.__root.event_generate("<<AppendExports>>")
+                self.__exports.extend(item.exports)
+                self.__root.event_generate("<<AppendExports>>")
+            elif isinstance(item, LoadProgress):
+                progress = item
+            elif isinstance(item, LoadResult):
+                self.__load_q = self.__loader = None
+                self.loaded(item)
+                return
+            elif isinstance(item, Exception):
+                self.__load_q = self.__loader = None
+                log.exception(item)
+                self.__is_loaded.set(False)
+                self.__status.set("Load failed")
+                Messagebox.show_error(str(item), "Load failed")
+                return
+
+        if batches:
+            self.__status.set(f"Loading... {len(self.__exports)} exports found so far")
+        elif progress is not None:
+            self.__status.set(
+                f"Loading... {progress.bytes_mapped // 1024} KiB mapped, "
+                f"{progress.symbols_read} symbols read"
+            )
+        delay = 1 if batches == self.BATCHES_PER_TICK else 100
+        self.__after_id = self.after(delay, self.process_queue, que)
+
+    def loaded(self, result: LoadResult) -> None:
+        """Updates the UI once the `Loader` thread has parsed the library.
+
+        1. Checks if it is a native library.
+        2. Triggers the population of **Exports** combobox.
+        3. Updates recents.
+        """
+        path = result.path
         self.__is_loaded.set(True)
         self.__status.set("Loaded successfully")
         self.__root.event_generate("<<SetWindowTitle>>")
 
-        os = self.__os_name
-        fmt = lib.format
-        fmts = lief.EXE_FORMATS
-        if (
-            (os == "Windows" and fmt == fmts.PE)
-            or (os == "Darwin" and fmt == fmts.MACHO)
-            or (os == "Linux" and fmt == fmts.ELF)
-        ):
+        if result.is_native:
             self.__is_native.set(True)
         else:
             Messagebox.show_warning(
@@ -185,15 +265,8 @@ class PickerFrame(ttk.Labelframe):
             )
             self.__is_native.set(False)
 
-        self.__exports.clear()
-        if fmt == fmts.PE:
-            for exp in lib.get_export().entries:
-                self.__exports.append(PEExport(exp.address, exp.name, exp.ordinal))
-        elif fmt == fmts.ELF:
-            for exp in lib.exported_symbols:
-                self.__exports.append(
-                    ELFExport(exp.value, exp.name, exp.demangled_name)
-                )
+        # Replaces the exports streamed so far, they are the same
+        self.__exports.adopt(result.exports)
         self.__root.event_generate("<<PopulateExports>>")
 
         # Update recents
@@ -203,3 +276,16 @@ class PickerFrame(ttk.Labelframe):
             self.__recents.remove(path)
             self.__recents.appendleft(path)
         self.__root.event_generate("<<UpdateRecents>>")
+
+    def cancel(self) -> None:
+        """Cancels the library load in progress, if any."""
+        if self.__loader is not None:
+            self.__loader.cancel()
+        if self.__after_id is not None:
+            self.after_cancel(self.__after_id)
+        self.__loader = self.__load_q = self.__after_id = None
+
+    def destroy(self):
+        """Cancels the library load in progress before getting destroyed."""
+        self.cancel()
+        super().destroy()
@@ -0,0 +1,284 @@
+#!/usr/bin/env python3
+
+"""
+dycall.resolver
+~~~~~~~~~~~~~~~
+
+Contains `LibraryResolver` and `find_library`.
+"""
+
+from __future__ import annotations
+
+import ctypes.util
+import logging
+import os
+import platform
+import struct
+import sys
+from typing import Optional
+
+try:
+    from typing import Final  # type: ignore
+except ImportError:
+    # pylint: disable=ungrouped-imports
+    from typing_extensions import Final  # type: ignore
+
+from dycall.elf import ELFReader, ELFReaderError
+
+log = logging.getLogger(__name__)
+
+LD_SO_CACHE: Final = "/etc/ld.so.cache"
+
+_OLD_MAGIC: Final = b"ld.so-1.7.0"
+_NEW_MAGIC: Final = b"glibc-ld.so.cache1.1"
+
+# magic, nlibs, len_strings, flags, extension_offset
+_NEW_HEADER: Final = struct.Struct("<20sIIB3xI12x")
+
+# flags, key, value, osversion, hwcap
+_NEW_ENTRY: Final = struct.Struct("<iIIIQ")
+
+# flags, key, value
+_OLD_ENTRY: Final = struct.Struct("<iII")
+
+FLAG_TYPE_MASK: Final = 0x00FF
+FLAG_REQUIRED_MASK: Final = 0xFF00
+FLAG_ELF_LIBC6: Final = 0x0003
+
+# `FLAG_REQUIRED_MASK` bits of the libraries loadable by this interpreter, see
+# glibc's sysdeps/generic/ldconfig.h. Machines not in here accept any entry.
+_RequiredFlags: Final = {
+    ("x86_64", "64bit"): 0x0300,
+    ("x86_64", "32bit"): 0x0000,
+    ("i386", "32bit"): 0x0000,
+    ("i686", "32bit"): 0x0000,
+    ("aarch64", "64bit"): 0x0A00,
+    ("armv7l", "32bit"): 0x0900,
+    ("ppc64", "64bit"): 0x0500,
+    ("ppc64le", "64bit"): 0x0500,
+    ("s390x", "64bit"): 0x0400,
+    ("riscv64", "64bit"): 0x1000,
+}
+
+
+def parse_ld_so_cache(data: bytes, required: Optional[int]) -> list[tuple[str, str]]:
+    """Parses the contents of `/etc/ld.so.cache`.
+
+    Both the new (glibc 2.32+) and the old format (optionally followed by the
+    new one) are supported.
+
+    Args:
+        data (bytes): The contents of the cache file.
+        required (int, optional): Only entries with these `FLAG_REQUIRED_MASK`
+            bits are returned. All libc6 entries are returned if None.
+
+    Returns:
+        (soname, path) pairs in the order they appear in the cache.
+    """
+    if data.startswith(_OLD_MAGIC):
+        (nlibs,) = struct.unpack_from("<I", data, 12)
+        end = 16 + nlibs * _OLD_ENTRY.size
+        new = data.find(_NEW_MAGIC, end)
+        if new == -1:
+            return _filter(data, end, _OLD_ENTRY.iter_unpack(data[16:end]), required)
+        data = data[new:]
+    if not data.startswith(_NEW_MAGIC):
+        raise ValueError("Unknown ld.so.cache format")
+    _, nlibs, *_ = _NEW_HEADER.unpack_from(data, 0)
+    start = _NEW_HEADER.size
+    end = start + nlibs * _NEW_ENTRY.size
+    entries = _NEW_ENTRY.iter_unpack(data[start:end])
+    return _filter(data, 0, ((f, k, v) for f, k, v, *_ in entries), required)
+
+
+def _filter(data: bytes, base: int, entries, required) -> list[tuple[str, str]]:
+    def string(offset: int) -> str:
+        offset += base
+        end = data.index(b"\0", offset)
+        return os.fsdecode(data[offset:end])
+
+    libs = []
+    for flags, key, value in entries:
+        if flags & FLAG_TYPE_MASK != FLAG_ELF_LIBC6:
+            continue
+        if required is not None and flags & FLAG_REQUIRED_MASK != required:
+            continue
+        libs.append((string(key), string(value)))
+    return libs
+
+
+def _matches(name: str, filename: str) -> bool:
+    """`find_library` semantics: `c` matches `libc.so.6`, so does `libc.so`."""
+    return (
+        filename == name
+        or filename.startswith(f"lib{name}.")
+        or filename.startswith(f"{name}.so")
+    )
+
+
+class LibraryResolver:
+    """Finds the absolute path of a library from its (short) name.
+
+    On Linux, `ctypes.util.find_library` runs `ldconfig -p` or even `gcc` or
+    `ld` every time it is called. Instead, this follows the dynamic loader's
+    search order itself, i.e.
+
+    1. `DT_RPATH` of the loading context (unless it has a `DT_RUNPATH`).
+    2. `LD_LIBRARY_PATH`.
+    3. `DT_RUNPATH` of the loading context.
+    4. `/etc/ld.so.cache`, parsed directly.
+    5. The default directories.
+
+    The loading context defaults to the Python interpreter. Results are
+    memoised per `LD_LIBRARY_PATH`; everything is forgotten when the mtime of
+    `/etc/ld.so.cache` changes or when `clear` is called. Directory listings
+    are cached too.
+
+    On other platforms, `ctypes.util.find_library` doesn't spawn processes;
+    its results are memoised as is.
+    """
+
+    def __init__(
+        self,
+        cache_path: str = LD_SO_CACHE,
+        context: Optional[str] = sys.executable,
+    ) -> None:
+        self.__cache_path = cache_path
+        self.__context = context
+        self.__is_linux = platform.system() == "Linux"
+        self.__memo: dict[tuple[str, str], Optional[str]] = {}
+        self.__cache_mtime: Optional[int] = None
+        self.__cache: list[tuple[str, str]] = []
+        self.__listings: dict[str, list[str]] = {}
+        self.__rpath: Optional[list[str]] = None
+        self.__runpath: list[str] = []
+        arch = platform.architecture()[0]
+        self.__required = _RequiredFlags.get((platform.machine(), arch))
+        self.__default_dirs = ["/lib", "/usr/lib"]
+        if arch == "64bit":
+            self.__default_dirs[:0] = ["/lib64", "/usr/lib64"]
+
+    def clear(self) -> None:
+        """Forgets all memoised results and directory listings."""
+        self.__memo.clear()
+        self.__listings.clear()
+
+    def find(self, name: str) -> Optional[str]:
+        """Returns the absolute path of a library or None if it is not found.
+
+        Paths (names containing a directory separator) are only checked for
+        existence.
+        """
+        if self.__is_linux:
+            self.__check_cache()
+            env = os.environ.get("LD_LIBRARY_PATH", "")
+        else:
+            env = os.environ.get("PATH", "")
+        key = (name, env)
+        try:
+            return self.__memo[key]
+        except KeyError:
+            pass
+
+        if os.path.dirname(name):
+            path = os.path.abspath(name) if os.path.isfile(name) else None
+        elif self.__is_linux:
+            path = self.__search(name, env)
+        else:
+            path = ctypes.util.find_library(name)
+        log.debug("Resolved %s to %s", name, path)
+        self.__memo[key] = path
+        return path
+
+    def __check_cache(self) -> None:
+        try:
+            mtime: Optional[int] = os.stat(self.__cache_path).st_mtime_ns
+        except OSError:
+            mtime = None
+        if mtime == self.__cache_mtime and self.__rpath is not None:
+            return
+
+        log.debug("(Re)loading %s", self.__cache_path)
+        self.clear()
+        self.__cache_mtime = mtime
+        self.__cache = []
+        if mtime is not None:
+            try:
+                with open(self.__cache_path, "rb") as fp:
+                    self.__cache = parse_ld_so_cache(fp.read(), self.__required)
+            except (OSError, ValueError, struct.error) as e:
+                log.warning("Failed to parse %s: %r", self.__cache_path, e)
+        self.__load_context()
+
+    def __load_context(self) -> None:
+        self.__rpath, self.__runpath = [], []
+        context = self.__context
+        if context is None:
+            return
+        try:
+            with ELFReader(context) as reader:
+                rpath, runpath = reader.rpath, reader.runpath
+        except (OSError, ELFReaderError) as e:
+            log.debug("Ignoring run paths of %s: %s", context, e)
+            return
+        origin = os.path.dirname(os.path.realpath(context))
+
+        def expand(dirs: list[str]) -> list[str]:
+            return [
+                d.replace("${ORIGIN}", origin).replace("$ORIGIN", origin) for d in dirs
+            ]
+
+        # DT_RPATH is ignored when DT_RUNPATH is present
+        self.__rpath = [] if runpath else expand(rpath)
+        self.__runpath = expand(runpath)
+
+    def __search(self, name: str, env: str) -> Optional[str]:
+        dirs = list(self.__rpath or [])
+        dirs += [d for d in env.replace(";", ":").split(":") if d]
+        dirs += self.__runpath
+        for d in dirs:
+            path = self.__search_dir(d, name)
+            if path is not None:
+                return path
+
+        first = None
+        for soname, path in self.__cache:
+            if soname == name:
+                return path
+            if first is None and _matches(name, soname):
+                first = path
+        if first is not None:
+            return first
+
+        for d in self.__default_dirs:
+            path = self.__search_dir(d, name)
+            if path is not None:
+                return path
+        return None
+
+    def __search_dir(self, dirpath: str, name: str) -> Optional[str]:
+        try:
+            listing = self.__listings[dirpath]
+        except KeyError:
+            try:
+                with os.scandir(dirpath) as it:
+                    listing = sorted(e.name for e in it if e.is_file())
+            except OSError:
+                listing = []
+            self.__listings[dirpath] = listing
+        if name in listing:
+            return os.path.join(os.path.abspath(dirpath), name)
+        for filename in listing:
+            if _matches(name, filename):
+                return os.path.join(os.path.abspath(dirpath), filename)
+        return None
+
+
+_resolver = LibraryResolver()
+
+
+def find_library(name: str) -> Optional[str]:
+    """Drop-in replacement for `ctypes.util.find_library` using a shared
+    `LibraryResolver`. Unlike it, an absolute path is returned on Linux.
+    """
+    return _resolver.find(name)
@@ -4,46 +4,218 @@
 dycall.runner
 ~~~~~~~~~~~~~
 
-Contains `Runner`.
+Contains `Runner`, `RunnerPool` and `LibraryCache`.
 """
 
 from __future__ import annotations
 
 import ctypes
+import itertools
 import logging
+import os
 import platform
-import queue
 import threading
-from typing import Union
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Optional, Sequence, Union
 
-import ttkbootstrap as tk
-
-from dycall.types import CallConvention, Marshaller, ParameterType, RunResult
+from dycall.types import CallConvention, ParameterType, RunResult, compile_signature
 
 log = logging.getLogger(__name__)
 
 
-class Runner(threading.Thread):
-    """Executes an exported function in a separate thread.
+class LibraryCache:
+    """Library handles and resolved functions reused by every `Runner`.
+
+    Handles are keyed by the library path and the options it is opened with,
+    functions by handle, name or ordinal, calling convention, return type and
+    argument types. Back-to-back calls only pay for marshalling and the call.
+
+    Entries of a library are dropped by `invalidate`, which is called by
+    `dycall.picker.PickerFrame.load` whenever a library is (re)loaded, and
+    when the size or modification time of the file has changed since it was
+    opened. ctypes never unloads a library though, a changed file is only
+    loaded again if it was replaced.
+    """
+
+    def __init__(self) -> None:
+        self.__lock = threading.Lock()
+        self.__handles: dict[tuple, tuple[Optional[tuple[int, int]], Any]] = {}
+        self.__functions: dict[tuple, Any] = {}
+
+    @staticmethod
+    def __identity(path: str) -> Optional[tuple[int, int]]:
+        try:
+            st = os.stat(path)
+        except OSError:  # Not a path, searched by the dynamic loader
+            return None
+        return st.st_size, st.st_mtime_ns
+
+    def handle(
+        self,
+        path: str,
+        call_conv: CallConvention,
+        use_errno: bool,
+        use_last_error: bool,
+    ) -> ctypes.CDLL:
+        """Returns a `ctypes.WinDLL` for `CallConvention.StdCall` and a
+        `ctypes.CDLL` otherwise, opening the library only if needed.
+        """
+        key = (path, call_conv, use_errno, use_last_error)
+        ident = self.__identity(path)
+        with self.__lock:
+            cached = self.__handles.get(key)
+        if cached is not None:
+            if cached[0] == ident:
+                return cached[1]
+            log.debug("%s has changed", path)
+            self.invalidate(path)
+
+        if call_conv == CallConvention.StdCall:
+            handle = ctypes.WinDLL(  # type: ignore
+                path, use_last_error=use_last_error, use_errno=use_errno
+            )
+        elif platform.system() == "Windows":
+            handle = ctypes.CDLL(
+                path, use_errno=use_errno, use_last_error=use_last_error
+            )
+        else:
+            handle = ctypes.CDLL(path, use_errno=use_errno)
+        with self.__lock:
+            self.__handles[key] = (ident, handle)
+        return handle
+
+    def function(
+        self,
+        handle: ctypes.CDLL,
+        name_or_ord: Union[str, int],
+        functype: Callable,
+        restype: Any,
+        argtypes: Sequence[Any],
+        use_errno: bool = False,
+        use_last_error: bool = False,
+    ):
+        """Returns the function `name_or_ord` of `handle` with the prototype
+        built by `functype`, resolving it only if needed.
+
+        `use_errno` and `use_last_error` are flags of the prototype, not of
+        the handle, functions built by `functype` don't inherit them.
+
+        Raises:
+            AttributeError: When the library has no such export.
+        """
+        key = (
+            handle,
+            name_or_ord,
+            functype,
+            restype,
+            tuple(argtypes),
+            use_errno,
+            use_last_error,
+        )
+        with self.__lock:
+            func = self.__functions.get(key)
+        if func is None:
+            prototype = functype(
+                restype, *argtypes, use_errno=use_errno, use_last_error=use_last_error
+            )
+            func = prototype((name_or_ord, handle))
+            with self.__lock:
+                self.__functions[key] = func
+        return func
+
+    def invalidate(self, path: Optional[str] = None) -> None:
+        """Forgets the handles and functions of the library at `path`.
+
+        Everything is forgotten when `path` is None.
+        """
+        with self.__lock:
+            handles = self.__handles
+            if path is None:
+                handles.clear()
+                self.__functions.clear()
+                return
+            dropped = {id(handles.pop(k)[1]) for k in list(handles) if k[0] == path}
+            functions = self.__functions
+            for key in [k for k in functions if id(k[0]) in dropped]:
+                del functions[key]
+
+
+library_cache = LibraryCache()
+"""Shared by all the `Runner`s."""
+
+
+class RunnerPool:
+    """Worker threads which execute the calls of every `Runner`.
 
-    Used in `FunctionFrame`. Exceptions and results are pushed into a queue.
-    The queues are then checked regularly until they are not empty in the UI
-    thread. This ensures that the UI doesn't get blocked.
+    Calls run concurrently in a `ThreadPoolExecutor`, whose threads are reused;
+    ctypes releases the GIL while a function runs. Calls submitted as `pinned`
+    run one at a time on a single dedicated thread instead, for libraries
+    which keep thread-local state or must be called from the thread which
+    initialised them.
+
+    Every call gets an ID, `pending` tracks the ones which haven't finished.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None) -> None:
+        self.__pool = ThreadPoolExecutor(max_workers, "Runner")
+        self.__pinned = ThreadPoolExecutor(1, "PinnedRunner")
+        self.__ids = itertools.count(1)
+        self.__lock = threading.Lock()
+        self.__pending: dict[int, Future] = {}
+
+    @property
+    def pending(self) -> dict[int, Future]:
+        """Futures of the calls in flight, by call ID."""
+        with self.__lock:
+            return dict(self.__pending)
+
+    def submit(self, fn: Callable[[], Any], pinned: bool = False) -> tuple[int, Future]:
+        """Schedules `fn`, a `Runner.run` usually.
+
+        Returns:
+            The ID of the call and its future.
+        """
+        pool = self.__pinned if pinned else self.__pool
+        call_id = next(self.__ids)
+        with self.__lock:
+            self.__pending[call_id] = future = pool.submit(fn)
+        future.add_done_callback(lambda _: self.__done(call_id))
+        log.debug("Submitted call #%d, pinned=%s", call_id, pinned)
+        return call_id, future
+
+    def __done(self, call_id: int) -> None:
+        with self.__lock:
+            del self.__pending[call_id]
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stops the threads once the pending calls are done."""
+        self.__pool.shutdown(wait)
+        self.__pinned.shutdown(wait)
+
+
+runner_pool = RunnerPool()
+"""Executes the calls made from the UI."""
+
+
+class Runner:
+    """A call of an exported function, executed by `RunnerPool`.
+
+    Used in `FunctionFrame`. Arguments are validated when it is created, so
+    invalid ones are reported right away in the UI thread. `submit` returns
+    a future of the `RunResult`, which also carries **errno** and
+    **GetLastError**; nothing in the UI is touched from the worker thread.
     """
 
     def __init__(
         self,
-        exc: queue.Queue,
-        que: queue.Queue,
         args: list[list[str]],
         call_conv: str,
         returns: str,
         lib_path: str,
         name_or_ord: str,
-        get_last_error: tk.IntVar,
         show_get_last_error: bool,
-        errno: tk.IntVar,
         show_errno: bool,
+        isolated: bool = False,
     ) -> None:
         log.debug(
             "Called with args=%s, "
@@ -51,83 +223,100 @@ class Runner(threading.Thread):
             "returns=%s, "
             "lib_path=%s, "
             "name_or_ord=%s, "
-            "get_last_error=%d, "
             "show_get_last_error=%s, "
-            "errno=%d, "
-            "show_errno=%s",
+            "show_errno=%s, "
+            "isolated=%s",
             args,
             call_conv,
             returns,
             lib_path,
             name_or_ord,
-            get_last_error.get(),
             show_get_last_error,
-            errno.get(),
             show_errno,
+            isolated,
         )
-        self.__exc = exc
-        self.__queue = que
-        self.__get_last_error = get_last_error
         self.__show_get_last_error = show_get_last_error
-        self.__errno = errno
         self.__show_errno = show_errno
         self.__is_windows = platform.system() == "Windows"
         self.__call_conv = CallConvention(call_conv)
-        self.__restype = ParameterType(returns).ctype
-        if self.__call_conv == CallConvention.StdCall:
-            self.__handle = ctypes.WinDLL(
+        self.__plan = plan = compile_signature(
+            ParameterType(returns), tuple(ParameterType(t) for t, _ in args)
+        )
+        self.__values = [value for _, value in args]
+        # Converted again by `run`, holding on to them would keep the
+        # preallocated arguments of the plan in use if it's never called
+        plan.release(plan.encode(self.__values))
+        self.__request: Optional[tuple] = None
+        if isolated:
+            # The `Runner` in the worker converts them
+            self.__request = (
+                [[t, v] for t, v in args],
+                call_conv,
+                returns,
                 lib_path,
-                use_last_error=show_get_last_error,
-                use_errno=show_errno,
+                name_or_ord,
+                show_get_last_error,
+                show_errno,
             )
-            self.__functype = ctypes.WINFUNCTYPE
+            return
+        self.__handle = library_cache.handle(
+            lib_path, self.__call_conv, show_errno, show_get_last_error
+        )
+        if self.__call_conv == CallConvention.StdCall:
+            self.__functype = ctypes.WINFUNCTYPE  # type: ignore
         else:
-            if self.__is_windows:
-                self.__handle = ctypes.CDLL(  # type: ignore
-                    lib_path,
-                    use_errno=show_errno,
-                    use_last_error=show_get_last_error,
-                )
-            else:
-                self.__handle = ctypes.CDLL(  # type: ignore
-                    lib_path, use_errno=show_errno
-                )
             self.__functype = ctypes.CFUNCTYPE
         if name_or_ord.startswith("@"):
             self.__name_or_ord = int(name_or_ord[1:])  # type: Union[str, int]
         else:
             self.__name_or_ord = name_or_ord
-        self.__argtypes = []
-        self.__argvalues = []
-        for arg in args:
-            type_, value = arg
-            argtype = ParameterType(type_).ctype
-            argvalue = Marshaller.str2ctype(argtype, value)
-            self.__argtypes.append(argtype)
-            self.__argvalues.append(argvalue)
-        super().__init__()
-
-    def run(self):
-        """Calculates the function prototype and operates with the queues."""
+
+    def run(self) -> RunResult:
+        """Calls the function, in a thread of `RunnerPool`.
+
+        The function is resolved once per prototype, see `LibraryCache`.
+        Arguments are converted by a `dycall.types.CallPlan`. Isolated calls
+        are forwarded to `dycall.worker.isolated_worker`.
+
+        Raises:
+            dycall.worker.WorkerCrashed: When an isolated call crashes.
+        """
+        if self.__request is not None:
+            # Imported here, dycall.worker imports this module
+            # pylint: disable=import-outside-toplevel
+            from dycall.worker import isolated_worker
+
+            return isolated_worker.call(run_request, self.__request)
+        plan = self.__plan
+        args = plan.encode(self.__values)
         try:
-            if self.__argtypes:
-                prototype = self.__functype(self.__restype, *self.__argtypes)
-            else:
-                prototype = self.__functype(self.__restype)
-            ptr = prototype((self.__name_or_ord, self.__handle))
-            result = ptr(*self.__argvalues)
-            run_result = RunResult(result, self.__argvalues)
-        except Exception as e:  # pylint: disable=broad-except
-            self.__exc.put(e)
-        else:
-            self.__queue.put(run_result)
-        # This is thread safe, see https://stackoverflow.com/a/25352087
+            ptr = library_cache.function(
+                self.__handle,
+                self.__name_or_ord,
+                self.__functype,
+                plan.restype,
+                plan.argtypes,
+                self.__show_errno,
+                self.__show_get_last_error,
+            )
+            result = plan.decode(ptr(*args), args)
+        finally:
+            plan.release(args)
+        # Both are thread-local, read them before the thread runs anything else
         if self.__show_get_last_error and self.__is_windows:
-            # ! ctypes.get_last_error() doesn't work
-            gle = int(ctypes.windll.kernel32.GetLastError())
-            log.debug("GetLastError - %d", gle)
-            self.__get_last_error.set(gle)
+            # ctypes saves it right after the call, see `LibraryCache.function`
+            result.last_error = ctypes.get_last_error()  # type: ignore
+            log.debug("GetLastError - %d", result.last_error)
         if self.__show_errno:
-            errno = ctypes.get_errno()
-            log.debug("errno - %d", errno)
-            self.__errno.set(errno)
+            result.errno = ctypes.get_errno()
+            log.debug("errno - %d", result.errno)
+        return result
+
+    def submit(self, pinned: bool = False) -> tuple[int, Future]:
+        """Schedules the call in `runner_pool`, see `RunnerPool.submit`."""
+        return runner_pool.submit(self.run, pinned)
+
+
+def run_request(*args) -> RunResult:
+    """`Runner(*args).run()`, what `dycall.worker.IsolatedWorker` executes."""
+    return Runner(*args).run()
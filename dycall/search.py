@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+
+"""
+dycall.search
+~~~~~~~~~~~~~
+
+Contains `ExportIndex`.
+"""
+
+from __future__ import annotations
+
+import array
+import bisect
+import itertools
+import logging
+import time
+from typing import Iterable, Iterator, Optional, Sequence
+
+try:
+    from typing import Final  # type: ignore
+except ImportError:
+    # pylint: disable=ungrouped-imports
+    from typing_extensions import Final  # type: ignore
+
+from dycall.store import ExportNames
+
+log = logging.getLogger(__name__)
+
+EXACT: Final = 0
+PREFIX: Final = 1
+CONTAINS: Final = 2
+
+
+class ExportIndex:
+    """Search index over the export names of a library, built once per library.
+
+    - Exact and prefix matches are found by binary search in the case-folded names
+      sorted once, i.e. a flattened prefix trie. The names themselves aren't
+      copied, a `Sequence` such as `ExportStore.demangled_names` is kept as is.
+    - The names searched in (`keys`) can differ from the ones shown, e.g.
+      `ExportStore.search_keys` has the mangled names of PE exports which
+      haven't been demangled. Only the `results` get demangled then, in one
+      batch (see `ExportNames.take`).
+    - Substring matches are found by scanning a single string of all the
+      case-folded names, which happens in C. The scan is done in slices by
+      `resume` so that it never blocks for long. A query which extends the
+      previous one only re-checks the names matched by it.
+
+    Results are ranked exact > prefix > substring, then by recent use (see
+    `touch`) and finally alphabetically. Only one search runs at a time,
+    typing in the **Exports** combobox starts a new one on every key press.
+    `filter` finds all the names containing a query instead, unranked; it is
+    independent of the current search.
+
+    Usage:
+        index.search(query)
+        while not index.resume(time.perf_counter() + 0.01):
+            show(index.results)
+        show(index.results)
+    """
+
+    LIMIT = 50
+    """Maximum number of `results`."""
+
+    SLICE = 1 << 18
+    """Number of characters scanned between two deadline checks."""
+
+    NARROW_LIMIT = 20000
+    """Substring matches beyond this aren't remembered for narrowing."""
+
+    def __init__(
+        self, keys: Iterable[str], names: Optional[Sequence[str]] = None
+    ) -> None:
+        """
+        Args:
+            keys (Iterable[str]): The names to search in.
+            names (Sequence[str], optional): The names shown for `keys`, in
+                the same order. Defaults to `keys`.
+        """
+        start = time.perf_counter()
+        if not isinstance(keys, Sequence):
+            keys = list(keys)
+        self.__searched: Sequence[str] = keys
+        self.__names: Sequence[str] = keys if names is None else names
+        self.__folded = folded = [k.casefold() for k in keys]
+        self.__order = array.array(
+            "I", sorted(range(len(keys)), key=folded.__getitem__)
+        )
+        self.__keys = [folded[i] for i in self.__order]
+        self.__haystack = "\n".join(folded)
+        self.__starts = starts = array.array("Q")
+        offset = 0
+        for name in folded:
+            starts.append(offset)
+            offset += len(name) + 1
+        self.__used: dict[int, int] = {}
+        self.__clock = itertools.count(1)
+
+        self.__query = ""
+        self.__pos = len(self.__haystack)
+        self.__ranks: dict[int, int] = {}
+        self.__matches: list[int] = []
+        self.__complete = False
+        log.debug("Indexed %d names in %.3fs", len(keys), time.perf_counter() - start)
+
+    def __contains__(self, key: object) -> bool:
+        """Whether `key` is one of the names searched in, O(log n)."""
+        return isinstance(key, str) and self.__find(key) is not None
+
+    def __len__(self) -> int:
+        """Number of export names."""
+        return len(self.__names)
+
+    @property
+    def names(self) -> Sequence[str]:
+        """The indexed names."""
+        return self.__names
+
+    @property
+    def query(self) -> str:
+        """The query passed to `search` last."""
+        return self.__query
+
+    @property
+    def done(self) -> bool:
+        """Whether the current search is done."""
+        return self.__pos >= len(self.__haystack)
+
+    def touch(self, name: str) -> None:
+        """Marks a shown export name as recently used."""
+        if self.__names is self.__searched:
+            i = self.__find(name)
+        else:
+            try:
+                i = self.__names.index(name)
+            except ValueError:
+                i = None
+        if i is not None:
+            self.__used[i] = next(self.__clock)
+
+    def __find(self, key: str) -> Optional[int]:
+        """Index of the first occurrence of `key`, if any."""
+        keys, order, folded = self.__keys, self.__order, key.casefold()
+        lo = bisect.bisect_left(keys, folded)
+        hi = bisect.bisect_right(keys, folded, lo)
+        for i in order[lo:hi]:
+            if self.__searched[i] == key:
+                return i
+        return None
+
+    def search(self, query: str) -> None:
+        """Starts a search, exact and prefix matches are available right away.
+
+        Call `resume` till it returns True for the substring matches.
+        """
+        last, folded = self.__query.casefold(), query.casefold()
+        narrow = self.__complete and folded.startswith(last)
+        self.__query = query
+        self.__complete = False
+        self.__ranks = ranks = {}
+        if narrow:
+            self.__matches = [i for i in self.__matches if folded in self.__folded[i]]
+            self.__complete = True
+        else:
+            self.__matches = []
+            self.__pos = 0
+        if not folded:
+            self.__pos = len(self.__haystack)
+            return
+
+        keys, order = self.__keys, self.__order
+        lo = bisect.bisect_left(keys, folded)
+        exact = bisect.bisect_right(keys, folded, lo)
+        prefix = min(
+            bisect.bisect_left(keys, folded + "\U0010ffff", lo), lo + self.LIMIT
+        )
+        for i in order[lo:exact]:
+            ranks[i] = EXACT
+        for i in order[exact:prefix]:
+            ranks[i] = PREFIX
+        for i in self.__used:
+            if folded in self.__folded[i]:
+                is_prefix = self.__folded[i].startswith(folded)
+                ranks.setdefault(i, PREFIX if is_prefix else CONTAINS)
+
+    def resume(self, deadline: float) -> bool:
+        """Scans for substring matches till `time.perf_counter()` reaches
+        `deadline`. At least one `SLICE` is scanned on every call.
+
+        Returns:
+            Whether the search is done.
+        """
+        size = len(self.__haystack)
+        while not self.done:
+            stop = min(self.__pos + self.SLICE, size)
+            folded = self.__query.casefold()
+            self.__pos = self.__scan(folded, self.__pos, stop, self.__matches)
+            if len(self.__matches) >= self.NARROW_LIMIT:
+                self.__pos = size
+            elif self.done:
+                self.__complete = True
+            if time.perf_counter() >= deadline:
+                break
+        return self.done
+
+    def filter(self, query: str) -> Iterator[list[int]]:
+        """Finds the indices of all the names containing `query`, in order.
+
+        Yields the matches one `SLICE` of the names at a time, so that the
+        caller can spread the scan over multiple idle callbacks.
+        """
+        folded = query.casefold()
+        pos, size = 0, len(self.__haystack)
+        while pos < size:
+            found: list[int] = []
+            pos = self.__scan(folded, pos, min(pos + self.SLICE, size), found)
+            yield found
+
+    def __scan(self, folded: str, pos: int, stop: int, matches: list[int]) -> int:
+        """Appends the names containing `folded` between `pos` and `stop`.
+
+        Returns:
+            The position to continue from.
+        """
+        haystack, starts = self.__haystack, self.__starts
+        end = min(stop + len(folded) - 1, len(haystack))
+        while True:
+            i = haystack.find(folded, pos, end)
+            if i == -1:
+                return stop
+            j = bisect.bisect_right(starts, i) - 1
+            matches.append(j)
+            # One match per name is enough
+            pos = starts[j + 1] if j + 1 < len(starts) else len(haystack)
+            if pos >= stop:
+                return pos
+
+    @property
+    def results(self) -> list[str]:
+        """Up to `LIMIT` ranked names found so far."""
+        ranks = dict(self.__ranks)
+        extra = 0
+        for i in self.__matches:
+            if extra >= self.LIMIT:
+                break
+            if i not in ranks:
+                ranks[i] = CONTAINS
+                extra += 1
+        used, folded = self.__used, self.__folded
+        ranked = sorted(ranks, key=lambda i: (ranks[i], -used.get(i, 0), folded[i]))
+        rows = ranked[: self.LIMIT]
+        names = self.__names
+        if isinstance(names, ExportNames):
+            return names.take(rows)
+        return [names[i] for i in rows]
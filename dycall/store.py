@@ -0,0 +1,696 @@
+#!/usr/bin/env python3
+
+"""
+dycall.store
+~~~~~~~~~~~~
+
+Contains `ExportStore` and `ExportNames`, the columnar storage of exports.
+"""
+
+from __future__ import annotations
+
+import array
+import collections.abc
+import sys
+from typing import Any, Callable, Iterable, Iterator, Optional
+
+try:
+    from typing import Final  # type: ignore
+except ImportError:
+    # pylint: disable=ungrouped-imports
+    from typing_extensions import Final  # type: ignore
+
+from dycall.types import ELFExport, Export, PEExport, SortOrder
+from dycall.util import DemangleError, demangle_many
+
+_PE: Final = 1
+_DEMANGLE_FAILED: Final = 2
+_DEMANGLE_PENDING: Final = 4
+
+# (address, name, demangled, ordinal, forwarder, failed, is_pe, size, info)
+ExportRecord = tuple
+
+
+class _StrIndex:
+    """Open addressing hash table mapping strings to row numbers.
+
+    Keys aren't stored, only their hashes; `key_of(row)` gets them back from
+    the string pool for comparison. Costs ~24 bytes per key unlike a dict.
+    Only the first row of a key is kept.
+    """
+
+    __slots__ = ("rows", "hashes", "mask", "count")
+
+    def __init__(self) -> None:
+        self.rows = array.array("l", [-1]) * 8
+        self.hashes = array.array("q", [0]) * 8
+        self.mask = 7
+        self.count = 0
+
+    def add(self, key: str, row: int, key_of: Callable[[int], str]) -> None:
+        """Maps `key` to `row` unless it is already present."""
+        h = hash(key)
+        rows, hashes, mask = self.rows, self.hashes, self.mask
+        i = h & mask
+        while True:
+            r = rows[i]
+            if r == -1:
+                break
+            if hashes[i] == h and key_of(r) == key:
+                return
+            i = (i + 1) & mask
+        rows[i] = row
+        hashes[i] = h
+        self.count += 1
+        if self.count * 2 > mask:
+            self.__grow()
+
+    def __grow(self) -> None:
+        old = zip(self.rows, self.hashes)
+        size = (self.mask + 1) * 4
+        self.rows = rows = array.array("l", [-1]) * size
+        self.hashes = hashes = array.array("q", [0]) * size
+        self.mask = mask = size - 1
+        for r, h in old:
+            if r != -1:
+                i = h & mask
+                while rows[i] != -1:
+                    i = (i + 1) & mask
+                rows[i] = r
+                hashes[i] = h
+
+    def get(self, key: str, key_of: Callable[[int], str]) -> int:
+        """Returns the row of `key` or -1."""
+        h = hash(key)
+        rows, hashes, mask = self.rows, self.hashes, self.mask
+        i = h & mask
+        while True:
+            r = rows[i]
+            if r == -1 or (hashes[i] == h and key_of(r) == key):
+                return r
+            i = (i + 1) & mask
+
+    @property
+    def nbytes(self) -> int:
+        """Approximate memory usage."""
+        return (self.mask + 1) * 16
+
+
+class _ExportTable:
+    """Struct of arrays backing an `ExportStore`.
+
+    Strings are kept in a pool of chunks, one per `extend`; `offsets` and
+    `lengths` hold the location of the name, demangled name and forwarder of
+    each row (in that order, 3 entries per row). Offsets encode the chunk
+    number in the upper 32 bits. A demangled name equal to the name is
+    stored only once.
+
+    Names of PE exports are demangled on first access (`_DEMANGLE_PENDING`).
+    Results equal to the name just point at it, others are memoised in
+    `demangled`. `by_demangled_name` holds the demangled names which differ
+    from the name and were known when appended; `by_memo` the memoised ones,
+    built by `index_demangled` in the background (`find_demangled` runs in
+    the UI thread and never demangles in bulk).
+
+    `orders` holds the sorted views of the names, built once per `SortOrder`
+    on first use.
+    """
+
+    __slots__ = (
+        "addresses",
+        "ordinals",
+        "sizes",
+        "infos",
+        "flags",
+        "offsets",
+        "lengths",
+        "chunks",
+        "by_name",
+        "by_demangled_name",
+        "by_memo",
+        "demangled",
+        "frozen",
+        "names_view",
+        "orders",
+    )
+
+    def __init__(self) -> None:
+        self.addresses = array.array("Q")
+        self.ordinals = array.array("i")
+        self.sizes = array.array("Q")
+        self.infos = array.array("B")
+        self.flags = array.array("B")
+        self.offsets = array.array("Q")
+        self.lengths = array.array("I")
+        self.chunks: list[str] = []
+        self.by_name = _StrIndex()
+        self.by_demangled_name = _StrIndex()
+        self.by_memo: Optional[_StrIndex] = None
+        self.demangled: dict[int, str] = {}
+        self.frozen = False
+        self.names_view: Optional[ExportNames] = None
+        self.orders: dict[SortOrder, ExportNames] = {}
+
+    def string(self, i: int) -> str:
+        """Returns the i-th string, see `offsets`."""
+        offset = self.offsets[i]
+        start = offset & 0xFFFFFFFF
+        end = start + self.lengths[i]
+        return self.chunks[offset >> 32][start:end]
+
+    def name(self, row: int) -> str:
+        """Name of the export at `row`."""
+        return self.string(3 * row)
+
+    def demangled_name(self, row: int) -> str:
+        """Demangled name of the export at `row`, demangles it if needed."""
+        if self.flags[row] & _DEMANGLE_PENDING:
+            memo = self.demangled
+            if row not in memo:
+                self.demangle_rows((row,))
+            if row in memo:
+                return memo[row]
+        return self.string(3 * row + 1)
+
+    def demangle_rows(self, rows: Iterable[int], processes: Optional[int] = 1):
+        """Demangles the pending names among `rows` in a single batch.
+
+        See `dycall.util.demangle_many` for `processes`.
+        """
+        flags, memo = self.flags, self.demangled
+        rows = [r for r in rows if flags[r] & _DEMANGLE_PENDING and r not in memo]
+        if not rows:
+            return
+        names = [self.name(r) for r in rows]
+        offsets, lengths = self.offsets, self.lengths
+        for row, name, demangled in zip(rows, names, demangle_many(names, processes)):
+            if demangled is None or demangled == name:
+                # The flag is cleared last, a concurrent reader demangles again
+                offsets[3 * row + 1] = offsets[3 * row]
+                lengths[3 * row + 1] = lengths[3 * row]
+                failed = _DEMANGLE_FAILED if demangled is None else 0
+                flags[row] = flags[row] & ~_DEMANGLE_PENDING | failed
+            else:
+                memo[row] = demangled
+
+    def known_demangled_name(self, row: int) -> str:
+        """Demangled name of the export at `row` or "" if not demangled yet."""
+        if self.flags[row] & _DEMANGLE_PENDING:
+            return self.demangled.get(row, "")
+        return self.string(3 * row + 1)
+
+    def search_key(self, row: int) -> str:
+        """Demangled name of the export at `row` if it is known without
+        demangling, i.e. isn't a pending PE name, its name otherwise.
+        """
+        if self.flags[row] & _DEMANGLE_PENDING:
+            return self.string(3 * row)
+        return self.string(3 * row + 1)
+
+    def find_demangled(self, key: str) -> int:
+        """Returns the row of the demangled name `key` or -1.
+
+        Tried in order, demangling one name at most:
+        - `by_demangled_name`, e.g. ELF and cached names.
+        - The name index, most names demangle to themselves.
+        - `by_memo` once built, the names demangled so far otherwise.
+
+        Hence PE names which haven't been demangled yet aren't found till
+        `index_demangled` is done.
+        """
+        if not key or key != key.strip():
+            return -1  # Demangled names are never blank or padded
+        demangled_name = self.demangled_name
+        row = self.by_demangled_name.get(key, demangled_name)
+        if row != -1:
+            return row
+        row = self.by_name.get(key, self.name)
+        if row != -1 and demangled_name(row) == key:
+            return row
+        memo = self.demangled
+        by_memo = self.by_memo
+        if by_memo is not None:
+            return by_memo.get(key, memo.__getitem__)
+        # Copied, other threads may be demangling too
+        found = [r for r, d in list(memo.items()) if d == key]
+        return min(found) if found else -1
+
+    def index_demangled(self, processes: Optional[int] = 1) -> None:
+        """Demangles all the pending names in one batch and builds `by_memo`.
+
+        Meant for a background thread, the index is swapped in when complete.
+        See `dycall.util.demangle_many` for `processes`.
+        """
+        num_rows = len(self.addresses)
+        self.demangle_rows(range(num_rows), processes)
+        index = _StrIndex()
+        memo = self.demangled
+        for row, demangled in sorted(list(memo.items())):
+            index.add(demangled, row, memo.__getitem__)
+        if len(self.addresses) == num_rows:
+            self.by_memo = index
+
+    def record(self, row: int) -> ExportRecord:
+        """Returns the fields of the export at `row`, see `ExportRecord`.
+
+        The demangled name is empty if it hasn't been demangled yet.
+        """
+        string = self.string
+        flags = self.flags[row]
+        return (
+            self.addresses[row],
+            string(3 * row),
+            self.known_demangled_name(row),
+            self.ordinals[row],
+            string(3 * row + 2),
+            bool(flags & _DEMANGLE_FAILED),
+            bool(flags & _PE),
+            self.sizes[row],
+            self.infos[row],
+        )
+
+    def type_key(self, row: int) -> tuple[int, bool]:
+        """Binding and type of the export at `row` and whether it's forwarded."""
+        return self.infos[row], self.lengths[3 * row + 2] != 0
+
+    def sort(self, order: SortOrder) -> array.array:
+        """Returns the rows sorted by `order`, ties stay in export order.
+
+        Exports are sorted by binding and type for `SortOrder.Type`, PE
+        exports by whether they are forwarded.
+        """
+        rows = range(len(self.addresses))
+        reverse = order == SortOrder.NameDescending
+        key: Callable[[int], Any]
+        if order in (SortOrder.NameAscending, SortOrder.NameDescending):
+            self.demangle_rows(rows)
+            key = self.demangled_name
+        elif order == SortOrder.MangledName:
+            key = self.name
+        elif order == SortOrder.Address:
+            key = self.addresses.__getitem__
+        elif order == SortOrder.Ordinal:
+            key = self.ordinals.__getitem__
+        elif order == SortOrder.Size:
+            key = self.sizes.__getitem__
+        else:
+            key = self.type_key
+        return array.array("I", sorted(rows, key=key, reverse=reverse))
+
+    def extend(self, records: Iterable[ExportRecord]) -> None:
+        """Appends rows built from `records`."""
+        chunk = len(self.chunks) << 32
+        parts: list[str] = []
+        pos = 0
+        addresses, ordinals, flags = self.addresses, self.ordinals, self.flags
+        offsets, lengths = self.offsets, self.lengths
+        by_name, name_of = self.by_name, self.name
+        pending = []
+        known = []
+        row = len(addresses)
+        sizes, infos = self.sizes, self.infos
+        self.orders.clear()
+        self.by_memo = None
+        for (
+            address,
+            name,
+            demangled,
+            ordinal,
+            forwarder,
+            failed,
+            is_pe,
+            size,
+            info,
+        ) in records:
+            addresses.append(address)
+            ordinals.append(ordinal)
+            sizes.append(size)
+            infos.append(info)
+            flag = _PE if is_pe else 0
+            if failed:
+                flag |= _DEMANGLE_FAILED
+            elif is_pe and name and not demangled:
+                flag |= _DEMANGLE_PENDING
+            flags.append(flag)
+            name_at = chunk | pos
+            parts.append(name)
+            pos += len(name)
+            if demangled == name:
+                demangled_at = name_at
+            else:
+                demangled_at = chunk | pos
+                parts.append(demangled)
+                pos += len(demangled)
+            offsets.append(name_at)
+            offsets.append(demangled_at)
+            offsets.append(chunk | pos)
+            parts.append(forwarder)
+            pos += len(forwarder)
+            lengths.append(len(name))
+            lengths.append(len(demangled))
+            lengths.append(len(forwarder))
+            if name:
+                pending.append((row, name))
+            if demangled and demangled != name:
+                known.append((row, demangled))
+            row += 1
+        self.chunks.append("".join(parts))
+        # Indexed after the chunk is in place for `key_of` to work
+        for row, name in pending:
+            by_name.add(name, row, name_of)
+        by_demangled_name, demangled_name = self.by_demangled_name, self.demangled_name
+        for row, demangled in known:
+            by_demangled_name.add(demangled, row, demangled_name)
+
+    @property
+    def nbytes(self) -> int:
+        """Approximate memory usage."""
+        arrays = (
+            self.addresses,
+            self.ordinals,
+            self.sizes,
+            self.infos,
+            self.flags,
+            self.offsets,
+        )
+        return (
+            sum(a.itemsize * len(a) for a in arrays)
+            + self.lengths.itemsize * len(self.lengths)
+            + sum(sys.getsizeof(c) for c in self.chunks)
+            + self.by_name.nbytes
+            + self.by_demangled_name.nbytes
+            + (self.by_memo.nbytes if self.by_memo is not None else 0)
+            + sys.getsizeof(self.demangled)
+            + sum(sys.getsizeof(d) for d in self.demangled.values())
+        )
+
+
+class ExportNames(collections.abc.Sequence):
+    """Read-only sequence of the demangled names in an `ExportStore`.
+
+    Strings are sliced out of the string pool on access, nothing is copied.
+    An `order` (a permutation of row numbers) can be given for sorted views.
+    """
+
+    __slots__ = ("__table", "__order", "__positions")
+
+    def __init__(self, table: _ExportTable, order: Optional[array.array] = None):
+        self.__table = table
+        self.__order = order
+        self.__positions: Optional[array.array] = None
+
+    def __len__(self) -> int:
+        """Number of names."""
+        if self.__order is not None:
+            return len(self.__order)
+        return len(self.__table.addresses)
+
+    def __getitem__(self, index):
+        """Name(s) at `index`, slices return a list."""
+        rows = self.__order
+        table = self.__table
+        demangled_name = table.demangled_name
+        if isinstance(index, slice):
+            if rows is None:
+                rows = range(len(self))  # type: ignore
+            rows = rows[index]  # type: ignore
+            table.demangle_rows(rows)  # type: ignore
+            return [demangled_name(r) for r in rows]  # type: ignore
+        if rows is not None:
+            index = rows[index]
+        elif index < 0:
+            index += len(self)
+        if not 0 <= index < len(self.__table.addresses):
+            raise IndexError(index)
+        return demangled_name(index)
+
+    def take(self, positions: Iterable[int]) -> list[str]:
+        """Names at `positions`, the pending ones are demangled in one batch."""
+        order = self.__order
+        rows = list(positions) if order is None else [order[i] for i in positions]
+        table = self.__table
+        table.demangle_rows(rows)
+        return [table.demangled_name(r) for r in rows]
+
+    def demangle(self, processes: Optional[int] = 1) -> None:
+        """Demangles all the names at once instead of on access and indexes
+        them, see `_ExportTable.index_demangled`. Blocks, for a thread.
+
+        See `dycall.util.demangle_many` for `processes`.
+        """
+        self.__table.index_demangled(processes)
+
+    def index(self, value, start=0, stop=None) -> int:
+        """Position of the first occurrence of `value`, O(1).
+
+        Sorted views invert their `order` on first use for this.
+        """
+        table = self.__table
+        row = table.find_demangled(value)
+        if row == -1:
+            raise ValueError(f"{value!r} is not in names")
+        order = self.__order
+        if order is None:
+            return row
+        positions = self.__positions
+        if positions is None:
+            positions = array.array("I", [0]) * len(order)
+            for pos, r in enumerate(order):
+                positions[r] = pos
+            self.__positions = positions
+        return positions[row]
+
+
+class ExportStore(collections.abc.Sequence):
+    """The exports of a library as a table of columns.
+
+    Used as `LoadResult.exports` and as the exports of the loaded library
+    shared by all the frames. Instead of a list of `Export` objects,
+    addresses, ordinals and flags are kept in `array`s and all the strings in
+    a single pool (see `_ExportTable`). Indexing returns an `Export` built on
+    the fly, i.e. a copy; prefer `demangled_names` and the lookup methods.
+
+    PE export names are demangled lazily, i.e. only the ones shown or looked
+    up; the results are memoised in the table and shared with `adopt`ers.
+
+    Hash indexes:
+    - Name; kept up to date as exports are appended.
+    - Demangled name; known ones are indexed as exports are appended, lazily
+      demangled ones once `ExportNames.demangle` has run. Lookups never
+      demangle in bulk, see `_ExportTable.find_demangled`.
+    - Ordinal and address; built on first use, which is rare.
+
+    Only the first export is indexed when multiple exports share a key.
+    Exports can only be appended or truncated. `adopt` shares the table of
+    another store, which is copied before it is appended to.
+    """
+
+    __slots__ = ("__table", "__by_ordinal", "__by_address")
+
+    def __init__(self, exports: Iterable[Export] = ()) -> None:
+        self.__table = _ExportTable()
+        self.__by_ordinal: Optional[dict[int, int]] = None
+        self.__by_address: Optional[dict[int, int]] = None
+        self.extend(exports)
+
+    def __len__(self) -> int:
+        """Number of exports."""
+        return len(self.__table.addresses)
+
+    def __getitem__(self, index):
+        """Export(s) at `index`, slices return a list."""
+        if isinstance(index, slice):
+            rows = range(len(self))[index]
+            self.__table.demangle_rows(rows)
+            return [self.__export(r) for r in rows]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(index)
+        return self.__export(index)
+
+    def __export(self, row: int) -> Export:
+        table = self.__table
+        address, name, _, ordinal, forwarder, _, is_pe, _, _ = table.record(row)
+        demangled = table.demangled_name(row)
+        failed = table.flags[row] & _DEMANGLE_FAILED
+        if is_pe:
+            exc = DemangleError() if failed else None
+            return PEExport(address, name, ordinal, demangled, exc, forwarder)
+        return ELFExport(address, name, demangled, table.sizes[row], table.infos[row])
+
+    def __contains__(self, exp: object) -> bool:
+        """Whether `exp` is one of the exports, O(1)."""
+        if not isinstance(exp, Export):
+            return False
+        found = self.get_by_name(exp.name)
+        if found is None:
+            found = self.get_by_demangled_name(getattr(exp, "demangled_name", ""))
+        return found == exp
+
+    def records(self) -> Iterator[ExportRecord]:
+        """Yields the fields of every export without building `Export`s.
+
+        See `ExportRecord` for the order of the fields.
+        """
+        record = self.__table.record
+        return (record(r) for r in range(len(self)))
+
+    def extend(self, exports: Iterable[Export]) -> None:
+        """Appends `exports` and indexes them."""
+        self.extend_records(self.record_of(e) for e in exports)
+
+    @staticmethod
+    def record_of(exp: Export) -> ExportRecord:
+        """Returns the fields of `exp`, see `ExportRecord`."""
+        if isinstance(exp, PEExport):
+            # pylint: disable=protected-access
+            # Not demangled here unless it has already been
+            return (
+                exp.address,
+                exp.name,
+                exp._demangled_name if exp.name else exp.demangled_name,
+                exp.ordinal,
+                exp.forwarder,
+                exp._exc is not None,
+                True,
+                0,
+                0,
+            )
+        demangled = getattr(exp, "demangled_name", exp.name)
+        size, info = getattr(exp, "size", 0), getattr(exp, "info", 0)
+        return (exp.address, exp.name, demangled, -1, "", False, False, size, info)
+
+    def extend_records(self, records: Iterable[ExportRecord]) -> None:
+        """Appends exports given as `ExportRecord`s and indexes them."""
+        if self.__table.frozen:
+            self.__thaw()
+        self.__table.extend(records)
+        # Rebuilt on next use
+        self.__by_ordinal = self.__by_address = None
+
+    def __thaw(self) -> None:
+        """Copies a table shared by `adopt`."""
+        shared = self.__table
+        self.__table = _ExportTable()
+        self.__table.extend(shared.record(r) for r in range(len(shared.addresses)))
+
+    def adopt(self, other: ExportStore) -> None:
+        """Replaces the exports by the ones of `other` without copying them."""
+        table = other.__table  # pylint: disable=protected-access
+        table.frozen = True
+        self.__table = table
+        self.__by_ordinal = self.__by_address = None
+
+    def truncate(self, size: int = 0) -> None:
+        """Removes the exports from `size` onwards."""
+        if size >= len(self):
+            return
+        table = self.__table
+        self.clear()
+        self.extend_records(table.record(r) for r in range(size))
+
+    def clear(self) -> None:
+        """Removes all the exports."""
+        self.__table = _ExportTable()
+        self.__by_ordinal = self.__by_address = None
+
+    @property
+    def demangled_names(self) -> ExportNames:
+        """The names shown in the UI, in export order."""
+        table = self.__table
+        if table.names_view is None:
+            table.names_view = ExportNames(table)
+        return table.names_view
+
+    def search_keys(self) -> list[str]:
+        """What `dycall.search.ExportIndex` searches in, in export order.
+
+        PE names which haven't been demangled yet are searched as they are,
+        demangling all of them for every library would take too long.
+        """
+        key = self.__table.search_key
+        return [key(r) for r in range(len(self))]
+
+    def sorted_names(self, order: SortOrder = SortOrder.NameAscending) -> ExportNames:
+        """The names shown in the UI, sorted by `order`.
+
+        The permutation is computed on first use and kept till the exports
+        change, switching between orders is O(1) after that.
+        """
+        table = self.__table
+        names = table.orders.get(order)
+        if names is None:
+            names = table.orders[order] = ExportNames(table, table.sort(order))
+        return names
+
+    def demangle_failures(self, start: int = 0) -> list[str]:
+        """Names from `start` onwards which couldn't be demangled.
+
+        Names which haven't been demangled yet aren't checked.
+        """
+        table = self.__table
+        flags = table.flags
+        return [
+            table.name(r)
+            for r in range(start, len(flags))
+            if flags[r] & _DEMANGLE_FAILED
+        ]
+
+    @property
+    def nbytes(self) -> int:
+        """Approximate memory used by the exports."""
+        return self.__table.nbytes
+
+    def get_by_name(self, name: str) -> Optional[Export]:
+        """Returns the export with the (mangled) `name`."""
+        table = self.__table
+        return self.__get(table.by_name.get(name, table.name))
+
+    def get_by_demangled_name(self, name: str) -> Optional[Export]:
+        """Returns the export displayed as `name`."""
+        table = self.__table
+        return self.__get(table.find_demangled(name))
+
+    def get_by_ordinal(self, ordinal: int) -> Optional[Export]:
+        """Returns the `PEExport` with `ordinal`."""
+        if self.__by_ordinal is None:
+            self.__by_ordinal = {}
+            table = self.__table
+            for r, (o, f) in enumerate(zip(table.ordinals, table.flags)):
+                if f & _PE:
+                    self.__by_ordinal.setdefault(o, r)
+        return self.__get(self.__by_ordinal.get(ordinal, -1))
+
+    def get_by_address(self, address: int) -> Optional[Export]:
+        """Returns the export at `address`."""
+        if self.__by_address is None:
+            self.__by_address = {}
+            for r, a in enumerate(self.__table.addresses):
+                self.__by_address.setdefault(a, r)
+        return self.__get(self.__by_address.get(address, -1))
+
+    def __get(self, row: int) -> Optional[Export]:
+        return None if row == -1 else self.__export(row)
+
+    def resolve(self, name: str) -> Optional[Export]:
+        """Finds an export by its demangled name, name or `@ordinal`."""
+        exp = self.get_by_demangled_name(name)
+        if exp is None:
+            exp = self.get_by_name(name)
+        if exp is None and name.startswith("@") and name[1:].isdigit():
+            exp = self.get_by_ordinal(int(name[1:]))
+        return exp
+
+    def symbol(self, name: str) -> str:
+        """Converts a name displayed in the UI to what is passed to `Runner`.
+
+        That's the mangled name, or `@ordinal` for ordinal-only exports. Names
+        which aren't found are returned unchanged.
+        """
+        exp = self.resolve(name)
+        if exp is None:
+            return name
+        if not exp.name and isinstance(exp, PEExport):
+            return f"@{exp.ordinal}"
+        return exp.name
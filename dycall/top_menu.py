@@ -20,6 +20,7 @@ from dycall.about import AboutWindow
 from dycall.demangler import DemanglerWindow
 from dycall.types import SortOrder
 from dycall.util import Lang2LCID, LCID2Lang, get_img
+from dycall.worker import isolated_worker
 
 log = logging.getLogger(__name__)
 
@@ -54,6 +55,9 @@ class TopMenu(_Menu):
         - OUT Mode
         - Show GetLastError (Windows only)
         - Show errno
+        - Pinned Thread
+        - Isolated Process
+        - Kill Isolated Process
     - View
         - Sort Exports By
             - Name (ascending)
@@ -74,6 +78,8 @@ class TopMenu(_Menu):
         sort_order: tk.StringVar,
         show_get_last_error: tk.BooleanVar,
         show_errno: tk.BooleanVar,
+        pinned: tk.BooleanVar,
+        isolated: tk.BooleanVar,
         about_opened: tk.BooleanVar,
         theme: tk.StringVar,
         recents: collections.deque,
@@ -161,6 +167,15 @@ class TopMenu(_Menu):
             ),
         )
 
+        # Options -> Pinned Thread
+        self.mo.add_checkbutton(label="Pinned Thread", variable=pinned)
+
+        # Options -> Isolated Process
+        self.mo.add_checkbutton(label="Isolated Process", variable=isolated)
+
+        # Options -> Kill Isolated Process, ends a hung call
+        self.mo.add_command(label="Kill Isolated Process", command=isolated_worker.kill)
+
         # View
         self.vt = _Menu()
         self.add_cascade(label="View", menu=self.vt)
@@ -170,16 +185,16 @@ class TopMenu(_Menu):
         self.__sort_png = get_img("sort.png")
         self.__sort_name_asc_png = get_img("sort_name_asc.png")
         self.__sort_name_desc_png = get_img("sort_name_desc.png")
-        sorter_imgs = (
-            self.__sort_name_asc_png,
-            self.__sort_name_desc_png,
-        )
-        for sorter, img in zip(SortOrder, sorter_imgs):
+        sorter_imgs = {
+            SortOrder.NameAscending: self.__sort_name_asc_png,
+            SortOrder.NameDescending: self.__sort_name_desc_png,
+        }
+        for sorter in SortOrder:
             self.vse.add_radiobutton(
                 label=sorter.value,
                 variable=sort_order,
                 command=lambda: root.event_generate("<<SortExports>>"),
-                image=img,
+                image=sorter_imgs.get(sorter),
                 compound="left",
             )
         self.vt.add_cascade(
@@ -12,6 +12,8 @@ from __future__ import annotations
 import abc
 import dataclasses
 import enum
+import functools
+import threading
 import typing
 from ctypes import (
     c_bool,
@@ -31,7 +33,7 @@ from ctypes import (
     c_wchar,
     c_wchar_p,
 )
-from typing import Any, Union
+from typing import Any, Callable, Optional, Sequence, Union
 
 try:
     from typing import Final  # type: ignore
@@ -39,7 +41,7 @@ except ImportError:
     # pylint: disable=ungrouped-imports
     from typing_extensions import Final  # type: ignore
 
-from dycall.util import DemangleError, demangle
+from dycall.util import DemangleError, demangle_many
 
 _CType = Union[
     c_bool,
@@ -214,21 +216,168 @@ class Marshaller:
         return None
 
 
+_INT_TYPES: Final = (
+    c_int8,
+    c_int16,
+    c_int32,
+    c_int64,
+    c_uint8,
+    c_uint16,
+    c_uint32,
+    c_uint64,
+)
+
+
+def _encoder(t: ParameterType) -> Optional[Callable[[Any, str], None]]:
+    """Returns a function which sets a `t.ctype` object from a string.
+
+    None for the types `Marshaller.str2ctype` doesn't convert.
+    """
+    ctype = t.ctype
+    if ctype in _INT_TYPES:
+
+        def encode(obj, val: str) -> None:
+            obj.value = int(val)
+
+    elif ctype in (c_double, c_float):
+
+        def encode(obj, val: str) -> None:
+            obj.value = float(val)
+
+    elif ctype in (c_char, c_char_p):
+
+        def encode(obj, val: str) -> None:
+            obj.value = val.encode("utf-8")
+
+    elif ctype in (c_wchar, c_wchar_p):
+
+        def encode(obj, val: str) -> None:
+            obj.value = val
+
+    else:
+        return None
+    return encode
+
+
+def _decoder(t: ParameterType) -> Callable[[Any], str]:
+    """Returns a function which converts the value of a `t.ctype` object to a
+    string like `Marshaller.ctype2str`.
+    """
+    ctype = t.ctype
+    if ctype is c_bool:
+        return lambda val: "True" if val else "False"
+    if ctype in (c_char, c_char_p):
+        return lambda val: "NULL" if val is None else val.decode("utf-8", "replace")
+    return lambda val: "NULL" if val is None else str(val)
+
+
+def _ret_decoder(t: ParameterType) -> Callable[[Any], str]:
+    """Returns a function which converts a `t` return value to a string like
+    `Marshaller.pytype2str`.
+    """
+    if t.ctype in (c_char, c_char_p):
+        return lambda ret: ret.decode("utf-8", "replace") if ret else "NULL"
+    return lambda ret: str(ret) if ret else "NULL"
+
+
+class CallPlan:
+    """A call signature compiled once by `compile_signature`.
+
+    Converters are picked per position when the plan is built; calls with the
+    same signature then skip all the type dispatch of `Marshaller`. The plan
+    also owns one set of ctypes argument objects which `encode` fills in
+    place. While it is in use, i.e. till `release`, concurrent calls get
+    fresh objects instead.
+
+    Usage:
+        args = plan.encode(values)
+        try:
+            result = plan.decode(func(*args), args)
+        finally:
+            plan.release(args)
+    """
+
+    def __init__(self, returns: ParameterType, argtypes: Sequence[ParameterType]):
+        self.restype = returns.ctype
+        """Return type for the prototype, see `ParameterType.ctype`."""
+
+        self.argtypes = tuple(t.ctype for t in argtypes)
+        """Argument types for the prototype."""
+
+        self.__encoders = tuple(_encoder(t) for t in argtypes)
+        self.__decoders = tuple(_decoder(t) for t in argtypes)
+        self.__ret_decoder = _ret_decoder(returns)
+        self.__args = self.__allocate()
+        self.__lock = threading.Lock()
+
+    def __allocate(self) -> list[Any]:
+        return [
+            None if encode is None else ctype()
+            for ctype, encode in zip(self.argtypes, self.__encoders)
+        ]
+
+    def encode(self, values: Sequence[str]) -> list[Any]:
+        """Tkinter -> ctypes for all the arguments.
+
+        Raises:
+            ValueError: When a value can't be converted.
+            TypeError: Likewise, e.g. more than one `char`.
+        """
+        # Released by `release`, a context manager can't span both calls
+        # pylint: disable=consider-using-with
+        if self.__lock.acquire(blocking=False):
+            args = self.__args
+        else:
+            args = self.__allocate()
+        try:
+            for obj, encode, val in zip(args, self.__encoders, values):
+                if encode is not None:
+                    encode(obj, val)
+        except Exception:
+            self.release(args)
+            raise
+        return args
+
+    def decode(self, ret: Any, args: Sequence[Any]) -> RunResult:
+        """Ctypes -> Tkinter for the return value and the arguments."""
+        values = [
+            "NULL" if obj is None else decode(obj.value)
+            for obj, decode in zip(args, self.__decoders)
+        ]
+        return RunResult(ret, self.__ret_decoder(ret), values)
+
+    def release(self, args: Sequence[Any]) -> None:
+        """Lets `encode` reuse `args` if they are the preallocated ones."""
+        if args is self.__args:
+            self.__lock.release()
+
+
+@functools.lru_cache(maxsize=64)
+def compile_signature(
+    returns: ParameterType, argtypes: tuple[ParameterType, ...]
+) -> CallPlan:
+    """Returns the `CallPlan` of a signature, built only once."""
+    return CallPlan(returns, argtypes)
+
+
 @dataclasses.dataclass
 class RunResult:
     """Returned by `Runner` back to UI. This is useful especially in **OUT Mode**."""
 
-    ret: _CType
-    args: tuple[_CType] = dataclasses.field(default_factory=tuple)  # type: ignore
+    ret: Any
+    """Return value as returned by ctypes."""
 
-    @property
-    def values(self) -> list[Any]:
-        """Ctypes -> Tkinter representation for all arguments."""
-        values = []
-        for arg in self.args:
-            v = Marshaller.ctype2str(arg)
-            values.append(v)
-        return values
+    output: str = "NULL"
+    """Tkinter representation of `ret`."""
+
+    values: list[str] = dataclasses.field(default_factory=list)
+    """Tkinter representation of all the arguments after the call."""
+
+    errno: Optional[int] = None
+    """Value of `errno` after the call, if **errno** is shown."""
+
+    last_error: Optional[int] = None
+    """`GetLastError()` after the call, if **GetLastError** is shown."""
 
 
 class SortOrder(enum.Enum):
@@ -236,6 +385,11 @@ class SortOrder(enum.Enum):
 
     NameAscending = "Name (ascending)"
     NameDescending = "Name (descending)"
+    MangledName = "Mangled name"
+    Address = "Address"
+    Ordinal = "Ordinal"
+    Size = "Size"
+    Type = "Binding/type"
 
 
 @dataclasses.dataclass
@@ -261,16 +415,46 @@ class PEExport(Export):
     ordinal: int
     """See `lief.PE.ExportEntry.ordinal`."""
 
-    def __post_init__(self):
-        """Calculate a demangled/displayed name."""
+    _demangled_name: str = dataclasses.field(default="", compare=False, repr=False)
+    """See `demangled_name`, empty till it is calculated."""
+
+    _exc: Optional[DemangleError] = dataclasses.field(
+        default=None, compare=False, repr=False
+    )
+    """See `exc`."""
+
+    forwarder: str = ""
+    """Forwarder string like `NTDLL.RtlAllocateHeap` for forwarded exports."""
+
+    @property
+    def demangled_name(self) -> str:
+        """Calculated from `name` on first access when not passed.
+
+        Same as `name` if demangling fails and `@ordinal` for ordinal-only
+        exports.
+        """
+        if not self._demangled_name:
+            self.__demangle()
+        return self._demangled_name
+
+    @property
+    def exc(self) -> Optional[DemangleError]:
+        """Set when demangling `name` fails."""
+        if not self._demangled_name:
+            self.__demangle()
+        return self._exc
+
+    def __demangle(self) -> None:
         if self.name:
-            try:
-                self.demangled_name = demangle(self.name)
-            except DemangleError as exc:
-                self.exc = exc
+            demangled = demangle_many([self.name])[0]
+            if demangled is None:
+                self._demangled_name = self.name
+                self._exc = DemangleError(self.name)
+            else:
+                self._demangled_name = demangled
         else:
             # Ordinal-only exports
-            self.demangled_name = f"@{self.ordinal}"
+            self._demangled_name = f"@{self.ordinal}"
 
 
 @dataclasses.dataclass
@@ -279,3 +463,9 @@ class ELFExport(Export):
 
     demangled_name: str
     """See `lief.ELF.Symbol.demangled_name`."""
+
+    size: int = 0
+    """See `lief.ELF.Symbol.size`."""
+
+    info: int = 0
+    """`st_info` of the symbol, i.e. its binding << 4 | its type."""
@@ -6,19 +6,30 @@ dycall.util
 
 Contains:
 - Demangling: Logic used by `dycall.types.PEExport`, `dycall.types.ELFExport`
-  and `dycall.demangler.DemanglerWindow`.
+  and `dycall.demangler.DemanglerWindow`. `demangle_many` for many names,
+  results of both are cached in `demangle_cache`. `demangle_text` for
+  logs and linker maps.
 - Constants: TtkBootstrap light and dark theme names.
-- Custom widgets: A tooltip and a copy button.
+- Custom widgets: A tooltip, a copy button, a combobox and a listbox for huge
+  lists.
 - Helpers: Image path and PhotoImage object getters.
 """
 
 from __future__ import annotations
 
+import concurrent.futures
 import ctypes
+import ctypes.util
+import itertools
 import logging
+import multiprocessing
 import pathlib
 import platform
-from typing import Callable, Optional, Union
+import re
+import threading
+import tkinter.font
+from collections import OrderedDict
+from typing import Callable, Iterable, Iterator, Optional, Sequence, Union
 
 try:
     from typing import Final  # type: ignore
@@ -44,16 +55,122 @@ os = platform.system()
 BUFSIZE: Final = 1000  # That should probably be enough
 
 
+MANGLED_PREFIX: Final = "?" if os == "Windows" else "_Z"
+"""Names without this prefix are returned as is by the demangling functions."""
+
+MANGLED_RE: Final = re.compile(r"\?[\w@$?]+" if os == "Windows" else r"\b_Z[\w$.]+")
+"""Finds mangled names in arbitrary text for `demangle_text`."""
+
+
 class DemangleError(Exception):
     """Raised when demangling fails due to any reason."""
 
 
+_MISSING: Final = object()
+
+
+class DemangleCache:
+    """Bounded LRU cache of demangled names shared by all the libraries.
+
+    The same names (`std::` templates, Qt and Boost symbols) appear in many
+    libraries. Names which couldn't be demangled are cached as None.
+    `dycall.cache.DemangleStore` saves the entries across sessions. Thread
+    safe, a batch of names is looked up under a single lock.
+    """
+
+    SIZE = 1 << 16
+    """Default maximum number of entries."""
+
+    def __init__(self, size: int = SIZE) -> None:
+        self.__size = size
+        self.__entries: OrderedDict[str, Optional[str]] = OrderedDict()
+        self.__lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.version = 0
+        """Incremented whenever entries are added."""
+
+    def __len__(self) -> int:
+        """Number of entries."""
+        return len(self.__entries)
+
+    def get_many(self, names: Iterable[str]) -> list:
+        """Returns the demangled names, `_MISSING` for the ones not cached."""
+        results = []
+        with self.__lock:
+            entries = self.__entries
+            for name in names:
+                demangled = entries.get(name, _MISSING)
+                if demangled is _MISSING:
+                    self.misses += 1
+                else:
+                    self.hits += 1
+                    entries.move_to_end(name)
+                results.append(demangled)
+        return results
+
+    def put_many(self, items: Iterable[tuple[str, Optional[str]]]) -> None:
+        """Adds (name, demangled name or None) pairs, evicting the oldest."""
+        with self.__lock:
+            entries = self.__entries
+            entries.update(items)
+            while len(entries) > self.__size:
+                entries.popitem(last=False)
+            self.version += 1
+
+    def items(self) -> list[tuple[str, Optional[str]]]:
+        """All entries, least recently used first."""
+        with self.__lock:
+            return list(self.__entries.items())
+
+    def clear(self) -> None:
+        """Removes all the entries and resets the counters."""
+        with self.__lock:
+            self.__entries.clear()
+            self.hits = self.misses = 0
+            self.version += 1
+
+    def log_stats(self) -> None:
+        """Logs the hit/miss counters."""
+        total = self.hits + self.misses
+        log.debug(
+            "Demangle cache: %d hits, %d misses (%.0f%% hits), %d entries",
+            self.hits,
+            self.misses,
+            100 * self.hits / total if total else 0,
+            len(self),
+        )
+
+
+demangle_cache = DemangleCache()
+"""Used by `demangle` and `demangle_many`."""
+
+
 def demangle(exp: str) -> str:
     """On Linux & MacOS, LIEF already provides the demangled name.
 
     On Windows, the DbgHelp API function `UnDecorateSymbolNameW` is used.
     MSDN: https://docs.microsoft.com/windows/win32/api/dbghelp/nf-dbghelp-undecoratesymbolnamew
+
+    Results are cached in `demangle_cache`.
     """  # noqa: E501
+    if not exp.startswith(MANGLED_PREFIX):
+        return exp
+    demangled = demangle_cache.get_many((exp,))[0]
+    if demangled is _MISSING:
+        try:
+            demangled = _demangle_uncached(exp)
+        except DemangleError:
+            demangle_cache.put_many(((exp, None),))
+            raise
+        demangle_cache.put_many(((exp, demangled),))
+    if demangled is None:
+        raise DemangleError(exp)
+    return demangled
+
+
+def _demangle_uncached(exp: str) -> str:
+    """`demangle` without `demangle_cache`."""
     if os == "Windows":
         if exp.startswith("?"):
             buf = ctypes.create_unicode_buffer(BUFSIZE)
@@ -72,6 +189,203 @@ def demangle(exp: str) -> str:
         raise DemangleError from e
 
 
+PARALLEL_THRESHOLD: Final = 100_000
+"""`demangle_many` uses a process pool only for at least these many names."""
+
+
+class _CxaDemangler:  # pylint: disable=too-few-public-methods
+    """Calls `__cxa_demangle` of the C++ runtime directly.
+
+    Unlike `cxxfilt`, one `malloc`ed output buffer is reused for a batch of
+    names; `__cxa_demangle` `realloc`s it when a name doesn't fit.
+    """
+
+    def __init__(self) -> None:
+        libc_name = ctypes.util.find_library("c")
+        libcxx_name = ctypes.util.find_library("stdc++") or ctypes.util.find_library(
+            "c++"
+        )
+        if libc_name is None or libcxx_name is None:
+            raise OSError("C or C++ runtime library not found")
+        libc = ctypes.CDLL(libc_name)
+        self.__malloc = libc.malloc
+        self.__malloc.argtypes = [ctypes.c_size_t]
+        self.__malloc.restype = ctypes.c_void_p
+        self.__free = libc.free
+        self.__free.argtypes = [ctypes.c_void_p]
+        self.__free.restype = None
+        # getattr avoids Python's own name mangling
+        self.__demangle = getattr(ctypes.CDLL(libcxx_name), "__cxa_demangle")
+        self.__demangle.argtypes = [
+            ctypes.c_char_p,
+            ctypes.c_void_p,
+            ctypes.POINTER(ctypes.c_size_t),
+            ctypes.POINTER(ctypes.c_int),
+        ]
+        self.__demangle.restype = ctypes.c_void_p
+
+    def __call__(self, names: Iterable[str]) -> list[Optional[str]]:
+        """Demangles `names`, None for the ones which aren't valid."""
+        size = ctypes.c_size_t(BUFSIZE)
+        status = ctypes.c_int()
+        buf = self.__malloc(BUFSIZE)
+        if not buf:
+            raise MemoryError
+        results: list[Optional[str]] = []
+        append, string_at, cxa_demangle = (
+            results.append,
+            ctypes.string_at,
+            self.__demangle,
+        )
+        psize, pstatus = ctypes.byref(size), ctypes.byref(status)
+        try:
+            for name in names:
+                # Same as `cxxfilt.demangle`, only external symbols are demangled
+                if not name.startswith("_Z"):
+                    append(name)
+                    continue
+                out = cxa_demangle(name.encode(), buf, psize, pstatus)
+                if status.value == 0:
+                    buf = out
+                    append(string_at(out).decode())
+                else:
+                    append(None)
+        finally:
+            self.__free(buf)
+        return results
+
+
+def _undecorate_many(names: Iterable[str]) -> list[Optional[str]]:
+    """Demangles `names` with `UnDecorateSymbolNameW` using a single buffer."""
+    try:
+        undecorate = ctypes.windll["dbghelp"].UnDecorateSymbolNameW
+    except OSError:
+        return [None if n.startswith("?") else n for n in names]
+    buf = ctypes.create_unicode_buffer(BUFSIZE)
+    results: list[Optional[str]] = []
+    for name in names:
+        if not name.startswith("?"):
+            results.append(name)
+        elif undecorate(name, buf, BUFSIZE, 0):
+            results.append(buf.value)
+        else:
+            results.append(None)
+    return results
+
+
+_cxa_demangler: Union[_CxaDemangler, bool, None] = None
+"""Created on first use, False if the C++ runtime isn't available."""
+
+
+def _demangle_batch(names: Sequence[str]) -> list[Optional[str]]:
+    """`demangle_many` for a single process."""
+    global _cxa_demangler  # pylint: disable=global-statement
+    if os == "Windows":
+        return _undecorate_many(names)
+    if _cxa_demangler is None:
+        try:
+            _cxa_demangler = _CxaDemangler()
+        except (OSError, AttributeError) as e:
+            log.warning("Falling back to demangling names one by one: %s", e)
+            _cxa_demangler = False
+    if isinstance(_cxa_demangler, _CxaDemangler):
+        return _cxa_demangler(names)
+    results: list[Optional[str]] = []
+    for name in names:
+        try:
+            results.append(_demangle_uncached(name))
+        except DemangleError:
+            results.append(None)
+    return results
+
+
+def demangle_many(
+    names: Sequence[str], processes: Optional[int] = 1
+) -> list[Optional[str]]:
+    """Demangles a batch of names much faster than calling `demangle` for each.
+
+    Same rules as `demangle`; `__cxa_demangle` is called directly through
+    `ctypes` on Linux & MacOS. Only the names not in `demangle_cache` are
+    demangled.
+
+    Args:
+        names (Sequence[str]): The names to demangle.
+        processes (Optional[int], optional): Number of processes to split the
+            work among, all CPUs if None. Only used for `PARALLEL_THRESHOLD`
+            names or more as starting them takes a while. Defaults to 1.
+
+    Returns:
+        list[Optional[str]]: Demangled names in the same order, None for the
+            names which couldn't be demangled.
+    """
+    results: list[Optional[str]] = list(names)
+    mangled = [i for i, name in enumerate(names) if name.startswith(MANGLED_PREFIX)]
+    cached = demangle_cache.get_many(names[i] for i in mangled)
+    missing = [i for i, demangled in zip(mangled, cached) if demangled is _MISSING]
+    for i, demangled in zip(mangled, cached):
+        results[i] = demangled
+    if missing:
+        todo = [names[i] for i in missing]
+        demangled_todo = _demangle_parallel(todo, processes)
+        for i, demangled in zip(missing, demangled_todo):
+            results[i] = demangled
+        demangle_cache.put_many(zip(todo, demangled_todo))
+    return results
+
+
+def _demangle_parallel(
+    names: Sequence[str], processes: Optional[int]
+) -> list[Optional[str]]:
+    """`demangle_many` without `demangle_cache`."""
+    if processes is None:
+        processes = multiprocessing.cpu_count()
+    if processes <= 1 or len(names) < PARALLEL_THRESHOLD:
+        return _demangle_batch(names)
+    size = -(-len(names) // processes)
+    chunks = []
+    for start in range(0, len(names), size):
+        end = start + size
+        chunks.append(names[start:end])
+    log.debug("Demangling %d names in %d processes", len(names), len(chunks))
+    # Forking a process running Tk and other threads isn't safe
+    ctx = multiprocessing.get_context("spawn")
+    with concurrent.futures.ProcessPoolExecutor(len(chunks), mp_context=ctx) as pool:
+        return list(itertools.chain.from_iterable(pool.map(_demangle_batch, chunks)))
+
+
+def demangle_text(lines: Iterable[str], batch_size: int = 4096) -> Iterator[list[str]]:
+    """Replaces the mangled names found anywhere in `lines`, like `c++filt`.
+
+    Lines are read `batch_size` at a time and the names in them demangled by
+    a single `demangle_many` call. Names which can't be demangled are left as
+    they are.
+
+    Yields:
+        list[str]: The demangled lines of every batch.
+    """
+    batch: list[str] = []
+    for line in lines:
+        batch.append(line)
+        if len(batch) == batch_size:
+            yield _demangle_lines(batch)
+            batch = []
+    if batch:
+        yield _demangle_lines(batch)
+
+
+def _demangle_lines(lines: list[str]) -> list[str]:
+    findall = MANGLED_RE.findall
+    names = list(dict.fromkeys(name for line in lines for name in findall(line)))
+    if not names:
+        return lines
+    demangled = dict(zip(names, demangle_many(names)))
+
+    def replace(m: re.Match) -> str:
+        return demangled[m.group()] or m.group()
+
+    return [MANGLED_RE.sub(replace, line) for line in lines]
+
+
 # * Constants
 
 LIGHT_THEME: Final = "yeti"
@@ -104,6 +418,263 @@ class CopyButton(ttk.Button):
         self.clipboard_append(self.__copy_var.get())
 
 
+class VirtualCombobox(ttk.Combobox):
+    """A `ttk.Combobox` with a dropdown which only renders the visible rows.
+
+    Tk copies `values` into Tcl and its dropdown listbox creates an item for
+    every single one of them, which takes ages for a few hundred thousand
+    export names. Instead, `values` here is any Python sequence, only a
+    reference to it is kept. The dropdown is a listbox with `ROWS` items which
+    are refilled from `values` as it is scrolled, and a scrollbar which is
+    driven by the position in `values`. Appending to `values` while the
+    dropdown is open is fine, call `refresh` afterwards.
+
+    Selecting a row sets the text and generates `<<ComboboxSelected>>` like
+    `ttk.Combobox`. The native `values` option should not be used.
+    """
+
+    ROWS = 15
+    """Number of rows rendered in the dropdown."""
+
+    def __init__(self, master=None, **kwargs):
+        super().__init__(master, **kwargs)
+        self.__values: Sequence[str] = ()
+        self.__top = 0
+        self.__active = 0
+        self.__popup: Optional[tk.Toplevel] = None
+        self.bind("<Button-1>", self.__on_click)
+        self.bind("<Down>", lambda *_: self.post())
+
+    @property
+    def values(self) -> Sequence[str]:
+        """Items shown in the dropdown."""
+        return self.__values
+
+    @values.setter
+    def values(self, values: Sequence[str]) -> None:
+        self.__values = values
+        self.__top = self.__active = 0
+        self.refresh()
+
+    def __on_click(self, event: tk.tk.Event):
+        if "arrow" in self.identify(event.x, event.y):
+            self.post()
+            return "break"
+        return None
+
+    def post(self):
+        """Opens the dropdown below the combobox."""
+        if self.__popup is not None or self.instate(["disabled"]):
+            return "break"
+        log.debug("Posting dropdown of %d values", len(self.__values))
+        self.__popup = popup = tk.Toplevel(overrideredirect=True, topmost=True)
+        popup.withdraw()
+        self.__lb = lb = tk.tk.Listbox(
+            popup, height=self.ROWS, activestyle="none", exportselection=False
+        )
+        self.__sb = sb = ttk.Scrollbar(popup, command=self.__yview)
+        sb.pack(side="right", fill="y")
+        lb.pack(side="left", fill="both", expand=True)
+
+        lb.bind("<ButtonRelease-1>", lambda e: self.select(lb.nearest(e.y)))
+        lb.bind("<Motion>", lambda e: self.__activate(self.__top + lb.nearest(e.y)))
+        lb.bind("<MouseWheel>", lambda e: self.__scroll(-e.delta // 120))
+        lb.bind("<Button-4>", lambda *_: self.__scroll(-3))
+        lb.bind("<Button-5>", lambda *_: self.__scroll(3))
+        for key, delta in (
+            ("Up", -1),
+            ("Down", 1),
+            ("Prior", -self.ROWS),
+            ("Next", self.ROWS),
+        ):
+            lb.bind(f"<{key}>", lambda _, d=delta: self.__activate(self.__active + d))
+        lb.bind("<Return>", lambda *_: self.select(self.__active - self.__top))
+        lb.bind("<Escape>", lambda *_: self.unpost())
+        popup.bind("<ButtonPress-1>", self.__on_popup_click)
+
+        # Start at the current text if it is one of the values
+        try:
+            self.__activate(self.__values.index(self.get()))
+        except ValueError:
+            self.__activate(0)
+        self.update_idletasks()
+        x, y = self.winfo_rootx(), self.winfo_rooty() + self.winfo_height()
+        popup.geometry(f"{self.winfo_width()}x{popup.winfo_reqheight()}+{x}+{y}")
+        popup.deiconify()
+        lb.focus_set()
+        popup.grab_set()
+        return "break"
+
+    def unpost(self) -> None:
+        """Closes the dropdown."""
+        popup = self.__popup
+        if popup is not None:
+            self.__popup = None
+            popup.grab_release()
+            popup.destroy()
+            self.focus_set()
+
+    def select(self, row: int) -> None:
+        """Selects the value shown at `row` of the dropdown and closes it."""
+        index = self.__top + row
+        if 0 <= index < len(self.__values):
+            self.set(self.__values[index])
+            self.icursor("end")
+            self.unpost()
+            self.event_generate("<<ComboboxSelected>>")
+
+    def refresh(self) -> None:
+        """Rerenders the dropdown if it is open."""
+        if self.__popup is None:
+            return
+        values = self.__values
+        num_values = len(values)
+        self.__top = top = max(min(self.__top, num_values - self.ROWS), 0)
+        bottom = min(top + self.ROWS, num_values)
+        lb = self.__lb
+        lb.delete(0, "end")
+        lb.insert("end", *values[top:bottom])
+        if top <= self.__active < bottom:
+            lb.selection_set(self.__active - top)
+        if num_values:
+            self.__sb.set(top / num_values, bottom / num_values)
+        else:
+            self.__sb.set(0, 1)
+
+    def __activate(self, index: int):
+        index = max(min(index, len(self.__values) - 1), 0)
+        self.__active = index
+        if index < self.__top:
+            self.__top = index
+        elif index >= self.__top + self.ROWS:
+            self.__top = index - self.ROWS + 1
+        self.refresh()
+        return "break"
+
+    def __scroll(self, rows: int):
+        self.__top += rows
+        self.refresh()
+        return "break"
+
+    def __yview(self, *args) -> None:
+        """Scrollbar command, see `tkinter.YView.yview`."""
+        if args[0] == "moveto":
+            self.__top = int(float(args[1]) * len(self.__values))
+            self.refresh()
+        elif args[0] == "scroll":
+            amount = int(args[1])
+            self.__scroll(amount * self.ROWS if args[2] == "pages" else amount)
+
+    def __on_popup_click(self, event: tk.tk.Event) -> None:
+        """Closes the dropdown on clicks outside it, it holds the grab."""
+        popup = self.__popup
+        if popup is None:
+            return
+        x, y = event.x_root - popup.winfo_rootx(), event.y_root - popup.winfo_rooty()
+        if not (0 <= x < popup.winfo_width() and 0 <= y < popup.winfo_height()):
+            self.unpost()
+
+    def destroy(self):
+        """Closes the dropdown before getting destroyed."""
+        self.unpost()
+        super().destroy()
+
+
+class VirtualListbox(ttk.Frame):
+    """A read-only listbox with a scrollbar which only renders visible rows.
+
+    Same idea as `VirtualCombobox`: `values` is any Python sequence, only a
+    reference to it is kept, and the rows are refilled from it as it is
+    scrolled. A `tk.Text` or `tk.Listbox` with a few hundred thousand lines
+    takes ages to fill. Call `refresh` after appending to `values`, the view
+    keeps following the end if it was scrolled to the bottom.
+
+    Keyword arguments are passed on to the `tk.Listbox`.
+    """
+
+    def __init__(self, master=None, **kwargs):
+        super().__init__(master)
+        self.__values: Sequence[str] = ()
+        self.__top = 0
+        self.__rows = 1
+        self.__follow = True
+        self.__lb = lb = tk.tk.Listbox(
+            self, activestyle="none", selectmode="extended", **kwargs
+        )
+        self.__sb = sb = ttk.Scrollbar(self, command=self.__yview)
+        sb.pack(side="right", fill="y")
+        lb.pack(side="left", fill="both", expand=True)
+        self.__linespace = tkinter.font.Font(font=lb.cget("font")).metrics("linespace")
+
+        lb.bind("<Configure>", self.__on_configure)
+        lb.bind("<MouseWheel>", lambda e: self.__scroll(-e.delta // 120))
+        lb.bind("<Button-4>", lambda *_: self.__scroll(-3))
+        lb.bind("<Button-5>", lambda *_: self.__scroll(3))
+        for key, delta in (("Up", -1), ("Down", 1)):
+            lb.bind(f"<{key}>", lambda _, d=delta: self.__scroll(d))
+        lb.bind("<Prior>", lambda *_: self.__scroll(-self.__rows))
+        lb.bind("<Next>", lambda *_: self.__scroll(self.__rows))
+        lb.bind("<Home>", lambda *_: self.__scroll(-len(self.__values)))
+        lb.bind("<End>", lambda *_: self.__scroll(len(self.__values)))
+
+    @property
+    def values(self) -> Sequence[str]:
+        """Rows shown in the listbox."""
+        return self.__values
+
+    @values.setter
+    def values(self, values: Sequence[str]) -> None:
+        self.__values = values
+        self.__top = 0
+        self.__follow = True
+        self.refresh()
+
+    @property
+    def selection(self) -> list[str]:
+        """The selected rows, only visible rows can be selected."""
+        lb = self.__lb
+        return [lb.get(i) for i in lb.curselection()]
+
+    def refresh(self) -> None:
+        """Rerenders the visible rows."""
+        values = self.__values
+        num_values, rows = len(values), self.__rows
+        if self.__follow:
+            self.__top = num_values - rows
+        self.__top = top = max(min(self.__top, num_values - rows), 0)
+        bottom = min(top + rows, num_values)
+        self.__follow = bottom == num_values
+        lb = self.__lb
+        lb.delete(0, "end")
+        lb.insert("end", *values[top:bottom])
+        if num_values:
+            self.__sb.set(top / num_values, bottom / num_values)
+        else:
+            self.__sb.set(0, 1)
+
+    def __on_configure(self, event: tk.tk.Event) -> None:
+        rows = max(event.height // self.__linespace, 1)
+        if rows != self.__rows:
+            self.__rows = rows
+            self.refresh()
+
+    def __scroll(self, rows: int):
+        self.__top += rows
+        self.__follow = False
+        self.refresh()
+        return "break"
+
+    def __yview(self, *args) -> None:
+        """Scrollbar command, see `tkinter.YView.yview`."""
+        if args[0] == "moveto":
+            self.__top = int(float(args[1]) * len(self.__values))
+            self.__follow = False
+            self.refresh()
+        elif args[0] == "scroll":
+            amount = int(args[1])
+            self.__scroll(amount * self.__rows if args[2] == "pages" else amount)
+
+
 class StaticThemedTooltip(tktooltip.ToolTip):
     """A non-tracking theme-aware tooltip with a configurable delay."""
 
@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+
+"""
+dycall.worker
+~~~~~~~~~~~~~
+
+Contains `IsolatedWorker` and `WorkerCrashed`.
+"""
+
+from __future__ import annotations
+
+import logging
+import multiprocessing
+import pickle
+import platform
+import signal
+import threading
+from multiprocessing.connection import Connection
+from typing import Any, Callable, Optional
+
+try:
+    from typing import Final  # type: ignore
+except ImportError:
+    # pylint: disable=ungrouped-imports
+    from typing_extensions import Final  # type: ignore
+
+try:
+    # pylint: disable=ungrouped-imports
+    from multiprocessing import shared_memory
+except ImportError:  # Python 3.7
+    shared_memory = None  # type: ignore
+
+from dycall.types import RunResult
+
+log = logging.getLogger(__name__)
+
+SHARED_MEMORY_THRESHOLD: Final = 1 << 16
+"""Results larger than this, when pickled, are passed through shared memory."""
+
+
+class WorkerCrashed(Exception):
+    """The worker process died while calling a function, e.g. by a segfault.
+
+    It has been restarted already when this is raised.
+    """
+
+    def __init__(self, exitcode: Optional[int], killed: bool = False) -> None:
+        self.exitcode = exitcode
+        """Exit code of the worker, negative for signals (POSIX only)."""
+
+        self.killed = killed
+        """Whether it was killed by `IsolatedWorker.kill` or a timeout."""
+
+        self.signal: Optional[signal.Signals] = None
+        """The signal which killed the worker, if any."""
+
+        if exitcode is not None and exitcode < 0:
+            try:
+                self.signal = signal.Signals(-exitcode)
+            except ValueError:
+                pass
+        if killed:
+            super().__init__("Worker process was killed during the call, restarted it")
+            return
+        if self.signal is not None:
+            reason = f"{self.signal.name} (signal {self.signal.value})"
+        elif exitcode is None:
+            reason = "an unknown reason"
+        elif exitcode < 0:
+            reason = f"signal {-exitcode}"
+        elif platform.system() == "Windows":
+            # An NTSTATUS, e.g. 0xC0000005 for an access violation
+            reason = f"exit code {exitcode & 0xFFFFFFFF:#010x}"
+        else:
+            reason = f"exit code {exitcode}"
+        super().__init__(f"Worker process crashed with {reason}, restarted it")
+
+
+def _serve(conn: Connection) -> None:
+    """Main loop of the worker process.
+
+    Requests are a function and its arguments, `dycall.runner.run_request`
+    usually. Replies are a `RunResult`, ("shared", (name, size)) for a pickled
+    `RunResult` in shared memory or ("error", exception). A shared memory
+    block is kept open till the next request, it would be gone on Windows
+    otherwise.
+    """
+    block = None
+    while True:
+        try:
+            request = conn.recv()
+        except (EOFError, OSError):
+            return
+        if block is not None:
+            block.close()
+            block = None
+        if request is None:
+            return
+        func, args = request
+        try:
+            result = func(*args)
+        except Exception as e:  # pylint: disable=broad-except
+            try:
+                conn.send(("error", e))
+            except Exception:  # pylint: disable=broad-except
+                conn.send(("error", RuntimeError(repr(e))))
+            continue
+        data = pickle.dumps(result, pickle.HIGHEST_PROTOCOL)
+        if shared_memory is None or len(data) <= SHARED_MEMORY_THRESHOLD:
+            conn.send_bytes(data)
+            continue
+        block = shared_memory.SharedMemory(create=True, size=len(data))
+        assert block.buf is not None  # nosec, None only after close()
+        block.buf[: len(data)] = data
+        conn.send(("shared", (block.name, len(data))))
+
+
+def _read_shared(name: str, size: int) -> RunResult:
+    """Unpickles a result from shared memory and frees the block."""
+    block = shared_memory.SharedMemory(name)
+    try:
+        assert block.buf is not None  # nosec, None only after close()
+        return pickle.loads(bytes(block.buf[:size]))
+    finally:
+        block.close()
+        block.unlink()
+
+
+class IsolatedWorker:
+    """A long-lived process which executes `dycall.runner.Runner`s, so that a
+    crash in a called function doesn't take DyCall down with it.
+
+    Enabled by **Options** -> **Isolated Process**. Libraries and prototypes
+    stay loaded in the worker between calls, see `LibraryCache`. Requests are
+    sent over a pipe, `dycall.runner.run_request` with the arguments of
+    `Runner` usually; calls are made one at a time. Large results, e.g. big
+    out-buffers, come back through shared memory.
+
+    If the worker dies during a call, a new one is started right away and
+    `WorkerCrashed` is raised with the signal which killed it. A call which
+    hangs can be ended by `kill`, from another thread, or by a timeout.
+    """
+
+    def __init__(self) -> None:
+        self.__lock = threading.Lock()
+        self.__process: Optional[multiprocessing.process.BaseProcess] = None
+        self.__conn: Optional[Connection] = None
+        self.__killed = False
+        self.restarts = 0
+        """Number of times the worker has been restarted after a crash."""
+
+    @property
+    def pid(self) -> Optional[int]:
+        """Process ID of the worker, None till the first call."""
+        return None if self.__process is None else self.__process.pid
+
+    def __start(self) -> None:
+        # Forking a Tk app is unsafe
+        ctx = multiprocessing.get_context("spawn")
+        conn, child = ctx.Pipe()
+        process = ctx.Process(
+            target=_serve, args=(child,), name="DyCallWorker", daemon=True
+        )
+        process.start()
+        child.close()
+        self.__process, self.__conn = process, conn
+        log.debug("Started worker process %d", process.pid)
+
+    def call(
+        self,
+        func: Callable[..., RunResult],
+        args: tuple[Any, ...],
+        timeout: Optional[float] = None,
+    ) -> RunResult:
+        """Executes `func(*args)` in the worker process.
+
+        Args:
+            func (Callable[..., RunResult]): Pickled by reference, hence a
+                module level function, e.g. `dycall.runner.run_request`.
+            args (tuple[Any, ...]): Pickled by value.
+            timeout (float, optional): Seconds after which the worker is
+                killed, waits forever by default.
+
+        Raises:
+            WorkerCrashed: When the worker dies or is killed during the call.
+            Exception: Whatever `func` raises.
+        """
+        with self.__lock:
+            process = self.__process
+            if process is None or not process.is_alive():
+                self.__start()
+            conn = self.__conn
+            assert conn is not None  # nosec
+            self.__killed = False
+            try:
+                conn.send((func, args))
+                if timeout is not None and not conn.poll(timeout):
+                    log.error("Call timed out after %ss", timeout)
+                    self.kill()
+                data = conn.recv_bytes()
+            except (EOFError, OSError):
+                self.__process.join(5)  # type: ignore
+                exitcode = self.__process.exitcode  # type: ignore
+                conn.close()
+                log.error("Worker process died with exit code %s", exitcode)
+                self.restarts += 1
+                self.__start()
+                raise WorkerCrashed(exitcode, self.__killed) from None
+            reply = pickle.loads(data)
+            if isinstance(reply, RunResult):
+                return reply
+            kind, payload = reply
+            if kind == "shared":
+                # Before the next request makes the worker close the block
+                return _read_shared(*payload)
+        raise payload
+
+    def kill(self) -> None:
+        """Kills the worker, e.g. when a call hangs.
+
+        The call in progress, if any, raises `WorkerCrashed` and the worker
+        is restarted. Doesn't wait for the call, unlike `stop`.
+        """
+        process = self.__process
+        if process is not None and process.is_alive():
+            log.warning("Killing worker process %d", process.pid)
+            self.__killed = True
+            process.kill()
+
+    def stop(self) -> None:
+        """Asks the worker to exit, it is started again by the next `call`."""
+        with self.__lock:
+            if self.__conn is not None:
+                try:
+                    self.__conn.send(None)
+                except OSError:
+                    pass
+                self.__conn.close()
+            if self.__process is not None:
+                self.__process.join(1)
+                if self.__process.is_alive():
+                    self.__process.terminate()
+            self.__process = self.__conn = None
+
+
+isolated_worker = IsolatedWorker()
+"""Used by `Runner` when **Isolated Process** is on."""
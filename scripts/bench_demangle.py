@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+
+"""Compares the time taken to demangle the export names of libraries one by
+one with `dycall.util.demangle` and in a batch with `demangle_many`.
+
+Names are read with DyCall's own readers and demangled `--repeat` times by
+every method, the best time is reported. `demangle_cache` is emptied before
+every run, except for the "cached" method which measures a warm cache.
+
+Usage:
+    python scripts/bench_demangle.py /usr/lib/x86_64-linux-gnu/libLLVM-15.so
+    python scripts/bench_demangle.py --processes 4 Qt5Core.dll
+"""
+
+import argparse
+import time
+
+from dycall.elf import ELFReader, ELFReaderError
+from dycall.pe import PEReader
+from dycall.util import DemangleError, demangle, demangle_cache, demangle_many
+
+
+def _names(path: str) -> list:
+    try:
+        with ELFReader(path) as reader:
+            return [e.name for e in reader]
+    except ELFReaderError:
+        with PEReader(path) as reader:
+            return [e.name for e in reader if e.name]
+
+
+def _per_name(names: list, _: int) -> list:
+    results = []
+    for name in names:
+        try:
+            results.append(demangle(name))
+        except DemangleError:
+            results.append(None)
+    return results
+
+
+def _batch(names: list, _: int) -> list:
+    return demangle_many(names)
+
+
+def _pool(names: list, processes: int) -> list:
+    return demangle_many(names, processes)
+
+
+METHODS = {"per-name": _per_name, "batch": _batch, "pool": _pool, "cached": _batch}
+
+
+def main(libs: list, methods: list, processes: int, repeat: int):  # noqa
+    for lib in libs:
+        names = _names(lib)
+        print(f"{lib} ({len(names)} names)")
+        expected = None
+        for method in methods:
+            best = float("inf")
+            for _ in range(repeat):
+                demangle_cache.clear()
+                if method == "cached":
+                    _batch(names, processes)
+                start = time.perf_counter()
+                results = METHODS[method](names, processes)
+                best = min(best, time.perf_counter() - start)
+            if expected is None:
+                expected = results
+            same = "" if results == expected else "  (results differ!)"
+            print(
+                f"  {method:<8} time={best:8.3f}s "
+                f"per name={best / max(len(names), 1) * 1e6:6.2f}us{same}"
+            )
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description=__doc__)
+    ap.add_argument("libs", nargs="+")
+    ap.add_argument(
+        "--methods", nargs="+", choices=METHODS, default=["per-name", "batch"]
+    )
+    ap.add_argument(
+        "--processes", type=int, help="For the pool method, all CPUs by default."
+    )
+    ap.add_argument("--repeat", type=int, default=3)
+    args = vars(ap.parse_args())
+    main(**args)
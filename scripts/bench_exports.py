@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+
+"""Compares the time and peak memory taken by `lief.parse` and DyCall's own
+readers to list the exports of libraries.
+
+Every method runs in a fresh process, so that peak memory usage (max RSS,
+not available on Windows) of one doesn't affect the other.
+
+Usage:
+    python scripts/bench_exports.py /usr/lib/x86_64-linux-gnu/libLLVM-15.so
+    python scripts/bench_exports.py --methods lief pe Qt5Core.dll
+"""
+
+import argparse
+import multiprocessing
+import time
+
+try:
+    import resource
+except ImportError:
+    resource = None  # type: ignore
+
+
+def _lief(path: str) -> int:
+    import lief  # pylint: disable=import-outside-toplevel
+
+    lib = lief.parse(path)
+    if lib.format == lief.EXE_FORMATS.PE:
+        return len([(e.address, e.name, e.ordinal) for e in lib.get_export().entries])
+    return len([(e.value, e.name, e.demangled_name) for e in lib.exported_symbols])
+
+
+def _elf(path: str) -> int:
+    from dycall.elf import ELFReader  # pylint: disable=import-outside-toplevel
+
+    with ELFReader(path) as reader:
+        return len(list(reader))
+
+
+def _pe(path: str) -> int:
+    from dycall.pe import PEReader  # pylint: disable=import-outside-toplevel
+
+    with PEReader(path) as reader:
+        return len(list(reader))
+
+
+METHODS = {"lief": _lief, "elf": _elf, "pe": _pe}
+
+
+def _maxrss_kib() -> int:
+    if resource is None:
+        return 0
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def _child(method: str, path: str, que: multiprocessing.Queue):
+    before = _maxrss_kib()
+    start = time.perf_counter()
+    try:
+        count = METHODS[method](path)
+    except Exception as e:  # pylint: disable=broad-except
+        que.put((method, repr(e), 0, 0))
+        return
+    elapsed = time.perf_counter() - start
+    que.put((method, count, elapsed, _maxrss_kib() - before))
+
+
+def main(libs: list, methods: list, repeat: int):  # noqa
+    ctx = multiprocessing.get_context("spawn")
+    for lib in libs:
+        print(lib)
+        for method in methods:
+            for _ in range(repeat):
+                que = ctx.Queue()
+                proc = ctx.Process(target=_child, args=(method, lib, que))
+                proc.start()
+                name, count, elapsed, rss = que.get()
+                proc.join()
+                print(
+                    f"  {name:<6} exports={count:<8} time={elapsed:8.3f}s "
+                    f"peak={rss / 1024:8.1f} MiB"
+                )
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description=__doc__)
+    ap.add_argument("libs", nargs="+")
+    ap.add_argument("--methods", nargs="+", choices=METHODS, default=["lief", "elf"])
+    ap.add_argument("--repeat", type=int, default=1)
+    args = vars(ap.parse_args())
+    main(**args)
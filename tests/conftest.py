@@ -10,10 +10,11 @@ from dycall.app import App
 
 @pytest.fixture()
 def create_app(monkeypatch: pytest.MonkeyPatch, tmp_path) -> App:
-    """Instantiates DyCall with a monkeypatched config dir."""
+    """Instantiates DyCall with monkeypatched config and cache dirs."""
 
     def mock_config_dir(*_):
         return tmp_path
 
     monkeypatch.setattr(appdirs, "user_config_dir", mock_config_dir)
+    monkeypatch.setattr(appdirs, "user_cache_dir", mock_config_dir)
     return App()
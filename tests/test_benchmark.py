@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+
+"""Tests for `dycall.benchmark`."""
+
+from __future__ import annotations
+
+import ctypes.util
+import json
+import platform
+import threading
+
+import pytest
+
+from dycall.benchmark import (
+    BenchmarkLevel,
+    BenchmarkReport,
+    BenchmarkSettings,
+    BenchmarkStats,
+    BenchmarkTarget,
+    format_ns,
+    measure,
+    run_benchmark,
+)
+
+linux_only = pytest.mark.skipif(
+    platform.system() != "Linux", reason="Needs the C runtime of Linux"
+)
+
+
+def libc_abs(*args: tuple[str, str]) -> BenchmarkTarget:
+    """Target for C `abs`."""
+    return BenchmarkTarget(
+        ctypes.util.find_library("c"), "abs", "cdecl", "int32_t", args
+    )
+
+
+def test_stats():
+    """Overhead is subtracted and statistics use the nearest rank."""
+    stats = BenchmarkStats.from_samples(range(110, 10, -1), 10, 0.5)
+    assert stats.samples[0] == 1 and stats.samples[-1] == 100
+    assert (stats.min, stats.median, stats.p99, stats.max) == (1, 50, 99, 100)
+    assert stats.mean == 50.5
+    assert stats.calls_per_second == 200
+
+    hist = stats.histogram(bins=7)
+    assert len(hist) == 7
+    assert hist[0][0] == 1 and hist[-1][1] == 99
+    assert sum(c for _, _, c in hist) == 100
+
+    assert list(BenchmarkStats.from_samples([5, 5], 10, 1).samples) == [0, 0]
+    assert BenchmarkStats([], 0, 0).histogram() == []
+
+
+def test_measure():
+    """Every call is timed, time budgets and cancellation are honoured."""
+    calls = []
+    samples, elapsed = measure(calls.append, (None,), calls=1000)
+    assert len(samples) == len(calls) == 1000
+    assert elapsed > 0
+
+    samples, elapsed = measure(lambda: None, (), seconds=0.05)
+    assert elapsed >= 0.05 and len(samples) > 0
+
+    cancel = threading.Event()
+    cancel.set()
+    samples, _ = measure(lambda: None, (), seconds=60, cancel=cancel)
+    assert len(samples) < 1000
+
+
+def test_format_ns():
+    """Durations get a suitable unit."""
+    assert format_ns(12) == "12 ns"
+    assert format_ns(1500) == "1.5 µs"
+    assert format_ns(2.5e9) == "2.5 s"
+
+
+@linux_only
+def test_run_benchmark(tmp_path):
+    """C `abs` is benchmarked and the report is saved as JSON."""
+    report = run_benchmark(
+        libc_abs(("int32_t", "-5")), BenchmarkSettings(calls=500, warmup=10)
+    )
+    assert isinstance(report, BenchmarkReport)
+    assert len(report.levels) == 1
+    assert report.levels[0].stats.count == 500
+    assert report.levels[0].stats.overhead > 0
+
+    path = report.save(str(tmp_path / "report.json"))
+    with open(path, encoding="utf-8") as fp:
+        saved = json.load(fp)
+    assert saved["target"]["name_or_ord"] == "abs"
+    assert saved["settings"]["calls"] == 500
+    assert saved["levels"][0]["calls"] == 500
+    assert len(saved["levels"][0]["histogram"]) == 20
+
+
+@linux_only
+@pytest.mark.parametrize("processes", [False, True])
+def test_run_benchmark_scaling(processes):
+    """Levels of 1 ... N workers are benchmarked, each worker is reported."""
+    settings = BenchmarkSettings(calls=200, warmup=10, workers=3, processes=processes)
+    report = run_benchmark(libc_abs(("int32_t", "-5")), settings)
+    assert [level.workers for level in report.levels] == [1, 2, 3]
+    for level in report.levels:
+        assert len(level.per_worker) == level.workers
+        assert level.stats.count == 200 * level.workers
+    saved = report.to_dict()["levels"][2]
+    assert saved["workers"] == 3
+    assert len(saved["per_worker"]) == 3
+    assert "histogram" not in saved["per_worker"][0]
+
+
+@linux_only
+@pytest.mark.parametrize("processes", [False, True])
+def test_run_benchmark_progress(processes):
+    """Progress is reported while the first worker calls."""
+    fractions: list[float] = []
+    settings = BenchmarkSettings(seconds=0.2, warmup=10, processes=processes)
+    run_benchmark(libc_abs(("int32_t", "-5")), settings, progress=fractions.append)
+    assert any(0 < f < 1 for f in fractions)
+    assert fractions == sorted(fractions) and fractions[-1] == 1
+
+
+def test_level_from_samples():
+    """Samples are merged; the slowest worker gives the aggregate time."""
+    level = BenchmarkLevel.from_samples([([3, 1], 1.0), ([2, 4], 2.0)], 0)
+    assert level.workers == 2
+    assert list(level.stats.samples) == [1, 2, 3, 4]
+    assert level.stats.calls_per_second == 2
+    assert [w.calls_per_second for w in level.per_worker] == [2, 1]
+
+
+@linux_only
+def test_run_benchmark_invalid():
+    """Invalid arguments fail before any call is made."""
+    with pytest.raises(ValueError):
+        run_benchmark(libc_abs(("int32_t", "five")), BenchmarkSettings(calls=1))
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+
+"""Tests for `dycall.browser.ScopeTree`."""
+
+from __future__ import annotations
+
+import pytest
+
+from dycall.browser import ScopeNode, ScopeTree, split_scope
+
+
+@pytest.mark.parametrize(
+    "name, scopes",
+    [
+        ("printf", ("printf",)),
+        ("ns::Foo::bar(int) const", ("ns", "Foo", "bar")),
+        ("void ns::f<int>(std::vector<int, std::allocator<int> >)", ("ns", "f<int>")),
+        ("ns::A<B>::operator<<(ns::A<B> const&)", ("ns", "A<B>", "operator<<")),
+        ("ns::A::operator new(unsigned long)", ("ns", "A", "operator new")),
+        ("ostream& ns::operator<< <int>(ostream&, int)", ("ns", "operator<< <int>")),
+        ("(anonymous namespace)::Foo::x", ("(anonymous namespace)", "Foo", "x")),
+        ("ns::f(int)::x", ("ns", "f(int)", "x")),
+        (
+            "f()::{lambda(int)#1}::operator()(int) const",
+            ("f()", "{lambda(int)#1}", "operator()"),
+        ),
+        ("vtable for ns::Foo", ("ns", "Foo")),
+        ("typeinfo for void (int)", ("void (int)",)),
+        ("public: void __cdecl ns::Foo::bar(int)", ("ns", "Foo", "bar")),
+    ],
+)
+def test_split_scope(name: str, scopes: tuple):
+    """Return types, parameters and special symbol prefixes are dropped."""
+    assert split_scope(name) == scopes
+
+
+def walk(tree: ScopeTree, node: ScopeNode) -> dict:
+    """Materialises the whole tree as nested dicts, exports as their rows."""
+    return {
+        child.name: child.row if child.is_export else walk(tree, child)
+        for child in tree.children(node)
+    }
+
+
+def test_scope_tree():
+    """Overloads are grouped, single exports aren't, counts add up."""
+    names = [
+        "ns::Foo::bar(int)",
+        "puts",
+        "ns::Foo::bar(char)",
+        "ns::Foo::baz()",
+        "vtable for ns::Foo",
+        "ns::free()",
+    ]
+    tree = ScopeTree(names)
+    assert walk(tree, tree.root) == {
+        "ns": {
+            "Foo": {
+                "vtable for ns::Foo": 4,
+                "bar": {"ns::Foo::bar(int)": 0, "ns::Foo::bar(char)": 2},
+                "ns::Foo::baz()": 3,
+            },
+            "ns::free()": 5,
+        },
+        "puts": 1,
+    }
+    ns = tree.children(tree.root)[0]
+    assert ns.size == 5
+    assert [c.size for c in tree.children(ns)] == [4, 1]
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+
+"""Tests for `dycall.cache.ExportCache` and `dycall.cache.DemangleStore`."""
+
+from __future__ import annotations
+
+import os
+
+from dycall.cache import DemangleStore, ExportCache
+from dycall.store import ExportStore
+from dycall.types import ELFExport, PEExport
+from dycall.util import DemangleCache, DemangleError
+
+
+def test_roundtrip(tmp_path):
+    """Cached exports are equal to the ones put and are not demangled again."""
+    lib = tmp_path / "lib.dll"
+    lib.write_bytes(os.urandom(1024))
+    exports = ExportStore(
+        [
+            PEExport(0x1000, "foo", 1, "foo"),
+            PEExport(0x2000, "", 2),
+            PEExport(0x3000, "?bad", 3, "?bad", DemangleError()),
+        ]
+    )
+    cache = ExportCache(str(tmp_path / "cache"))
+    assert cache.get(str(lib)) is None
+    cache.put(str(lib), ExportCache.PE, exports)
+    cached = cache.get(str(lib))
+    assert cached is not None
+    assert cached.kind == ExportCache.PE
+    assert list(cached.exports) == list(exports)
+    assert cached.exports[1].demangled_name == "@2"
+    assert isinstance(cached.exports[2].exc, DemangleError)
+
+
+def test_invalidation(tmp_path):
+    """Entries of modified libraries are not used."""
+    lib = tmp_path / "lib.so"
+    lib.write_bytes(b"\x7fELF" + bytes(1020))
+    cache = ExportCache(str(tmp_path))
+    exports = ExportStore([ELFExport(0x10, "_Z1fv", "f()", 16, 0x12)])
+    cache.put(str(lib), ExportCache.ELF, exports)
+    cached = cache.get(str(lib))
+    assert cached is not None and list(cached.exports) == list(exports)
+    lib.write_bytes(b"\x7fELF" + bytes(1021))
+    assert cache.get(str(lib)) is None
+
+
+def test_demangle_store(tmp_path):
+    """Saved entries are loaded in the same order, failures included."""
+    path = str(tmp_path / "cache" / "demangled.bin")
+    cache = DemangleCache()
+    DemangleStore(path).load(cache)
+    assert not cache.items()
+    cache.put_many([("_Z1fv", "f()"), ("_Zbad", None), ("?g@@YAXXZ", "void g(void)")])
+    DemangleStore(path).save(cache)
+    loaded = DemangleCache()
+    DemangleStore(path).load(loaded)
+    assert loaded.items() == cache.items()
@@ -0,0 +1,36 @@
+#!/usr/bin/env python3
+
+"""Tests for `dycall.elf.ELFReader`."""
+
+from __future__ import annotations
+
+import _ctypes
+import platform
+
+import lief
+import pytest
+
+from dycall.elf import ELFReader, ELFReaderError
+
+pytestmark = pytest.mark.skipif(
+    platform.system() != "Linux", reason="Needs a native ELF shared object"
+)
+
+
+def test_same_as_lief():
+    """Exports read are the same as those of `lief.ELF.Binary.exported_symbols`."""
+    lib = lief.parse(_ctypes.__file__)
+    expected = {
+        (e.value, e.name, e.size, int(e.binding) << 4 | int(e.type))
+        for e in lib.exported_symbols
+    }
+    with ELFReader(_ctypes.__file__) as reader:
+        assert {(e.address, e.name, e.size, e.info) for e in reader} == expected
+
+
+def test_not_elf(tmp_path):
+    """Files without a dynamic symbol table raise `ELFReaderError`."""
+    junk = tmp_path / "junk.so"
+    junk.write_bytes(b"\x7fELF" + bytes(60))
+    with pytest.raises(ELFReaderError):
+        ELFReader(str(junk))
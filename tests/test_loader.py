@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+
+"""Tests for `dycall.loader.Loader`."""
+
+from __future__ import annotations
+
+import _ctypes
+import queue
+
+import lief
+
+from dycall.cache import ExportCache
+from dycall.loader import (
+    LoadBatch,
+    Loader,
+    LoadError,
+    LoadProgress,
+    LoadResult,
+    Prewarmer,
+    ResultLRU,
+)
+from dycall.store import ExportStore
+from dycall.types import ELFExport
+
+LIB = _ctypes.__file__
+
+
+def drain(que: queue.Queue) -> list:
+    """Returns all the items currently in `que`."""
+    items = []
+    while not que.empty():
+        items.append(que.get_nowait())
+    return items
+
+
+def test_load():
+    """Progress is reported first and the result is pushed last."""
+    que: queue.Queue = queue.Queue()
+    Loader(que, LIB).run()
+    items = drain(que)
+    assert isinstance(items[0], LoadProgress)
+    result = items[-1]
+    assert isinstance(result, LoadResult)
+    assert result.is_native
+    assert "PyInit__ctypes" in (e.name for e in result.exports)
+
+
+def test_batches(tmp_path):
+    """Batches add up to the result, cached exports aren't streamed."""
+    cache = ExportCache(str(tmp_path))
+    for streamed in (True, False):
+        que: queue.Queue = queue.Queue()
+        Loader(que, LIB, cache).run()
+        items = drain(que)
+        exports: list = []
+        for item in items:
+            if isinstance(item, LoadBatch):
+                assert item.start == len(exports)
+                exports.extend(item.exports)
+        assert exports == (list(items[-1].exports) if streamed else [])
+
+
+def test_load_failure(tmp_path):
+    """Unparseable files push a `LoadError`."""
+    junk = tmp_path / "junk.so"
+    junk.write_bytes(b"\0" * 64)
+    que: queue.Queue = queue.Queue()
+    Loader(que, str(junk)).run()
+    assert isinstance(drain(que)[-1], LoadError)
+
+
+def test_cancel():
+    """Nothing is pushed after a load is cancelled."""
+    que: queue.Queue = queue.Queue()
+    loader = Loader(que, LIB)
+    loader.cancel()
+    loader.run()
+    assert not drain(que)
+
+
+def test_cache_hit(tmp_path, monkeypatch):
+    """LIEF isn't used when the exports are already cached."""
+    cache = ExportCache(str(tmp_path))
+    que: queue.Queue = queue.Queue()
+    Loader(que, LIB, cache).run()
+    exports = drain(que)[-1].exports
+
+    monkeypatch.setattr(lief, "parse", None)
+    Loader(que, LIB, cache).run()
+    result = drain(que)[-1]
+    assert isinstance(result, LoadResult)
+    assert list(result.exports) == list(exports)
+
+
+def test_lru_eviction(tmp_path):
+    """Least recently used results are evicted when over budget."""
+    paths = []
+    for i in range(3):
+        path = tmp_path / f"lib{i}.so"
+        path.write_bytes(b"")
+        paths.append(str(path))
+    results = [
+        LoadResult(p, True, ExportStore([ELFExport(0x10, "f", "f")])) for p in paths
+    ]
+    lru = ResultLRU(ResultLRU.estimate(results[0]) * 2)
+    lru.put(results[0])
+    lru.put(results[1])
+    assert lru.get(paths[0]) is results[0]
+    lru.put(results[2])
+    assert paths[1] not in lru
+    assert lru.get(paths[0]) is results[0]
+    assert lru.get(paths[2]) is results[2]
+
+
+def test_prewarm():
+    """Prewarmed libraries are loaded from memory."""
+    lru = ResultLRU(1024 * 1024)
+    prewarmer = Prewarmer(lru)
+    prewarmer.start([LIB])
+    prewarmer.join()
+    assert LIB in lru
+    que: queue.Queue = queue.Queue()
+    Loader(que, LIB, lru=lru).run()
+    assert drain(que)[-1] is lru.get(LIB)
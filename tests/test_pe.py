@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+
+"""Tests for `dycall.pe.PEReader`."""
+
+from __future__ import annotations
+
+import struct
+
+import lief
+import pytest
+
+from dycall.pe import PEReader, PEReaderError
+from dycall.types import PEExport
+
+
+def make_dll(path) -> list[PEExport]:
+    """Writes a minimal PE32+ DLL with an export directory to `path`.
+
+    Returns:
+        The exports which `PEReader` should find in it.
+    """
+    # Export directory at RVA 0x1000 followed by its tables and strings
+    edata = bytearray(0x200)
+    functions, names, ordinals, strings = 0x1028, 0x1038, 0x1040, 0x1044
+    struct.pack_into(
+        "<IIHHIIIIIII", edata, 0, 0, 0, 0, 0, 0, 1, 4, 2, functions, names, ordinals
+    )
+    blob = b"test.dll\0bar\0fwd\0NTDLL.RtlAllocateHeap\0"
+    struct.pack_into(f"{len(blob)}s", edata, strings - 0x1000, blob)
+    bar_name, fwd_name = strings + 9, strings + 13
+    forwarder = strings + 17
+    struct.pack_into("<4I", edata, functions - 0x1000, 0x2000, 0, 0x2010, forwarder)
+    struct.pack_into("<2I", edata, names - 0x1000, bar_name, fwd_name)
+    struct.pack_into("<2H", edata, ordinals - 0x1000, 0, 3)
+
+    headers = bytearray(0x200)
+    headers[:2] = b"MZ"
+    struct.pack_into("<I", headers, 0x3C, 0x40)
+    headers[0x40:0x44] = b"PE\0\0"
+    struct.pack_into("<HHIIIHH", headers, 0x44, 0x8664, 1, 0, 0, 0, 240, 0x2022)
+    opt = 0x58
+    struct.pack_into("<H", headers, opt, 0x20B)
+    struct.pack_into("<Q", headers, opt + 24, 0x180000000)  # ImageBase
+    struct.pack_into("<II", headers, opt + 32, 0x1000, 0x200)  # Alignments
+    struct.pack_into("<H", headers, opt + 48, 6)  # MajorSubsystemVersion
+    struct.pack_into("<II", headers, opt + 56, 0x3000, 0x200)  # Image, headers
+    struct.pack_into("<H", headers, opt + 68, 3)  # Subsystem
+    struct.pack_into("<I", headers, opt + 108, 16)  # NumberOfRvaAndSizes
+    struct.pack_into("<II", headers, opt + 112, 0x1000, strings + len(blob) - 0x1000)
+    struct.pack_into(
+        "<8sIIII", headers, opt + 240, b".edata", 0x200, 0x1000, 0x200, 0x200
+    )
+    path.write_bytes(bytes(headers) + bytes(edata))
+    return [
+        PEExport(0x2000, "bar", 1, "bar"),
+        PEExport(0x2010, "", 3),
+        PEExport(forwarder, "fwd", 4, "fwd", forwarder="NTDLL.RtlAllocateHeap"),
+    ]
+
+
+def test_exports(tmp_path):
+    """Named, ordinal-only and forwarded exports are read, unused slots aren't."""
+    dll = tmp_path / "test.dll"
+    expected = make_dll(dll)
+    with PEReader(str(dll)) as reader:
+        assert list(reader) == expected
+
+
+def test_same_as_lief(tmp_path):
+    """Exports read are the same as those of `lief.PE.Export.entries`.
+
+    LIEF reports the forwarder string as the name of forwarded exports.
+    """
+    dll = tmp_path / "test.dll"
+    make_dll(dll)
+    lib = lief.parse(str(dll))
+    expected = {
+        (e.address, e.name, e.ordinal)
+        for e in lib.get_export().entries
+        if not e.is_extern
+    }
+    with PEReader(str(dll)) as reader:
+        got = {(e.address, e.name, e.ordinal) for e in reader if not e.forwarder}
+    assert got == expected
+
+
+def test_no_exports(tmp_path):
+    """Files without an export directory raise `PEReaderError`."""
+    junk = tmp_path / "junk.dll"
+    junk.write_bytes(b"MZ" + bytes(62))
+    with pytest.raises(PEReaderError):
+        PEReader(str(junk))
+
+
+def test_truncated(tmp_path):
+    """Tables running past the end of the file raise `PEReaderError`."""
+    dll = tmp_path / "test.dll"
+    make_dll(dll)
+    data = bytearray(dll.read_bytes())
+    struct.pack_into("<I", data, 0x200 + 20, 0x10000)  # NumberOfFunctions
+    dll.write_bytes(bytes(data))
+    with PEReader(str(dll)) as reader:
+        with pytest.raises(PEReaderError):
+            list(reader)
+
+
+def test_duplicate_names(tmp_path):
+    """The first name of an address with several names is kept, like LIEF."""
+    dll = tmp_path / "test.dll"
+    make_dll(dll)
+    data = bytearray(dll.read_bytes())
+    struct.pack_into("<H", data, 0x200 + 0x42, 0)  # "fwd" names slot 0 too
+    dll.write_bytes(bytes(data))
+    with PEReader(str(dll)) as reader:
+        exports = list(reader)
+    assert [(e.name, e.ordinal) for e in exports] == [("bar", 1), ("", 3), ("", 4)]
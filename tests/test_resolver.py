@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+
+"""Tests for `dycall.resolver.LibraryResolver`."""
+
+from __future__ import annotations
+
+import ctypes.util
+import os
+import platform
+
+import pytest
+
+from dycall.resolver import LD_SO_CACHE, LibraryResolver
+
+pytestmark = pytest.mark.skipif(
+    platform.system() != "Linux" or not os.path.isfile(LD_SO_CACHE),
+    reason="Needs glibc's ld.so.cache",
+)
+
+
+@pytest.mark.parametrize("name", ["c", "m", "libc.so.6"])
+def test_same_as_ctypes(name: str):
+    """Same library as `ctypes.util.find_library` is found, but as a path."""
+    path = LibraryResolver().find(name)
+    assert path is not None and os.path.isabs(path)
+    soname = ctypes.util.find_library(name)
+    if soname is not None:
+        assert os.path.basename(path) == soname
+
+
+def test_ld_library_path(tmp_path, monkeypatch: pytest.MonkeyPatch):
+    """`LD_LIBRARY_PATH` is searched before `/etc/ld.so.cache`."""
+    lib = tmp_path / "libc.so.6"
+    lib.write_bytes(b"")
+    resolver = LibraryResolver()
+    assert resolver.find("c") != str(lib)
+    monkeypatch.setenv("LD_LIBRARY_PATH", str(tmp_path))
+    assert resolver.find("c") == str(lib)
+
+
+def test_paths(tmp_path):
+    """Paths are returned as is if they exist."""
+    lib = tmp_path / "libfoo.so"
+    resolver = LibraryResolver()
+    assert resolver.find(str(lib)) is None
+    lib.write_bytes(b"")
+    resolver.clear()
+    assert resolver.find(str(lib)) == str(lib)
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+
+"""Tests for `dycall.runner`."""
+
+from __future__ import annotations
+
+import ctypes
+import ctypes.util
+import errno
+import platform
+import threading
+
+import pytest
+
+from dycall.runner import LibraryCache, Runner, RunnerPool
+from dycall.types import CallConvention, ParameterType, compile_signature
+
+pytestmark = pytest.mark.skipif(
+    platform.system() != "Linux", reason="Needs the C runtime of Linux"
+)
+
+
+def test_reuse():
+    """Handles and functions are reused till the library is invalidated."""
+    path = ctypes.util.find_library("c")
+    cache = LibraryCache()
+    handle = cache.handle(path, CallConvention.Cdecl, False, False)
+    assert cache.handle(path, CallConvention.Cdecl, False, False) is handle
+    assert cache.handle(path, CallConvention.Cdecl, True, False) is not handle
+
+    args = (handle, "abs", ctypes.CFUNCTYPE, ctypes.c_int, [ctypes.c_int])
+    func = cache.function(*args)
+    assert func(-5) == 5
+    assert cache.function(*args) is func
+    assert cache.function(handle, "labs", *args[2:]) is not func
+
+    cache.invalidate(path)
+    assert cache.handle(path, CallConvention.Cdecl, False, False) is not handle
+    assert cache.function(*args) is not func
+
+
+def test_missing_export():
+    """Unknown exports raise `AttributeError` and aren't cached."""
+    cache = LibraryCache()
+    handle = cache.handle(
+        ctypes.util.find_library("c"), CallConvention.Cdecl, False, False
+    )
+    with pytest.raises(AttributeError):
+        cache.function(handle, "no_such_export", ctypes.CFUNCTYPE, None, [])
+
+
+def test_pool_concurrent():
+    """Calls run concurrently and are tracked till they finish."""
+    pool = RunnerPool(2)
+    barrier = threading.Barrier(2, timeout=5)
+    release = threading.Event()
+
+    def call():
+        barrier.wait()  # Both calls must be running at once
+        release.wait(5)
+        return threading.get_ident()
+
+    (id1, f1), (id2, f2) = pool.submit(call), pool.submit(call)
+    assert id1 != id2
+    assert set(pool.pending) == {id1, id2}
+    release.set()
+    assert f1.result(5) != f2.result(5)
+    pool.shutdown()
+    assert not pool.pending
+
+
+def test_pool_pinned():
+    """Pinned calls always run on the same thread, other than the pool's."""
+    pool = RunnerPool(4)
+    pinned = {pool.submit(threading.get_ident, True)[1].result(5) for _ in range(8)}
+    assert len(pinned) == 1
+    assert pool.submit(threading.get_ident)[1].result(5) not in pinned
+
+    _, future = pool.submit(lambda: 1 // 0, True)
+    with pytest.raises(ZeroDivisionError):
+        future.result(5)
+    assert pool.submit(threading.get_ident, True)[1].result(5) in pinned
+    pool.shutdown()
+
+
+def test_runner_errno():
+    """The errno is returned in the `RunResult` when it is shown."""
+    libc = ctypes.util.find_library("c")
+    args = [["char*", "no/such/dir"], ["uint32_t", "0"]]
+    result = Runner(args, "cdecl", "int32_t", libc, "mkdir", False, True).run()
+    assert result.ret == -1
+    assert result.errno == errno.ENOENT
+    assert result.last_error is None
+
+    result = Runner(args, "cdecl", "int32_t", libc, "mkdir", False, False).run()
+    assert result.errno is None
+
+
+def test_runner_unused():
+    """A runner which is never run doesn't keep the arguments of its plan."""
+    libc = ctypes.util.find_library("c")
+    Runner([["int64_t", "-7"]], "cdecl", "int64_t", libc, "labs", False, False)
+    plan = compile_signature(ParameterType.q, (ParameterType.q,))
+    args = plan.encode(["1"])
+    plan.release(args)
+    assert plan.encode(["1"]) is args
+    plan.release(args)
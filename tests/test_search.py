@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+
+"""Tests for `dycall.search.ExportIndex`."""
+
+from __future__ import annotations
+
+import time
+
+from dycall.search import ExportIndex
+
+NAMES = [
+    "setName",
+    "getNameTable",
+    "name",
+    "getName",
+    "Name",
+    "rename",
+    "getValue",
+]
+
+
+def run(index: ExportIndex, query: str) -> list[str]:
+    """Searches for `query` to completion."""
+    index.search(query)
+    while not index.resume(time.perf_counter() + 1):
+        pass
+    return index.results
+
+
+def test_contains():
+    """Lookups are exact."""
+    index = ExportIndex(NAMES)
+    assert "getName" in index
+    assert "getname" not in index
+    assert len(index) == len(NAMES)
+
+
+def test_ranking():
+    """Exact > prefix > substring, alphabetically otherwise."""
+    index = ExportIndex(NAMES)
+    assert run(index, "name") == [
+        "name",
+        "Name",
+        "getName",
+        "getNameTable",
+        "rename",
+        "setName",
+    ]
+    assert run(index, "getn") == ["getName", "getNameTable"]
+    assert run(index, "xyz") == []
+
+
+def test_recent():
+    """Recently used names come first within their rank."""
+    index = ExportIndex(NAMES)
+    index.touch("setName")
+    index.touch("rename")
+    assert run(index, "nam")[:2] == ["name", "Name"]
+    assert run(index, "nam")[2:4] == ["rename", "setName"]
+
+
+def test_narrowing():
+    """Extending the query gives the same results as searching afresh."""
+    names = [f"func{i}" for i in range(5000)]
+    index = ExportIndex(names)
+    index.SLICE = 64
+    for query in ("f", "fu", "func", "func4", "func49", "func499"):
+        assert run(index, query) == run(ExportIndex(names), query)
+
+
+def test_limit():
+    """At most `LIMIT` results are returned."""
+    index = ExportIndex(f"n{i}" for i in range(1000))
+    assert len(run(index, "n")) == ExportIndex.LIMIT
+
+
+def test_filter():
+    """All the matches are found in order, however small the slices."""
+    names = [f"func{i}" for i in range(5000)]
+    index = ExportIndex(names)
+    index.SLICE = 64
+    found = [i for part in index.filter("FUNC49") for i in part]
+    assert found == [i for i, n in enumerate(names) if "func49" in n]
+    assert [i for part in index.filter("") for i in part] == list(range(5000))
+
+
+def test_keys():
+    """Keys are searched, the names shown for them are returned."""
+    index = ExportIndex(["?f@@YAXXZ", "?f2@@YAXXZ"], ["f()", "f2()"])
+    assert "?f@@YAXXZ" in index and "f()" not in index
+    assert run(index, "f@@") == ["f()"]
+    assert run(index, "?f") == ["f2()", "f()"]
+    assert run(index, "f(") == []
+    index.touch("f()")
+    assert run(index, "?f") == ["f()", "f2()"]
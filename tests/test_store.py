@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+
+"""Tests for `dycall.store.ExportStore`."""
+
+from __future__ import annotations
+
+import pytest
+
+import dycall.store
+from dycall.store import ExportStore
+from dycall.types import ELFExport, PEExport, SortOrder
+
+
+def make_store() -> ExportStore:
+    """A store with a mangled, a plain and an ordinal-only PE export."""
+    return ExportStore(
+        [
+            PEExport(0x1000, "?f@@YAXXZ", 1, "void __cdecl f(void)"),
+            PEExport(0x2000, "g", 2),
+            PEExport(0x3000, "", 3),
+        ]
+    )
+
+
+def test_lookups():
+    """Every index finds the right export."""
+    store = make_store()
+    assert store.get_by_name("g") == store[1]
+    assert store.get_by_demangled_name("void __cdecl f(void)") == store[0]
+    assert store.get_by_ordinal(3) == store[2]
+    assert store.get_by_address(0x2000) == store[1]
+    assert store.get_by_name("h") is None
+    assert store[0] in store
+    assert PEExport(0x4000, "h", 4) not in store
+
+
+def test_symbol():
+    """Displayed names are converted to what can be passed to `Runner`."""
+    store = make_store()
+    assert store.symbol("void __cdecl f(void)") == "?f@@YAXXZ"
+    assert store.symbol("g") == "g"
+    assert store.symbol("@3") == "@3"
+    assert store.symbol("unknown") == "unknown"
+
+
+def test_truncate():
+    """Indexes are updated when exports are removed and appended."""
+    store = make_store()
+    assert store.get_by_ordinal(2) is not None
+    store.truncate(1)
+    assert len(store) == 1
+    assert store.get_by_name("g") is None
+    assert store.get_by_ordinal(2) is None
+    store.extend([ELFExport(0x10, "_Z1hv", "h()")])
+    assert store.symbol("h()") == "_Z1hv"
+    assert store.get_by_address(0x10) == store[1]
+    store.clear()
+    assert not store
+
+
+def test_lazy_demangling(monkeypatch):
+    """Names are demangled once, when they are first looked at."""
+    calls = []
+
+    def demangle_many(names, _processes=1):
+        calls.extend(names)
+        return [None if n == "?bad" else n.upper() for n in names]
+
+    monkeypatch.setattr(dycall.store, "demangle_many", demangle_many)
+    store = ExportStore(
+        [PEExport(0x1000, "f", 1), PEExport(0x2000, "?bad", 2), PEExport(0, "", 3)]
+    )
+    assert not calls
+    assert store.demangle_failures() == []
+    names = store.demangled_names
+    assert names[0] == names[0] == "F"
+    assert calls == ["f"]
+    assert [r[2] for r in store.records()] == ["F", "", "@3"]
+    assert store.get_by_demangled_name("?bad") == store[1]
+    assert store[1].exc is not None
+    assert store.demangle_failures() == ["?bad"]
+    assert calls == ["f", "?bad"]
+
+
+def test_search_keys(monkeypatch):
+    """Pending PE names are searched mangled, shown names are demangled at once."""
+    calls = []
+
+    def demangle_many(names, _processes=1):
+        calls.append(list(names))
+        return [n.upper() for n in names]
+
+    monkeypatch.setattr(dycall.store, "demangle_many", demangle_many)
+    store = ExportStore(
+        [PEExport(0x1000, "f", 1), PEExport(0x2000, "g", 2), PEExport(0, "", 3)]
+    )
+    assert store.search_keys() == ["f", "g", "@3"]
+    assert not calls
+    assert store.demangled_names.take([1, 0]) == ["G", "F"]
+    assert calls == [["g", "f"]]
+    assert store.sorted_names(SortOrder.Ordinal).take([2]) == ["@3"]
+
+
+def test_find_demangled(monkeypatch):
+    """Only shown and plain names are found till all have been demangled."""
+    calls = []
+
+    def demangle_many(names, _processes=1):
+        calls.extend(names)
+        return [n.strip("?") for n in names]
+
+    monkeypatch.setattr(dycall.store, "demangle_many", demangle_many)
+    store = ExportStore([PEExport(10 - i, f"?f{i}", i) for i in range(5)])
+    store.extend([PEExport(0, "g", 5)])
+    names = store.sorted_names(SortOrder.Address)
+    assert names.take([2]) == ["f3"]
+    assert calls == ["?f3"]
+    assert names.index("f3") == 2
+    assert names.index("g") == 0
+    assert calls == ["?f3", "g"]
+    for key in ("f1", "", " f3", "h"):
+        with pytest.raises(ValueError):
+            names.index(key)
+    assert calls == ["?f3", "g"]
+
+    names.demangle()
+    assert names.index("f1") == 4
+    assert sorted(calls) == ["?f0", "?f1", "?f2", "?f3", "?f4", "g"]
+    with pytest.raises(ValueError):
+        names.index("h")
+
+
+def test_known_demangled_names():
+    """Demangled names known when appended are found right away."""
+    store = ExportStore([ELFExport(0x10, "_Z1fv", "f()"), PEExport(0, "", 7)])
+    assert store.get_by_demangled_name("f()") == store[0]
+    assert store.get_by_demangled_name("@7") == store[1]
+    assert store.get_by_demangled_name("") is None
+
+
+def test_sort_orders():
+    """Sorted views are computed once and ties stay in export order."""
+    store = ExportStore(
+        [
+            ELFExport(0x30, "_Z1bv", "b()", 8, 0x12),
+            ELFExport(0x10, "_Z1cv", "c()", 4, 0x22),
+            ELFExport(0x20, "a", "a", 8, 0x11),
+        ]
+    )
+    expected = {
+        SortOrder.NameAscending: ["a", "b()", "c()"],
+        SortOrder.NameDescending: ["c()", "b()", "a"],
+        SortOrder.MangledName: ["b()", "c()", "a"],
+        SortOrder.Address: ["c()", "a", "b()"],
+        SortOrder.Ordinal: ["b()", "c()", "a"],
+        SortOrder.Size: ["c()", "b()", "a"],
+        SortOrder.Type: ["a", "b()", "c()"],
+    }
+    for order, names in expected.items():
+        assert list(store.sorted_names(order)) == names
+        assert store.sorted_names(order) is store.sorted_names(order)
+    sorted_names = store.sorted_names()
+    store.extend([ELFExport(0x40, "_Z1dv", "d()")])
+    assert store.sorted_names() is not sorted_names
+    assert store.sorted_names()[-1] == "d()"
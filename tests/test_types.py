@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+
+"""Tests for `dycall.types.CallPlan`."""
+
+from __future__ import annotations
+
+import pytest
+
+from dycall.types import Marshaller, ParameterType, compile_signature
+
+
+def test_call_plan():
+    """Plans are built once and convert like `Marshaller`."""
+    types = (ParameterType.i, ParameterType.d, ParameterType.pc, ParameterType.pv)
+    plan = compile_signature(ParameterType.Q, types)
+    assert compile_signature(ParameterType.Q, types) is plan
+    values = ["-3", "1.5", "text", "0"]
+    args = plan.encode(values)
+    for arg, t, val in zip(args, types, values):
+        expected = Marshaller.str2ctype(t.ctype, val)
+        if expected is None:
+            assert arg is None
+        else:
+            assert arg.value == expected.value
+    assert plan.encode(values) is not args  # In use
+    result = plan.decode(0, args)
+    assert result.output == Marshaller.pytype2str(0)
+    assert result.values == ["-3", "1.5", "text", "NULL"]
+    plan.release(args)
+    assert plan.encode(values) is args
+
+
+def test_call_plan_invalid():
+    """Invalid values raise and don't leave the plan in use."""
+    plan = compile_signature(ParameterType.v, (ParameterType.i,))
+    with pytest.raises(ValueError):
+        plan.encode(["x"])
+    args = plan.encode(["1"])
+    assert plan.encode(["2"]) is not args
+    plan.release(args)
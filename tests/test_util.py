@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+
+"""Tests for the demangling functions of `dycall.util`."""
+
+from __future__ import annotations
+
+import os
+import pathlib
+import platform
+import subprocess  # nosec
+import sys
+
+import pytest
+
+import dycall.util
+from dycall.util import (
+    DemangleError,
+    demangle,
+    demangle_cache,
+    demangle_many,
+    demangle_text,
+)
+
+pytestmark = pytest.mark.skipif(
+    platform.system() == "Windows", reason="Itanium C++ ABI names"
+)
+
+NAMES = ["_Z1fv", "memcpy", "_ZNSt6vectorIiSaIiEE9push_backERKi", "_Zbad"] * 100
+# Longer than `dycall.util.BUFSIZE` when demangled
+NAMES.append("_ZN" + "".join("48" + c * 48 for c in "abcdefghijklmnopqrst") + "1fEv")
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    """Every test starts with an empty `demangle_cache`."""
+    demangle_cache.clear()
+    yield
+    demangle_cache.clear()
+
+
+def per_name(name: str):
+    """Reference result of `demangle`."""
+    try:
+        return demangle(name)
+    except DemangleError:
+        return None
+
+
+def test_same_as_demangle():
+    """Results match `demangle`, invalid names are None."""
+    results = demangle_many(NAMES)
+    assert results == [per_name(n) for n in NAMES]
+    assert results[:4] == [
+        "f()",
+        "memcpy",
+        "std::vector<int, std::allocator<int> >::push_back(int const&)",
+        None,
+    ]
+
+
+def test_process_pool(monkeypatch):
+    """Results are in order when split among processes."""
+    monkeypatch.setattr(dycall.util, "PARALLEL_THRESHOLD", 10)
+    assert demangle_many(NAMES, processes=3) == demangle_many(NAMES)
+
+
+def test_cache(monkeypatch):
+    """Names are demangled once, failures included."""
+    calls = []
+
+    def demangle_batch(names):
+        calls.extend(names)
+        return [None if n == "_Zbad" else n[2:] for n in names]
+
+    monkeypatch.setattr(dycall.util, "_demangle_batch", demangle_batch)
+    assert demangle_many(["_Z1fv", "_Zbad", "memcpy"]) == ["1fv", None, "memcpy"]
+    assert demangle_many(["_Zbad", "_Z1fv", "_Z1gv"]) == [None, "1fv", "1gv"]
+    assert calls == ["_Z1fv", "_Zbad", "_Z1gv"]
+    assert (demangle_cache.hits, demangle_cache.misses) == (2, 3)
+
+
+def test_eviction():
+    """The least recently used entries are evicted first."""
+    cache = dycall.util.DemangleCache(2)
+    cache.put_many([("a", "A"), ("b", "B")])
+    cache.get_many(["a"])
+    cache.put_many([("c", None)])
+    assert cache.items() == [("a", "A"), ("c", None)]
+
+
+def test_demangle_text():
+    """Names are replaced anywhere in a line, other text is left as is."""
+    lines = [
+        "#0 0x1234 in _ZN3foo3barEv (libfoo.so+0x10)\n",
+        "_Zbad _Z1fv,_Z1fv\n",
+        "no_Z1fv here\n",
+    ] * 3
+    batches = list(demangle_text(lines, batch_size=2))
+    assert [len(b) for b in batches] == [2, 2, 2, 2, 1]
+    assert [line for batch in batches for line in batch] == [
+        "#0 0x1234 in foo::bar() (libfoo.so+0x10)\n",
+        "_Zbad f(),f()\n",
+        "no_Z1fv here\n",
+    ] * 3
+
+
+def test_cli(tmp_path):
+    """`python -m dycall demangle` demangles files and stdin in order."""
+    log = tmp_path / "crash.log"
+    log.write_bytes(b"at _Z1fv\n\xff _Zbad\n")
+    env = dict(os.environ, PYTHONPATH=str(pathlib.Path(dycall.__file__).parents[1]))
+    proc = subprocess.run(  # nosec
+        [sys.executable, "-m", "dycall", "demangle", str(log), "-"],
+        input=b"_ZN3foo3barEv\n",
+        stdout=subprocess.PIPE,
+        env=env,
+        check=True,
+    )
+    assert proc.stdout == b"at f()\n\xff _Zbad\nfoo::bar()\n"
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+
+"""Tests for `dycall.worker`."""
+
+from __future__ import annotations
+
+import ctypes.util
+import platform
+import signal
+import threading
+
+import pytest
+
+from dycall.runner import Runner, run_request
+from dycall.worker import IsolatedWorker, WorkerCrashed
+
+pytestmark = pytest.mark.skipif(
+    platform.system() != "Linux", reason="Needs the C runtime of Linux"
+)
+
+LIBC = ctypes.util.find_library("c")
+
+
+def request(name: str, returns: str, *args: tuple[str, str]) -> tuple:
+    """`IsolatedWorker.call` arguments for a function of the C runtime."""
+    runner_args = ([list(a) for a in args], "cdecl", returns, LIBC, name, False, True)
+    return run_request, runner_args
+
+
+@pytest.fixture(name="worker")
+def fixture_worker():
+    """A worker process, stopped after the test."""
+    worker = IsolatedWorker()
+    yield worker
+    worker.stop()
+
+
+def test_call(worker: IsolatedWorker):
+    """Calls are made in a persistent process, errors are raised back."""
+    result = worker.call(*request("abs", "int32_t", ("int32_t", "-5")))
+    assert (result.ret, result.output, result.errno) == (5, "5", 0)
+    pid = worker.pid
+    worker.call(*request("abs", "int32_t", ("int32_t", "-6")))
+    assert worker.pid == pid
+
+    with pytest.raises(AttributeError):
+        worker.call(*request("no_such_export", "int32_t"))
+    assert worker.pid == pid
+
+
+def test_shared_memory(worker: IsolatedWorker):
+    """Large out-buffers come back intact."""
+    size = 200_000
+    args = (("char*", "x" * size), ("int32_t", "65"), ("uint64_t", str(size // 2)))
+    result = worker.call(*request("memset", "void*", *args))
+    assert result.values[0] == "A" * (size // 2) + "x" * (size // 2)
+
+
+def test_crash(worker: IsolatedWorker):
+    """A crash is reported with its signal and the worker is restarted."""
+    worker.call(*request("abs", "int32_t", ("int32_t", "1")))
+    pid = worker.pid
+    with pytest.raises(WorkerCrashed) as info:
+        worker.call(*request("strlen", "uint64_t", ("void*", "1")))
+    assert info.value.signal == signal.SIGSEGV
+    assert "SIGSEGV" in str(info.value)
+    assert worker.restarts == 1
+    assert worker.pid != pid
+    assert worker.call(*request("abs", "int32_t", ("int32_t", "-2"))).ret == 2
+
+
+def test_runner_isolated():
+    """Isolated runners validate arguments in-process."""
+    with pytest.raises(ValueError):
+        Runner([["int32_t", "x"]], "cdecl", "int32_t", LIBC, "abs", False, False, True)
+
+
+def test_timeout_and_kill(worker: IsolatedWorker):
+    """Hung calls are ended by a timeout or by `kill` from another thread."""
+    sleep = request("sleep", "uint32_t", ("uint32_t", "30"))
+    worker.call(*request("abs", "int32_t", ("int32_t", "1")))
+    with pytest.raises(WorkerCrashed) as info:
+        worker.call(*sleep, timeout=0.2)
+    assert info.value.killed and "killed" in str(info.value)
+
+    threading.Timer(0.2, worker.kill).start()
+    with pytest.raises(WorkerCrashed) as info:
+        worker.call(*sleep)
+    assert info.value.killed
+    assert worker.restarts == 2
+    assert worker.call(*request("abs", "int32_t", ("int32_t", "-2"))).ret == 2